@@ -0,0 +1,546 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+from core import database
+from core.database import init_db
+
+"""
+WebSpeed CLI – chạy không cần màn hình (cron, CI, script)
+Không import PyQt6 / matplotlib; Playwright chỉ được import khi thật
+sự scan.
+
+    python cli.py scan https://example.com --runs 5 --profile "Slow 4G"
+    python cli.py batch urls.txt --processes 4
+    python cli.py history --url example.com --limit 20
+    python cli.py show 42
+    python cli.py export --format csv -o history.csv
+    python cli.py reanalyze --processes 8
+    python cli.py har recorded.har --save
+    python cli.py monitor add https://example.com --interval 15m
+    python cli.py monitor run
+    python cli.py trend https://example.com --metric lcp --granularity day
+    python cli.py retention --blob-days 90 --raw-days 365
+    python cli.py regressions --url example.com
+    python cli.py diff 41 42
+
+Exit code: 0 = OK, 1 = lỗi, 2 = có finding đạt mức --fail-on.
+"""
+
+SEVERITY_RANK = {"info": 0, "warning": 1, "critical": 2}
+
+
+# -----------------------------------------------------------
+# OUTPUT
+# -----------------------------------------------------------
+def _print_json(obj):
+    json.dump(obj, sys.stdout, ensure_ascii=False, indent=2, default=str)
+    sys.stdout.write("\n")
+
+
+def _print_summary(data: dict, findings: list):
+    m = data["metrics"]
+    v = data["vitals"]
+    profile = (data.get("profile") or {}).get("name", "Desktop")
+    runs = data.get("multirun", {}).get("runs", 1)
+
+    print(f"URL:       {data['url']}")
+    print(f"Profile:   {profile}    Runs: {runs}")
+    print(f"TTFB:      {m['ttfb']} ms")
+    print(f"DOM:       {m['dom']} ms")
+    print(f"Load:      {m['load']} ms")
+    print(f"LCP:       {v['LCP']} ms    CLS: {v['CLS']}    "
+          f"INP: {v.get('INP', 0)} ms    TBT: {v.get('TBT', 0)} ms")
+    print(f"Requests:  {data['total_requests']}")
+    print(f"Size:      {data['total_size'] / 1024:.1f} KB")
+
+    if findings:
+        print("\nIssues:")
+        for f in findings:
+            print(f"  [{f['severity']}] {f['message']}")
+            print(f"      -> {f['suggestion']}")
+
+
+def _report(data: dict, args) -> list:
+    from core.analyzer import analyze
+
+    findings = analyze(data)["findings"]
+    if args.json:
+        _print_json({**data, "findings": findings})
+    else:
+        _print_summary(data, findings)
+    return findings
+
+
+def _exit_code(findings: list, fail_on: str) -> int:
+    if not fail_on:
+        return 0
+    limit = SEVERITY_RANK[fail_on]
+    return 2 if any(SEVERITY_RANK[f["severity"]] >= limit for f in findings) else 0
+
+
+# -----------------------------------------------------------
+# COMMANDS
+# -----------------------------------------------------------
+def cmd_scan(args) -> int:
+    if args.runs > 1 or args.warm_runs > 0:
+        from core.multirun import scan_multi
+
+        data = scan_multi(args.url, runs=args.runs, warm_runs=args.warm_runs,
+                          save_to_db=not args.no_save, profile=args.profile)
+    else:
+        from core.scanner import scan
+
+        data = scan(args.url, screenshot_path=args.screenshot,
+                    save_to_db=not args.no_save, capture_network=args.network,
+                    har_path=args.har, profile=args.profile)
+
+    findings = _report(data, args)
+    return _exit_code(findings, args.fail_on)
+
+
+def cmd_batch(args) -> int:
+    from core.analyzer import analyze
+    from core.batch import MAX_IN_FLIGHT, PER_HOST_LIMIT, batch_scan
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    def progress(idx, url, status, data):
+        print(f"[{idx + 1}/{len(urls)}] {status:10} {url}", file=sys.stderr)
+
+    started = time.time()
+    results = batch_scan(
+        urls,
+        callback_progress=progress,
+        max_in_flight=args.max_in_flight or MAX_IN_FLIGHT,
+        per_host_limit=args.per_host or PER_HOST_LIMIT,
+        processes=args.processes,
+        profile=args.profile,
+    )
+
+    failed = 0
+    findings = []
+    rows = []
+    for url, data in results:
+        if data is None:
+            failed += 1
+            rows.append({"url": url, "error": True})
+            continue
+        found = analyze(data)["findings"]
+        findings.extend(found)
+        rows.append({
+            "url": url,
+            "ttfb": data["metrics"]["ttfb"],
+            "load": data["metrics"]["load"],
+            "lcp": data["vitals"]["LCP"],
+            "requests": data["total_requests"],
+            "size": data["total_size"],
+            "issues": len(found),
+        })
+
+    if args.json:
+        _print_json(rows)
+    else:
+        for r in rows:
+            if r.get("error"):
+                print(f"{'ERROR':>8}  {r['url']}")
+            else:
+                print(f"{r['load']:>6} ms  {r['ttfb']:>5} ms  {r['issues']:>2} issues  {r['url']}")
+        print(f"\n{len(urls) - failed}/{len(urls)} OK in {time.time() - started:.1f}s",
+              file=sys.stderr)
+
+    if failed:
+        return 1
+    return _exit_code(findings, args.fail_on)
+
+
+def _history_rows(args) -> list:
+    rows = []
+    after = None
+    while len(rows) < args.limit:
+        page = database.get_history_page(
+            limit=min(500, args.limit - len(rows)),
+            after=after,
+            sort=args.sort,
+            descending=not args.asc,
+            url_filter=args.url,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            profile=args.profile,
+        )
+        if not page:
+            break
+        rows.extend(page)
+        last = page[-1]
+        after = (last[database.HISTORY_COLUMNS.index(args.sort)], last[0])
+    return [dict(zip(database.HISTORY_COLUMNS, r)) for r in rows]
+
+
+def cmd_history(args) -> int:
+    rows = _history_rows(args)
+    if args.json:
+        _print_json(rows)
+        return 0
+
+    for r in rows:
+        print(f"{r['id']:>6}  {r['created_at']}  {r['load']:>6} ms  "
+              f"{r['ttfb']:>5} ms  {r['profile']:<8}  {r['url']}")
+    return 0
+
+
+def cmd_show(args) -> int:
+    data = database.get_scan(args.id)
+    if not data:
+        print(f"Scan {args.id} not found", file=sys.stderr)
+        return 1
+    findings = _report(data, args)
+    return _exit_code(findings, args.fail_on)
+
+
+def cmd_export(args) -> int:
+    rows = _history_rows(args)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=database.HISTORY_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            # JSON Lines: mỗi dòng một payload đầy đủ
+            for r in rows:
+                data = database.get_scan(r["id"])
+                if data is not None:
+                    out.write(json.dumps({"id": r["id"], **data}, ensure_ascii=False, default=str))
+                    out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Exported {len(rows)} scans", file=sys.stderr)
+    return 0
+
+
+def cmd_reanalyze(args) -> int:
+    from core.reanalyze import reanalyze
+
+    def progress(done, total):
+        print(f"\r{done}/{total} scans", end="", file=sys.stderr, flush=True)
+
+    started = time.time()
+    stats = reanalyze(processes=args.processes, chunk_size=args.chunk_size,
+                      progress=progress)
+    print(file=sys.stderr)
+    print(f"{stats['scans']} scans, {stats['findings']} findings, "
+          f"{stats['errors']} errors in {time.time() - started:.1f}s")
+    return 1 if stats["errors"] else 0
+
+
+def cmd_har(args) -> int:
+    from core.har import load_har
+
+    data = load_har(args.file)
+    if args.save:
+        scan_id = database.save_scan(data)
+        print(f"Saved as scan {scan_id}", file=sys.stderr)
+
+    findings = _report(data, args)
+    return _exit_code(findings, args.fail_on)
+
+
+def _parse_interval(text: str) -> int:
+    """
+    "90" / "90s" / "15m" / "2h" / "1d" -> giây
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _format_time(ts) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def cmd_monitor(args) -> int:
+    from core import monitor
+
+    if args.action == "add":
+        monitor.add_monitor(args.url, _parse_interval(args.interval), args.profile)
+        print(f"Monitoring {args.url} every {args.interval}")
+        return 0
+
+    if args.action == "remove":
+        if not monitor.remove_monitor(args.url):
+            print(f"Not monitored: {args.url}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.action in ("pause", "resume"):
+        if not database.set_monitor_enabled(args.url, args.action == "resume"):
+            print(f"Not monitored: {args.url}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.action == "list":
+        rows = database.get_monitors()
+        if args.json:
+            _print_json(rows)
+            return 0
+        for m in rows:
+            state = "on " if m["enabled"] else "off"
+            print(f"{state}  {m['interval']:>6}s  next {_format_time(m['next_run'])}  "
+                  f"last {_format_time(m['last_run'])} ({m['last_status'] or '-'})  "
+                  f"{m['profile']:<8}  {m['url']}")
+        return 0
+
+    # run: chạy tới khi Ctrl+C
+    def on_result(m, status, data):
+        load = f"{data['metrics']['load']} ms" if data else ""
+        print(f"{_format_time(time.time())}  {status:10} {load:>9}  {m['url']}", flush=True)
+
+    print(f"Monitoring {len(database.get_monitors(enabled_only=True))} URLs (Ctrl+C to stop)",
+          file=sys.stderr)
+    monitor.run_monitor(args.max_in_flight, args.per_host, on_result)
+    return 0
+
+
+def cmd_trend(args) -> int:
+    rows = database.get_rollups(args.url, args.metric, args.granularity,
+                                since=args.since, until=args.until,
+                                profile=args.profile or database.DEFAULT_PROFILE)
+    if args.json:
+        _print_json(rows)
+        return 0
+    for r in rows:
+        print(f"{r['bucket']:<16} n={r['count']:<4} min {r['min']:>9.1f}  p50 {r['p50']:>9.1f}  "
+              f"p75 {r['p75']:>9.1f}  p95 {r['p95']:>9.1f}  max {r['max']:>9.1f}")
+    return 0
+
+
+def cmd_retention(args) -> int:
+    stats = database.apply_retention(args.blob_days, args.raw_days, args.hourly_days)
+    print(f"{stats['slimmed']} payloads slimmed, {stats['deleted']} scans deleted, "
+          f"{stats['hourly_deleted']} hourly rollups deleted")
+    return 0
+
+
+def _format_value(v) -> str:
+    # CLS < 1, các metric còn lại tính bằng ms / byte
+    return f"{v:.0f}" if abs(v) >= 10 else f"{v:.3f}"
+
+
+def cmd_regressions(args) -> int:
+    rows = database.get_regressions(args.url, args.profile, args.limit)
+    if args.json:
+        _print_json(rows)
+        return 0
+    for r in rows:
+        metrics = ", ".join(
+            f"{m['metric']} {_format_value(m['baseline'])} -> {_format_value(m['value'])}"
+            for m in r["metrics"]
+        )
+        print(f"#{r['scan_id']:<6} {r['created_at']}  {r['kind']:<5}  {r['url']}  {metrics}")
+        for res in r["resources"]:
+            print(f"        {res['field']:<8} {res['type']:<10} {res['host']:<30} "
+                  f"{_format_value(res['baseline'])} -> {_format_value(res['value'])}")
+    return 0
+
+
+def cmd_diff(args) -> int:
+    from core.diff import diff_scans
+
+    scans = []
+    for id in (args.before, args.after):
+        data = database.get_scan(id)
+        if not data:
+            print(f"Scan {id} not found", file=sys.stderr)
+            return 1
+        scans.append(data)
+
+    result = diff_scans(*scans)
+    if args.json:
+        _print_json(result)
+        return 0
+
+    s = result["summary"]
+    print(f"{s['added']} added, {s['removed']} removed, {s['grown']} grown, "
+          f"{s['slowed']} slowed, total {s['bytes_delta'] / 1024:+.1f} KB")
+    if result["slim"]:
+        print("(payload đã thu gọn bởi retention – không còn danh sách resource)")
+
+    print("\nBy type / host:")
+    for g in result["groups"][:args.limit]:
+        print(f"  {g['type']:<10} {g['host']:<35} +{g['added']} -{g['removed']} "
+              f"grown {g['grown']} slowed {g['slowed']}  "
+              f"{g['bytes_delta'] / 1024:+.1f} KB  {g['duration_delta']:+.0f} ms")
+
+    print("\nResources:")
+    for c in result["changes"][:args.limit]:
+        print(f"  {c['kind']:<8} {c['type']:<10} {c['bytes_delta'] / 1024:+9.1f} KB "
+              f"{c['duration_delta']:+8.0f} ms  {c['name'][:120]}")
+    return 0
+
+
+# -----------------------------------------------------------
+# ARGUMENTS
+# -----------------------------------------------------------
+def _add_history_filters(p):
+    p.add_argument("--url", help="lọc URL (chứa chuỗi)")
+    p.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    p.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    p.add_argument("--profile", help="emulation profile")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--sort", default="id", choices=database.HISTORY_COLUMNS)
+    p.add_argument("--asc", action="store_true", help="sort tăng dần")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from core.emulation import PROFILES
+
+    parser = argparse.ArgumentParser(prog="webspeed", description="WebSpeed PRO CLI")
+    parser.add_argument("--db", help=f"đường dẫn history DB (mặc định {database.DB_NAME})")
+    parser.add_argument("--rules", help="file JSON cấu hình rule (core.rules.load_config)")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="in kết quả dạng JSON")
+    common.add_argument("--fail-on", choices=list(SEVERITY_RANK),
+                        help="exit code 2 nếu có finding từ mức này trở lên")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scan", parents=[common], help="scan một URL")
+    p.add_argument("url")
+    p.add_argument("--runs", type=int, default=1)
+    p.add_argument("--warm-runs", type=int, default=0)
+    p.add_argument("--profile", choices=list(PROFILES))
+    p.add_argument("--screenshot", help="file ảnh chụp trang")
+    p.add_argument("--har", help="ghi HAR ra file này")
+    p.add_argument("--network", action="store_true", help="capture network qua CDP")
+    p.add_argument("--no-save", action="store_true", help="không lưu vào history")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("batch", parents=[common], help="scan danh sách URL từ file")
+    p.add_argument("file", help="mỗi dòng một URL, dòng bắt đầu bằng # bị bỏ qua")
+    p.add_argument("--processes", type=int, default=1)
+    p.add_argument("--max-in-flight", type=int,
+                   help="số scan chạy đồng thời (mặc định core.batch.MAX_IN_FLIGHT)")
+    p.add_argument("--per-host", type=int,
+                   help="số scan đồng thời mỗi host (mặc định core.batch.PER_HOST_LIMIT)")
+    p.add_argument("--profile", choices=list(PROFILES))
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("history", parents=[common], help="liệt kê history")
+    _add_history_filters(p)
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("show", parents=[common], help="chi tiết + phân tích một scan")
+    p.add_argument("id", type=int)
+    p.set_defaults(func=cmd_show)
+
+    p = sub.add_parser("export", help="xuất history ra CSV / JSON Lines")
+    _add_history_filters(p)
+    p.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    p.add_argument("-o", "--output", help="file đích (mặc định stdout)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("reanalyze", help="chạy lại analyzer trên toàn bộ history")
+    p.add_argument("--processes", type=int)
+    p.add_argument("--chunk-size", type=int, default=500)
+    p.set_defaults(func=cmd_reanalyze)
+
+    p = sub.add_parser("har", parents=[common], help="phân tích file HAR")
+    p.add_argument("file")
+    p.add_argument("--save", action="store_true", help="lưu vào history")
+    p.set_defaults(func=cmd_har)
+
+    p = sub.add_parser("monitor", help="scan định kỳ (core.monitor)")
+    actions = p.add_subparsers(dest="action", required=True)
+
+    a = actions.add_parser("add", help="thêm / cập nhật URL")
+    a.add_argument("url")
+    a.add_argument("--interval", default="1h", help="vd. 300, 15m, 1h, 1d")
+    a.add_argument("--profile", choices=list(PROFILES))
+    for name in ("remove", "pause", "resume"):
+        actions.add_parser(name).add_argument("url")
+    a = actions.add_parser("list")
+    a.add_argument("--json", action="store_true")
+    a = actions.add_parser("run", help="chạy scheduler")
+    a.add_argument("--max-in-flight", type=int)
+    a.add_argument("--per-host", type=int)
+    p.set_defaults(func=cmd_monitor)
+
+    from core.rollups import GRANULARITIES, METRICS
+
+    p = sub.add_parser("trend", help="trend theo giờ / ngày (bảng rollups)")
+    p.add_argument("url")
+    p.add_argument("--metric", default="load", choices=METRICS)
+    p.add_argument("--granularity", default="day", choices=list(GRANULARITIES))
+    p.add_argument("--since", help="bucket bắt đầu, vd. 2024-01-01")
+    p.add_argument("--until", help="bucket kết thúc")
+    p.add_argument("--profile", choices=list(PROFILES))
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_trend)
+
+    p = sub.add_parser("retention", help="thu gọn / xoá scan cũ")
+    p.add_argument("--blob-days", type=int, default=database.BLOB_RETENTION_DAYS,
+                   help="giữ payload đầy đủ trong N ngày")
+    p.add_argument("--raw-days", type=int, default=database.RAW_RETENTION_DAYS,
+                   help="giữ dòng scan trong N ngày")
+    p.add_argument("--hourly-days", type=int, default=database.HOURLY_RETENTION_DAYS,
+                   help="giữ rollup theo giờ trong N ngày")
+    p.set_defaults(func=cmd_retention)
+
+    p = sub.add_parser("regressions", help="regression phát hiện khi lưu scan")
+    p.add_argument("--url", help="lọc URL (chứa chuỗi)")
+    p.add_argument("--profile", choices=list(PROFILES))
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_regressions)
+
+    p = sub.add_parser("diff", help="so sánh resource giữa hai scan")
+    p.add_argument("before", type=int)
+    p.add_argument("after", type=int)
+    p.add_argument("--limit", type=int, default=30, help="số dòng tối đa mỗi bảng")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_diff)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Multi-run (core.multirun) không chụp ảnh / ghi HAR / capture network
+    if args.func is cmd_scan and (args.runs > 1 or args.warm_runs > 0):
+        dropped = [flag for flag, on in (("--screenshot", args.screenshot), ("--har", args.har),
+                                         ("--network", args.network)) if on]
+        if dropped:
+            parser.error(f"{', '.join(dropped)} không dùng được với --runs > 1 / --warm-runs")
+
+    if args.db:
+        database.DB_NAME = args.db
+    if args.rules:
+        from core.rules import load_config
+
+        load_config(args.rules)
+
+    init_db()
+
+    try:
+        return args.func(args)
+    finally:
+        # Scan được ghi qua write-behind queue: chờ ghi xong trước khi thoát
+        if "core.writer" in sys.modules:
+            from core.writer import get_writer
+
+            get_writer().flush()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
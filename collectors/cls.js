@@ -0,0 +1,29 @@
+// Cumulative Layout Shift theo session window (gap < 1s, tối đa 5s);
+// CLS = session window lớn nhất
+let cls = 0;
+let sessionValue = 0;
+let sessionFirst = 0;
+let sessionLast = 0;
+let shifts = 0;
+
+new PerformanceObserver((entryList) => {
+  for (const entry of entryList.getEntries()) {
+    if (entry.hadRecentInput) continue;
+    shifts += 1;
+
+    if (
+      sessionValue &&
+      entry.startTime - sessionLast < 1000 &&
+      entry.startTime - sessionFirst < 5000
+    ) {
+      sessionValue += entry.value;
+    } else {
+      sessionValue = entry.value;
+      sessionFirst = entry.startTime;
+    }
+    sessionLast = entry.startTime;
+    cls = Math.max(cls, sessionValue);
+  }
+}).observe({ type: "layout-shift", buffered: true });
+
+register("cls", () => ({ value: cls, shifts: shifts }));
@@ -0,0 +1,16 @@
+// Element Timing: phần tử có thuộc tính elementtiming="..."
+const elements = [];
+
+new PerformanceObserver((entryList) => {
+  for (const entry of entryList.getEntries()) {
+    elements.push({
+      identifier: entry.identifier,
+      renderTime: entry.renderTime || entry.loadTime,
+      url: entry.url || "",
+      width: entry.naturalWidth || 0,
+      height: entry.naturalHeight || 0,
+    });
+  }
+}).observe({ type: "element", buffered: true });
+
+register("element_timing", () => elements);
@@ -0,0 +1,9 @@
+// First Input Delay: từ entry first-input
+let fid = 0;
+
+new PerformanceObserver((entryList) => {
+  const entry = entryList.getEntries()[0];
+  if (entry) fid = entry.processingStart - entry.startTime;
+}).observe({ type: "first-input", buffered: true });
+
+register("fid", () => ({ value: fid }));
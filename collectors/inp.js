@@ -0,0 +1,17 @@
+// Interaction to Next Paint: duration lớn nhất theo interactionId,
+// bỏ qua 1 interaction chậm nhất cho mỗi 50 interaction (≈ p98)
+const interactions = new Map();
+
+new PerformanceObserver((entryList) => {
+  for (const entry of entryList.getEntries()) {
+    if (!entry.interactionId) continue;
+    const prev = interactions.get(entry.interactionId) || 0;
+    interactions.set(entry.interactionId, Math.max(prev, entry.duration));
+  }
+}).observe({ type: "event", buffered: true, durationThreshold: 16 });
+
+register("inp", () => {
+  const durations = [...interactions.values()].sort((a, b) => b - a);
+  const skip = Math.min(durations.length - 1, Math.floor(durations.length / 50));
+  return { value: durations.length ? durations[skip] : 0, interactions: durations.length };
+});
@@ -0,0 +1,12 @@
+// Largest Contentful Paint: entry cuối cùng là LCP cuối
+let lcp = 0;
+let lcpElement = null;
+
+new PerformanceObserver((entryList) => {
+  for (const entry of entryList.getEntries()) {
+    lcp = entry.renderTime || entry.loadTime || entry.startTime;
+    lcpElement = entry.element ? entry.element.tagName.toLowerCase() : null;
+  }
+}).observe({ type: "largest-contentful-paint", buffered: true });
+
+register("lcp", () => ({ value: lcp, element: lcpElement }));
@@ -0,0 +1,32 @@
+// Long tasks (> 50ms) trên main thread + Total Blocking Time
+// TBT = tổng (duration - 50ms) của các long task sau First Contentful Paint
+const longTasks = [];
+
+new PerformanceObserver((entryList) => {
+  for (const entry of entryList.getEntries()) {
+    longTasks.push({ start: entry.startTime, duration: entry.duration });
+  }
+}).observe({ type: "longtask", buffered: true });
+
+register("long_tasks", () => {
+  const fcpEntry = performance.getEntriesByName("first-contentful-paint")[0];
+  const fcp = fcpEntry ? fcpEntry.startTime : 0;
+
+  let tbt = 0;
+  let total = 0;
+  let longest = 0;
+  for (const t of longTasks) {
+    total += t.duration;
+    longest = Math.max(longest, t.duration);
+    if (t.start >= fcp) tbt += Math.max(0, t.duration - 50);
+  }
+
+  return {
+    count: longTasks.length,
+    total: total,
+    longest: longest,
+    tbt: tbt,
+    fcp: fcp,
+    tasks: longTasks.slice(0, 50),
+  };
+});
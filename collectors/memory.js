@@ -0,0 +1,10 @@
+// JS heap (Chrome performance.memory) + số DOM node
+register("memory", () => {
+  const m = performance.memory || {};
+  return {
+    usedJSHeapSize: m.usedJSHeapSize || 0,
+    totalJSHeapSize: m.totalJSHeapSize || 0,
+    jsHeapSizeLimit: m.jsHeapSizeLimit || 0,
+    domNodes: document.getElementsByTagName("*").length,
+  };
+});
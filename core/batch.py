@@ -1,39 +1,109 @@
 import asyncio
+from urllib.parse import urlsplit
+
+from core.emulation import get_profile
 from core.scanner import scan_async
+from core.writer import get_writer
+
+# Số scan chạy song song tối đa cho cả batch
+MAX_IN_FLIGHT = 8
+
+# Số scan song song tối đa trên cùng một host – tránh dồn tải
+# vào một origin làm sai lệch số đo
+PER_HOST_LIMIT = 2
+
+
+def _host_of(url: str) -> str:
+    host = urlsplit(url).hostname
+    return host.lower() if host else url
 
 
-async def _scan_one(url: str, index: int, callback_progress=None):
+async def _scan_one(
+    url: str,
+    index: int,
+    callback_progress=None,
+    slots: asyncio.Semaphore = None,
+    host_slots: asyncio.Semaphore = None,
+    profile: str = None,
+):
     """
     Scan 1 URL, có callback báo tiến trình lên UI.
+    Chờ slot của host trước rồi mới tới slot chung, để URL đang
+    chờ host bận không giữ chỗ của các host khác.
     """
-    try:
-        data = await scan_async(url)
+    async with host_slots, slots:
         if callback_progress:
-            callback_progress(index, url, "done", data)
-        return data
+            callback_progress(index, url, "scanning", None)
 
-    except Exception as e:
-        if callback_progress:
-            callback_progress(index, url, f"error: {e}", None)
-        return None
+        try:
+            data = await scan_async(url, profile=profile)
+            if callback_progress:
+                callback_progress(index, url, "done", data)
+            return data
+
+        except Exception as e:
+            if callback_progress:
+                callback_progress(index, url, f"error: {e}", None)
+            return None
 
 
-async def _scan_list(urls: list, callback_progress=None):
+async def _scan_list(
+    urls: list,
+    callback_progress=None,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    per_host_limit: int = PER_HOST_LIMIT,
+    profile: str = None,
+):
     """
-    Scan list URL theo hàng đợi tuần tự (sequential).
+    Scan list URL song song (bounded concurrency).
+    Callback được gọi theo thứ tự hoàn thành; kết quả trả về
+    vẫn giữ thứ tự của danh sách URL đầu vào.
     """
-    results = []
+    slots = asyncio.Semaphore(max(1, max_in_flight))
+    host_slots = {}
+
+    tasks = []
     for idx, url in enumerate(urls):
-        if callback_progress:
-            callback_progress(idx, url, "scanning", None)
+        host = _host_of(url)
+        if host not in host_slots:
+            host_slots[host] = asyncio.Semaphore(max(1, per_host_limit))
 
-        data = await _scan_one(url, idx, callback_progress)
-        results.append((url, data))
-    return results
+        tasks.append(
+            _scan_one(url, idx, callback_progress, slots, host_slots[host], profile)
+        )
+
+    results = await asyncio.gather(*tasks)
+    return list(zip(urls, results))
 
 
-def batch_scan(urls: list, callback_progress=None):
+def batch_scan(
+    urls: list,
+    callback_progress=None,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    per_host_limit: int = PER_HOST_LIMIT,
+    processes: int = None,
+    profile: str = None,
+):
     """
     Wrapper chạy async trong sync context.
+    profile: emulation profile (core.emulation) cho mọi URL của batch.
+
+    processes > 1: chia batch cho nhiều worker process (core.farm),
+    mỗi process tự chạy Playwright; max_in_flight khi đó tính theo
+    WORKER_IN_FLIGHT của từng worker.
     """
-    return asyncio.run(_scan_list(urls, callback_progress))
+    # Sai tên profile → báo lỗi ngay, không để mọi URL cùng lỗi
+    get_profile(profile)
+
+    if processes is not None and processes > 1:
+        from core.farm import farm_scan
+
+        return farm_scan(urls, callback_progress, processes, per_host_limit, profile)
+
+    results = asyncio.run(
+        _scan_list(urls, callback_progress, max_in_flight, per_host_limit, profile)
+    )
+
+    # Kết quả đã nằm trong history khi batch_scan trả về
+    get_writer().flush()
+    return results
@@ -0,0 +1,286 @@
+import asyncio
+import atexit
+import threading
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+"""
+Browser Pool – WebSpeed PRO
+Giữ sẵn N tiến trình Chromium "ấm" để mọi lần scan dùng chung:
+ - Mỗi lần scan nhận một BrowserContext mới (cô lập cookie/cache)
+ - Health check trước khi cấp phát, tự thay browser bị crash
+ - Recycle browser sau K lần scan để tránh rò rỉ bộ nhớ
+
+Playwright object gắn với event loop đã tạo ra nó, nên pool chạy
+trên một loop riêng (thread nền). `scan`, `scan_async` và `batch_scan`
+đều gửi coroutine vào loop này.
+"""
+
+POOL_SIZE = 2
+MAX_SCANS_PER_BROWSER = 50
+CONTEXTS_PER_BROWSER = 4
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.active = 0
+        self.served = 0
+        self.retiring = False
+
+    def healthy(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_scans: int = MAX_SCANS_PER_BROWSER,
+        contexts_per_browser: int = CONTEXTS_PER_BROWSER,
+    ):
+        self.size = size
+        self.max_scans = max_scans
+        self.contexts_per_browser = contexts_per_browser
+
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        # state below is only touched from the pool loop
+        self._playwright = None
+        self._browsers = []
+        self._retired = []
+        self._slots = None
+        self._start_lock = asyncio.Lock()
+        # browser thay thế đang được launch nền (xem _spawn_launch)
+        self._launching = 0
+        self._tasks = set()
+
+    # -----------------------------------------------------------
+    # LOOP THREAD
+    # -----------------------------------------------------------
+    def _ensure_loop(self):
+        with self._thread_lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="browser-pool", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, coro):
+        """
+        Chạy coroutine trên loop của pool, trả về concurrent.futures.Future.
+        """
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro):
+        """
+        Blocking call – dùng từ code sync (scan()).
+        """
+        return self.submit(coro).result()
+
+    async def run_async(self, coro):
+        """
+        Await từ một event loop khác (vd. loop của batch_scan).
+        Cancel phía caller sẽ cancel luôn task bên pool.
+        """
+        self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    # -----------------------------------------------------------
+    # BROWSER LIFECYCLE (chạy trên loop của pool)
+    # -----------------------------------------------------------
+    async def _start(self):
+        async with self._start_lock:
+            if self._playwright is not None:
+                return
+            self._playwright = await async_playwright().start()
+            self._slots = asyncio.Semaphore(self.size * self.contexts_per_browser)
+            browsers = await asyncio.gather(
+                *(self._launch() for _ in range(self.size))
+            )
+            self._browsers = [_PooledBrowser(b) for b in browsers]
+
+    async def _launch(self):
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _retire(self, entry: _PooledBrowser):
+        """
+        Đưa browser ra khỏi pool; browser cũ được đóng khi context cuối
+        cùng của nó kết thúc. Browser thay thế do _acquire launch – hàm
+        này chạy cả trên đường trả context nên không launch, không raise.
+        """
+        if entry.retiring:
+            return
+        entry.retiring = True
+
+        if entry in self._browsers:
+            self._browsers.remove(entry)
+        self._retired.append(entry)
+        await self._close_if_idle(entry)
+
+    def _refill(self):
+        for _ in range(self.size - len(self._browsers) - self._launching):
+            self._spawn_launch()
+
+    def _spawn_launch(self):
+        self._launching += 1
+        task = asyncio.get_running_loop().create_task(self._launch_into_pool())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _launch_into_pool(self):
+        try:
+            browser = await self._launch()
+        except Exception:
+            # _acquire sẽ thử lại ở lần cấp phát sau
+            return
+        finally:
+            self._launching -= 1
+
+        if self._playwright is None:
+            # pool đã shutdown trong lúc launch
+            try:
+                await browser.close()
+            except Exception:
+                pass
+            return
+        self._browsers.append(_PooledBrowser(browser))
+
+    async def _close_if_idle(self, entry: _PooledBrowser):
+        if entry.active > 0 or entry not in self._retired:
+            return
+        self._retired.remove(entry)
+        try:
+            await entry.browser.close()
+        except Exception:
+            # browser đã chết sẵn
+            pass
+
+    async def _acquire(self) -> _PooledBrowser:
+        # Health check: browser crash / mất kết nối thì thay ngay
+        for entry in list(self._browsers):
+            if not entry.browser.is_connected():
+                await self._retire(entry)
+
+        while True:
+            candidates = [b for b in self._browsers if b.healthy()]
+            if candidates:
+                break
+            # Không còn browser nào dùng được: scan này phải chờ launch –
+            # ưu tiên browser thay thế đang launch nền thay vì launch thêm
+            if self._tasks:
+                await asyncio.wait(set(self._tasks), return_when=asyncio.FIRST_COMPLETED)
+                continue
+            self._browsers.append(_PooledBrowser(await self._launch()))
+
+        # Bù browser đã retire / launch lỗi ở nền – scan hiện tại dùng
+        # browser đang có, không chờ Chromium khởi động
+        self._refill()
+
+        return min(candidates, key=lambda b: b.active)
+
+    # -----------------------------------------------------------
+    # PUBLIC: CONTEXT PER SCAN
+    # -----------------------------------------------------------
+    @asynccontextmanager
+    async def context(self, **options):
+        """
+        Cấp một BrowserContext mới, cô lập cho một lần scan.
+        Phải được dùng bên trong loop của pool (qua run / run_async).
+        """
+        await self._start()
+
+        async with self._slots:
+            entry = await self._acquire()
+            entry.active += 1
+            entry.served += 1
+
+            try:
+                context = await entry.browser.new_context(**options)
+            except Exception:
+                entry.active -= 1
+                await self._retire(entry)
+                raise
+
+            try:
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+                entry.active -= 1
+                if entry.served >= self.max_scans or not entry.browser.is_connected():
+                    await self._retire(entry)
+                    self._refill()
+                else:
+                    await self._close_if_idle(entry)
+
+    # -----------------------------------------------------------
+    # SHUTDOWN
+    # -----------------------------------------------------------
+    async def _shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for entry in self._browsers + self._retired:
+            try:
+                await entry.browser.close()
+            except Exception:
+                pass
+        self._browsers = []
+        self._retired = []
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=15)
+        except Exception:
+            pass
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        self._start_lock = asyncio.Lock()
+
+
+# -----------------------------------------------------------
+# SINGLETON CHO TOÀN PROCESS
+# -----------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BrowserPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,128 @@
+from functools import lru_cache
+from pathlib import Path
+
+"""
+In-page Collectors – WebSpeed PRO
+Mỗi collector là một đoạn JS (thư mục collectors/) gọi register(name, fn)
+trong trang, kèm một hàm Python map dữ liệu thu được vào scan payload.
+
+ - Toàn bộ collector được gộp thành MỘT bundle, build một lần cho mỗi process
+ - Bundle được inject một lần cho mỗi BrowserContext (context.add_init_script)
+ - window.__wsCollect() trả về dữ liệu của mọi collector trong một lần gọi
+   (nằm trong lần evaluate duy nhất của core.scanner)
+
+Thêm collector mới: tạo collectors/<name>.js rồi register_collector(...).
+"""
+
+COLLECTOR_DIR = Path(__file__).resolve().parent.parent / "collectors"
+
+# name -> (script file, apply(value, payload))
+_REGISTRY = {}
+
+
+def register_collector(name: str, script: str, apply):
+    """
+    script: tên file trong collectors/
+    apply(value, payload): ghi dữ liệu của collector vào payload
+    """
+    _REGISTRY[name] = (script, apply)
+    get_bundle.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def get_bundle() -> str:
+    parts = []
+    for name, (script, _) in _REGISTRY.items():
+        source = (COLLECTOR_DIR / script).read_text(encoding="utf-8")
+        # Mỗi collector cô lập trong closure riêng; lỗi một collector
+        # không làm hỏng các collector khác
+        parts.append(
+            f"// ---- {name} ----\n"
+            f"try {{\n(function (register) {{\n{source}\n}})(register);\n"
+            f"}} catch (e) {{ errors[{name!r}] = String(e); }}\n"
+        )
+
+    return (
+        "(() => {\n"
+        "if (window.__wsCollect) return;\n"
+        "const registry = {};\n"
+        "const errors = {};\n"
+        "const register = (name, fn) => { registry[name] = fn; };\n"
+        + "".join(parts)
+        + "window.__wsCollect = () => {\n"
+        "  const out = { _errors: errors };\n"
+        "  for (const [name, fn] of Object.entries(registry)) {\n"
+        "    try { out[name] = fn(); } catch (e) { out[name] = null; errors[name] = String(e); }\n"
+        "  }\n"
+        "  return out;\n"
+        "};\n"
+        "})();\n"
+    )
+
+
+def apply_collectors(collected: dict, payload: dict):
+    """
+    Map dữ liệu từ window.__wsCollect() vào payload.
+    """
+    collected = collected or {}
+    for name, (_, apply) in _REGISTRY.items():
+        value = collected.get(name)
+        if value is None:
+            continue
+        apply(value, payload)
+
+    errors = collected.get("_errors")
+    if errors:
+        payload["collector_errors"] = errors
+
+
+# -----------------------------------------------------------
+# COLLECTOR MẶC ĐỊNH
+# -----------------------------------------------------------
+def _vitals(payload: dict) -> dict:
+    return payload.setdefault("vitals", {"LCP": 0, "FID": 0, "CLS": 0})
+
+
+def _apply_lcp(value, payload):
+    _vitals(payload)["LCP"] = value.get("value", 0)
+    payload["lcp_element"] = value.get("element")
+
+
+def _apply_cls(value, payload):
+    _vitals(payload)["CLS"] = round(value.get("value", 0), 4)
+
+
+def _apply_fid(value, payload):
+    _vitals(payload)["FID"] = value.get("value", 0)
+
+
+def _apply_inp(value, payload):
+    _vitals(payload)["INP"] = value.get("value", 0)
+
+
+def _apply_long_tasks(value, payload):
+    _vitals(payload)["TBT"] = round(value.get("tbt", 0))
+    payload["long_tasks"] = {
+        "count": value.get("count", 0),
+        "total": value.get("total", 0),
+        "longest": value.get("longest", 0),
+        "fcp": value.get("fcp", 0),
+        "tasks": value.get("tasks", []),
+    }
+
+
+def _apply_element_timing(value, payload):
+    payload["element_timing"] = value
+
+
+def _apply_memory(value, payload):
+    payload["memory"] = value
+
+
+register_collector("lcp", "lcp.js", _apply_lcp)
+register_collector("cls", "cls.js", _apply_cls)
+register_collector("fid", "fid.js", _apply_fid)
+register_collector("inp", "inp.js", _apply_inp)
+register_collector("long_tasks", "long_tasks.js", _apply_long_tasks)
+register_collector("element_timing", "element_timing.js", _apply_element_timing)
+register_collector("memory", "memory.js", _apply_memory)
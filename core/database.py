@@ -1,110 +1,1141 @@
+import ast
+import atexit
+import json
+import os
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from core import regression, rollups
+from core.emulation import DEFAULT_PROFILE
+from core.serialization import encode_scan, decode_scan
 
 DB_NAME = "history.db"
 
+# Số connection tối đa mở cùng lúc tới history.db
+POOL_SIZE = 4
+
+# Statement cache của mỗi connection: SQL cố định bên dưới chỉ
+# được compile (prepare) một lần cho mỗi connection
+_STATEMENT_CACHE = 256
+
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",        # reader không chặn writer và ngược lại
+    "PRAGMA synchronous = NORMAL",      # đủ an toàn với WAL, ít fsync hơn
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",       # ~16 MB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 134217728",
+)
+
+
+# ---------------------------------------------------------
+# CONNECTION POOL
+# ---------------------------------------------------------
+class _ConnectionPool:
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE,
+        )
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            return self._open()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        self._idle.put(conn)
+        self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> _ConnectionPool:
+    global _pool
+    with _pool_lock:
+        # DB_NAME có thể bị đổi (CLI, script); process con không dùng lại pool cha
+        if _pool is None or _pool.path != DB_NAME or _pool.pid != os.getpid():
+            if _pool is not None and _pool.pid == os.getpid():
+                _pool.close()
+            _pool = _ConnectionPool(DB_NAME, POOL_SIZE)
+        return _pool
+
+
+@contextmanager
+def _connect():
+    """
+    Mượn một connection từ pool; commit khi thành công, rollback khi lỗi.
+    """
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
+
+
+def close_db():
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+
+
+atexit.register(close_db)
+
 
 # ---------------------------------------------------------
 # INIT DATABASE
 # ---------------------------------------------------------
 def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    vacuum = False
+
+    with _connect() as conn:
+        c = conn.cursor()
+
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS scans(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT,
+                ttfb INTEGER,
+                load INTEGER,
+                lcp INTEGER,
+                size INTEGER,
+                requests INTEGER,
+                created_at TEXT,
+                raw_json TEXT
+            )
+        """)
+
+        # Schema migrations (PRAGMA user_version), mỗi bước một transaction
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        for target, migrate in _MIGRATIONS:
+            if target > version:
+                c.execute("BEGIN")
+                vacuum = migrate(c) or vacuum
+                c.execute(f"PRAGMA user_version = {target}")
+                conn.commit()
+
+    # Trả lại dung lượng sau khi migrate dữ liệu lớn
+    if vacuum:
+        with _connect() as conn:
+            conn.execute("VACUUM")
+
+
+# ---------------------------------------------------------
+# MIGRATIONS
+# ---------------------------------------------------------
+# Migration duyệt dữ liệu cũ theo id, mỗi lần chừng này dòng
+_MIGRATION_CHUNK = 500
+
+def _migrate_payload_blob(c):
+    """
+    v1: raw_json (str(dict), đọc bằng eval) -> payload BLOB nén.
+    """
+    c.execute("ALTER TABLE scans ADD COLUMN payload BLOB")
+
+    # Từng chunk theo id: history lớn không bị nạp hết vào RAM
+    converted = False
+    last_id = 0
+    while True:
+        rows = c.execute(
+            "SELECT id, raw_json FROM scans WHERE raw_json IS NOT NULL AND id > ? "
+            "ORDER BY id LIMIT ?",
+            (last_id, _MIGRATION_CHUNK),
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for id, raw in rows:
+            try:
+                data = ast.literal_eval(raw)
+            except (ValueError, SyntaxError):
+                # giữ nguyên row hỏng, get_scan sẽ trả None
+                continue
+            updates.append((encode_scan(data), id))
+        c.executemany(
+            "UPDATE scans SET payload = ?, raw_json = NULL WHERE id = ?", updates
+        )
+
+        converted = True
+        last_id = rows[-1][0]
+
+    return converted
+
+
+def _migrate_resource_table(c):
+    """
+    v2: bảng resource_timings chuẩn hoá + index, backfill từ payload.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS resource_timings(
+            scan_id INTEGER NOT NULL,
+            host TEXT,
+            third_party INTEGER,
+            initiator_type TEXT,
+            name TEXT,
+            duration REAL,
+            transfer_size INTEGER,
+            start_time REAL
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_rt_scan ON resource_timings(scan_id)")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rt_host_type "
+        "ON resource_timings(host, initiator_type, scan_id)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rt_type "
+        "ON resource_timings(initiator_type, scan_id)"
+    )
+
+    last_id = 0
+    while True:
+        rows = c.execute(
+            "SELECT id, payload FROM scans WHERE payload IS NOT NULL AND id > ? "
+            "ORDER BY id LIMIT ?",
+            (last_id, _MIGRATION_CHUNK),
+        ).fetchall()
+        if not rows:
+            break
+        for id, payload in rows:
+            _insert_resources(c, id, decode_scan(payload))
+        last_id = rows[-1][0]
+
+    return False
+
+
+def _migrate_history_indexes(c):
+    """
+    v3: index cho phân trang / sort / filter trang History.
+    """
+    for col in ("created_at", "url", "ttfb", "load", "lcp"):
+        c.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_scans_{col} ON scans({col}, id)"
+        )
+    return False
+
+
+def _migrate_runs_column(c):
+    """
+    v4: số lần chạy của scan (multi-run lưu median + samples trong payload).
+    """
+    c.execute("ALTER TABLE scans ADD COLUMN runs INTEGER DEFAULT 1")
+    return False
+
+
+def _migrate_profile_column(c):
+    """
+    v5: emulation profile của scan (core.emulation). Scan cũ đều chạy
+    không throttle nên mặc định là profile Desktop.
+    """
+    c.execute("ALTER TABLE scans ADD COLUMN profile TEXT DEFAULT 'Desktop'")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scans_profile ON scans(profile, id)")
+    return False
+
+
+def _migrate_findings_table(c):
+    """
+    v6: kết quả analyzer theo từng rule (core.reanalyze ghi vào).
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS findings(
+            scan_id INTEGER NOT NULL,
+            rule TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            value REAL,
+            threshold REAL,
+            count INTEGER,
+            message TEXT
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_findings_scan ON findings(scan_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_findings_rule ON findings(rule, severity, scan_id)")
+    return False
 
+
+def _migrate_monitors_table(c):
+    """
+    v7: lịch monitor (core.monitor) – mỗi URL một interval riêng.
+    """
     c.execute("""
-        CREATE TABLE IF NOT EXISTS scans(
+        CREATE TABLE IF NOT EXISTS monitors(
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            url TEXT,
-            ttfb INTEGER,
-            load INTEGER,
-            lcp INTEGER,
-            size INTEGER,
-            requests INTEGER,
-            created_at TEXT,
-            raw_json TEXT
+            url TEXT NOT NULL UNIQUE,
+            interval INTEGER NOT NULL,
+            profile TEXT DEFAULT 'Desktop',
+            enabled INTEGER DEFAULT 1,
+            next_run REAL,
+            last_run REAL,
+            last_status TEXT,
+            created_at TEXT
         )
     """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_monitors_due ON monitors(enabled, next_run)")
+    return False
+
+
+def _migrate_rollups(c):
+    """
+    v8: bảng rollups giờ / ngày (core.rollups) + backfill từ scans;
+    cột slim đánh dấu payload đã bị retention thu gọn.
+    """
+    rollups.create_table(c)
+    c.execute("ALTER TABLE scans ADD COLUMN slim INTEGER DEFAULT 0")
+    rollups.rebuild_rollups(c)
+    return False
+
+
+def _migrate_cls_column(c):
+    """
+    v9: cột cls (trang Trends) lấy từ payload cũ, index cho chuỗi
+    thời gian theo URL / profile, dựng lại rollups kèm metric cls.
+    """
+    c.execute("ALTER TABLE scans ADD COLUMN cls REAL")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scans_trend ON scans(url, profile, id)")
+
+    last_id = 0
+    while True:
+        rows = c.execute(
+            "SELECT id, payload, raw_json FROM scans WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, _MIGRATION_CHUNK),
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for id, payload, raw in rows:
+            data = decode_scan_row(payload, raw)
+            if data:
+                updates.append((data.get("vitals", {}).get("CLS"), id))
+        c.executemany("UPDATE scans SET cls = ? WHERE id = ?", updates)
+        last_id = rows[-1][0]
+
+    rollups.rebuild_rollups(c)
+    return False
+
+
+def _migrate_regressions(c):
+    """
+    v10: baseline cuộn + regression phát hiện khi lưu scan (core.regression).
+    Baseline học từ các scan gần nhất, không ghi regression cho history cũ.
+    """
+    regression.create_tables(c)
+    regression.rebuild_baselines(c, rollups.METRICS)
+    return False
+
+
+_MIGRATIONS = [
+    (1, _migrate_payload_blob),
+    (2, _migrate_resource_table),
+    (3, _migrate_history_indexes),
+    (4, _migrate_runs_column),
+    (5, _migrate_profile_column),
+    (6, _migrate_findings_table),
+    (7, _migrate_monitors_table),
+    (8, _migrate_rollups),
+    (9, _migrate_cls_column),
+    (10, _migrate_regressions),
+]
+
 
-    conn.commit()
-    conn.close()
+# ---------------------------------------------------------
+# RESOURCE TIMINGS (bảng chuẩn hoá)
+# ---------------------------------------------------------
+_SQL_INSERT_RESOURCE = """
+    INSERT INTO resource_timings
+        (scan_id, host, third_party, initiator_type, name,
+         duration, transfer_size, start_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _host_of(url: str) -> str:
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def _insert_resources(c, scan_id: int, data: dict):
+    page_host = _host_of(data.get("url", ""))
+
+    rows = []
+    for r in data.get("resources", []):
+        host = _host_of(r.get("name", ""))
+        rows.append((
+            scan_id,
+            host,
+            int(host != page_host),
+            r.get("initiatorType", "other"),
+            r.get("name", ""),
+            r.get("duration", 0),
+            r.get("transferSize", 0),
+            r.get("startTime", 0),
+        ))
+
+    c.executemany(_SQL_INSERT_RESOURCE, rows)
+    return rows
 
 
 # ---------------------------------------------------------
 # SAVE SCAN RESULT
 # ---------------------------------------------------------
-def save_scan(data: dict):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+_SQL_INSERT_SCAN = """
+    INSERT INTO scans (url, ttfb, load, lcp, size, requests, created_at, payload, runs,
+                       profile, cls)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-    c.execute("""
-        INSERT INTO scans (url, ttfb, load, lcp, size, requests, created_at, raw_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+
+def _insert_scan(c, data: dict) -> int:
+    # Thời điểm scan thật (write-behind có thể ghi trễ vài giây)
+    finished = data.get("scan_end")
+    created = datetime.fromtimestamp(finished) if finished else datetime.now()
+
+    profile = (data.get("profile") or {}).get("name", DEFAULT_PROFILE)
+    values = {
+        "ttfb": data["metrics"]["ttfb"],
+        "load": data["metrics"]["load"],
+        "lcp": int(data["vitals"]["LCP"]),
+        "size": data["total_size"],
+        "requests": data["total_requests"],
+        "cls": data["vitals"].get("CLS"),
+    }
+
+    c.execute(_SQL_INSERT_SCAN, (
         data["url"],
-        data["metrics"]["ttfb"],
-        data["metrics"]["load"],
-        int(data["vitals"]["LCP"]),
-        data["total_size"],
-        data["total_requests"],
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        str(data)
+        values["ttfb"],
+        values["load"],
+        values["lcp"],
+        values["size"],
+        values["requests"],
+        created.strftime("%Y-%m-%d %H:%M:%S"),
+        encode_scan(data),
+        data.get("multirun", {}).get("runs", 1),
+        profile,
+        values["cls"],
     ))
+    scan_id = c.lastrowid
 
-    conn.commit()
-    conn.close()
+    rows = _insert_resources(c, scan_id, data)
+
+    # Rollup giờ / ngày cập nhật trong cùng transaction (core.rollups)
+    rollups.update_rollups(c, data["url"], profile, created, values)
+
+    # So với baseline cuộn của URL (core.regression)
+    regression.check_scan(
+        c, scan_id, data["url"], profile, created.strftime("%Y-%m-%d %H:%M:%S"), values,
+        [(r[3], r[1], r[5], r[6]) for r in rows],
+    )
+    return scan_id
+
+
+def save_scan(data: dict):
+    with _connect() as conn:
+        return _insert_scan(conn.cursor(), data)
+
+
+def save_scans(items: list) -> list:
+    """
+    Ghi nhiều scan trong MỘT transaction (một lần fsync).
+    """
+    with _connect() as conn:
+        c = conn.cursor()
+        return [_insert_scan(c, data) for data in items]
 
 
 # ---------------------------------------------------------
 # GET ALL HISTORY
 # ---------------------------------------------------------
+_SQL_HISTORY = """
+    SELECT id, url, ttfb, load, lcp, size, requests, created_at
+    FROM scans ORDER BY id DESC
+"""
+
+
 def get_history():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    with _connect() as conn:
+        return conn.execute(_SQL_HISTORY).fetchall()
 
-    c.execute("SELECT id, url, ttfb, load, lcp, size, requests, created_at FROM scans ORDER BY id DESC")
 
-    rows = c.fetchall()
-    conn.close()
+# ---------------------------------------------------------
+# HISTORY PAGINATION (keyset)
+# ---------------------------------------------------------
+HISTORY_COLUMNS = (
+    "id", "url", "ttfb", "load", "lcp", "size", "requests", "created_at", "runs",
+    "profile",
+)
+
+
+def _history_filters(url_filter=None, date_from=None, date_to=None, profile=None):
+    where = []
+    params = []
+    if profile:
+        where.append("profile = ?")
+        params.append(profile)
+    if url_filter:
+        where.append("url LIKE ?")
+        params.append(f"%{url_filter}%")
+    if date_from:
+        where.append("created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        # date_to tính cả ngày đó
+        where.append("created_at < date(?, '+1 day')")
+        params.append(date_to)
+    return where, params
 
-    return rows
+
+def get_history_page(limit: int = 200, after: tuple = None, sort: str = "id",
+                     descending: bool = True, url_filter: str = None,
+                     date_from: str = None, date_to: str = None,
+                     profile: str = None):
+    """
+    Một trang history, sort phía SQL.
+    after = (giá trị cột sort, id) của dòng cuối trang trước (keyset),
+    nên trang thứ N cũng rẻ như trang đầu (không dùng OFFSET).
+    date_from / date_to: 'YYYY-MM-DD'.
+    """
+    if sort not in HISTORY_COLUMNS:
+        raise ValueError(f"Invalid sort column: {sort}")
+
+    where, params = _history_filters(url_filter, date_from, date_to, profile)
+
+    op = "<" if descending else ">"
+    if after is not None:
+        value, last_id = after
+        if sort == "id":
+            where.append(f"id {op} ?")
+            params.append(last_id)
+        elif value is None:
+            # SQLite xếp NULL nhỏ nhất: DESC -> NULL ở cuối, ASC -> NULL ở đầu
+            if descending:
+                where.append(f"({sort} IS NULL AND id < ?)")
+                params.append(last_id)
+            else:
+                where.append(f"(({sort} IS NULL AND id > ?) OR {sort} IS NOT NULL)")
+                params.append(last_id)
+        else:
+            # (sort, id) so với NULL cho ra NULL – nhánh IS NULL riêng
+            null_branch = f" OR {sort} IS NULL" if descending else ""
+            where.append(f"(({sort}, id) {op} (?, ?){null_branch})")
+            params.extend([value, last_id])
+
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM scans"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {sort} {direction}, id {direction} LIMIT ?"
+    params.append(limit)
+
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def count_history(url_filter: str = None, date_from: str = None,
+                  date_to: str = None, profile: str = None) -> int:
+    where, params = _history_filters(url_filter, date_from, date_to, profile)
+
+    sql = "SELECT COUNT(*) FROM scans"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchone()[0]
 
 
 # ---------------------------------------------------------
 # GET ONE RECORD (FULL JSON)
 # ---------------------------------------------------------
+_SQL_GET_SCAN = "SELECT payload, raw_json FROM scans WHERE id = ?"
+
+
 def get_scan(id: int):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    with _connect() as conn:
+        row = conn.execute(_SQL_GET_SCAN, (id,)).fetchone()
+
+    if not row:
+        return None
+
+    return decode_scan_row(*row)
 
-    c.execute("SELECT raw_json FROM scans WHERE id = ?", (id,))
-    row = c.fetchone()
 
-    conn.close()
+def iter_scan_blobs(chunk_size: int = 500, after_id: int = 0):
+    """
+    Duyệt toàn bộ scans theo id (keyset), mỗi lần một chunk
+    [(id, payload, raw_json)] – blob chưa giải nén, để bên xử lý
+    (vd. worker process) tự decode.
+    """
+    while True:
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT id, payload, raw_json FROM scans WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, chunk_size),
+            ).fetchall()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
 
-    if row:
-        return eval(row[0])     # vì raw_json là string of dict
+
+def decode_scan_row(payload, raw):
+    """
+    Payload của một row scans (payload BLOB, hoặc raw_json của row cũ).
+    """
+    if payload is not None:
+        return decode_scan(payload)
+    if raw is not None:
+        # row cũ chưa migrate được – parse an toàn, không eval
+        try:
+            return ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return None
     return None
 
 
+# ---------------------------------------------------------
+# FINDINGS (kết quả analyzer)
+# ---------------------------------------------------------
+_SQL_INSERT_FINDING = """
+    INSERT INTO findings (scan_id, rule, severity, value, threshold, count, message)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def replace_findings(first_id: int, last_id: int, rows: list):
+    """
+    Thay findings của các scan có id trong [first_id, last_id] bằng rows
+    (scan_id, rule, severity, value, threshold, count, message)
+    – một transaction cho cả chunk.
+    """
+    with _connect() as conn:
+        conn.execute(
+            "DELETE FROM findings WHERE scan_id BETWEEN ? AND ?", (first_id, last_id)
+        )
+        conn.executemany(_SQL_INSERT_FINDING, rows)
+
+
+def get_findings(scan_id: int):
+    with _connect() as conn:
+        return conn.execute(
+            "SELECT rule, severity, value, threshold, count, message "
+            "FROM findings WHERE scan_id = ?",
+            (scan_id,),
+        ).fetchall()
+
+
+def count_findings(rule: str = None, severity: str = None):
+    """
+    [(rule, severity, số scan)] – scan nào vi phạm rule nào, bao nhiêu lần.
+    """
+    where = []
+    params = []
+    if rule:
+        where.append("rule = ?")
+        params.append(rule)
+    if severity:
+        where.append("severity = ?")
+        params.append(severity)
+
+    sql = "SELECT rule, severity, COUNT(DISTINCT scan_id) FROM findings"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " GROUP BY rule, severity ORDER BY 3 DESC"
+
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
 # ---------------------------------------------------------
 # DELETE ONE RECORD
 # ---------------------------------------------------------
 def delete_history(id: int):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT url, profile, created_at FROM scans WHERE id = ?", (id,)
+        ).fetchone()
 
-    c.execute("DELETE FROM scans WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+        # Scan nằm trong cửa sổ baseline (core.regression): dựng lại baseline
+        # của URL sau khi xoá để outlier đã xoá không còn ảnh hưởng
+        in_baseline = row is not None and regression.in_window(
+            conn, id, row[0], row[1] or DEFAULT_PROFILE
+        )
+
+        conn.execute("DELETE FROM findings WHERE scan_id = ?", (id,))
+        conn.execute("DELETE FROM regressions WHERE scan_id = ?", (id,))
+        conn.execute("DELETE FROM resource_timings WHERE scan_id = ?", (id,))
+        conn.execute("DELETE FROM scans WHERE id = ?", (id,))
+
+        if row is None:
+            return
+        url, profile, created_at = row
+        profile = profile or DEFAULT_PROFILE
+
+        # Bucket giờ / ngày chứa scan đã xoá: tính lại từ các scan còn lại
+        try:
+            created = datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            created = None
+        if created is not None:
+            rollups.rebuild_buckets(conn.cursor(), url, profile, created)
+
+        if in_baseline:
+            regression.rebuild_pair(conn.cursor(), url, profile, rollups.METRICS)
 
 
 # ---------------------------------------------------------
 # DELETE ALL
 # ---------------------------------------------------------
 def clear_history():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    with _connect() as conn:
+        conn.execute("DELETE FROM findings")
+        conn.execute("DELETE FROM resource_timings")
+        conn.execute("DELETE FROM scans")
+        conn.execute("DELETE FROM rollups")
+        conn.execute("DELETE FROM baselines")
+        conn.execute("DELETE FROM regressions")
+
+
+# ---------------------------------------------------------
+# CROSS-SCAN RESOURCE QUERIES
+# ---------------------------------------------------------
+_LAST_SCANS = "SELECT id FROM scans ORDER BY id DESC LIMIT ?"
+
+
+def get_host_stats(last_scans: int = 1000, initiator_type: str = None,
+                   third_party_only: bool = False):
+    """
+    Thống kê theo host trên N scan gần nhất:
+    (host, requests, scans, avg_duration, max_duration, total_size)
+    """
+    sql = f"""
+        SELECT host, COUNT(*), COUNT(DISTINCT scan_id),
+               AVG(duration), MAX(duration), SUM(transfer_size)
+        FROM resource_timings
+        WHERE scan_id IN ({_LAST_SCANS})
+    """
+    params = [last_scans]
+    if initiator_type:
+        sql += " AND initiator_type = ?"
+        params.append(initiator_type)
+    if third_party_only:
+        sql += " AND third_party = 1"
+    sql += " GROUP BY host ORDER BY AVG(duration) DESC"
+
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def get_slowing_hosts(last_scans: int = 1000, initiator_type: str = "script",
+                      third_party_only: bool = True, min_samples: int = 5):
+    """
+    Host nào chậm đi: so sánh duration trung bình của nửa cũ và nửa mới
+    trong N scan gần nhất.
+    (host, old_avg, new_avg, delta, samples) – delta lớn nhất đứng đầu.
+    """
+    with _connect() as conn:
+        # scan_id chia đôi cửa sổ
+        ids = conn.execute(_LAST_SCANS, (last_scans,)).fetchall()
+        if len(ids) < 2:
+            return []
+        oldest = ids[-1][0]
+        pivot = ids[len(ids) // 2][0]
+
+        sql = """
+            SELECT host,
+                   AVG(CASE WHEN scan_id < ? THEN duration END) AS old_avg,
+                   AVG(CASE WHEN scan_id >= ? THEN duration END) AS new_avg,
+                   COUNT(*)
+            FROM resource_timings
+            WHERE scan_id >= ?
+        """
+        params = [pivot, pivot, oldest]
+        if initiator_type:
+            sql += " AND initiator_type = ?"
+            params.append(initiator_type)
+        if third_party_only:
+            sql += " AND third_party = 1"
+        sql += """
+            GROUP BY host
+            HAVING COUNT(*) >= ? AND old_avg IS NOT NULL AND new_avg IS NOT NULL
+            ORDER BY new_avg - old_avg DESC
+        """
+        params.append(min_samples)
+
+        rows = conn.execute(sql, params).fetchall()
+
+    return [(host, old, new, new - old, n) for host, old, new, n in rows]
+
+
+def get_resource_series(host: str, initiator_type: str = None,
+                        last_scans: int = 1000):
+    """
+    Chuỗi thời gian resource của một host:
+    (scan_id, created_at, name, duration, transfer_size)
+    """
+    sql = f"""
+        SELECT r.scan_id, s.created_at, r.name, r.duration, r.transfer_size
+        FROM resource_timings r JOIN scans s ON s.id = r.scan_id
+        WHERE r.host = ? AND r.scan_id IN ({_LAST_SCANS})
+    """
+    params = [host.lower(), last_scans]
+    if initiator_type:
+        sql += " AND r.initiator_type = ?"
+        params.append(initiator_type)
+    sql += " ORDER BY r.scan_id"
+
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+# ---------------------------------------------------------
+# ROLLUPS + RETENTION
+# ---------------------------------------------------------
+# Mặc định: payload đầy đủ 90 ngày, dòng scan 1 năm, rollup giờ 90 ngày,
+# rollup ngày giữ mãi (None = không giới hạn)
+BLOB_RETENTION_DAYS = 90
+RAW_RETENTION_DAYS = 365
+HOURLY_RETENTION_DAYS = 90
+
+_RETENTION_CHUNK = 500
+
+
+def get_rollups(url: str, metric: str, granularity: str = "day", since: str = None,
+                until: str = None, profile: str = DEFAULT_PROFILE) -> list:
+    """
+    [{bucket, count, min, p50, p75, p95, max, sum}] theo thứ tự thời gian.
+    since / until so với bucket ('YYYY-MM-DD' hoặc 'YYYY-MM-DD HH:00').
+    """
+    if granularity not in rollups.GRANULARITIES:
+        raise ValueError(f"Invalid granularity: {granularity}")
+
+    sql = f"""
+        SELECT {', '.join(rollups.ROLLUP_COLUMNS)} FROM rollups
+        WHERE granularity = ? AND url = ? AND profile = ? AND metric = ?
+    """
+    params = [granularity, url, profile, metric]
+    if since:
+        sql += " AND bucket >= ?"
+        params.append(since)
+    if until:
+        sql += " AND bucket <= ?"
+        params.append(until)
+    sql += " ORDER BY bucket"
+
+    with _connect() as conn:
+        return [dict(zip(rollups.ROLLUP_COLUMNS, r)) for r in conn.execute(sql, params)]
+
+
+def rebuild_rollups():
+    with _connect() as conn:
+        return rollups.rebuild_rollups(conn.cursor())
+
+
+def _slim_payload(data: dict) -> dict:
+    """
+    Bản thu gọn: giữ số đo tổng, bỏ danh sách resource / chi tiết lớn.
+    """
+    slim = {k: v for k, v in data.items()
+            if k not in ("resources", "slowest", "element_timing")}
+    slim["resources"] = []
+    slim["slowest"] = []
+    slim["slim"] = True
+
+    if isinstance(slim.get("long_tasks"), dict):
+        slim["long_tasks"] = {k: v for k, v in slim["long_tasks"].items() if k != "tasks"}
+    if isinstance(slim.get("multirun"), dict):
+        slim["multirun"] = {k: v for k, v in slim["multirun"].items() if k != "samples"}
+    return slim
+
+
+def apply_retention(blob_days: int = BLOB_RETENTION_DAYS,
+                    raw_days: int = RAW_RETENTION_DAYS,
+                    hourly_days: int = HOURLY_RETENTION_DAYS,
+                    now: datetime = None) -> dict:
+    """
+    - scan cũ hơn blob_days: payload thu gọn, xoá resource_timings
+    - scan cũ hơn raw_days: xoá hẳn (findings, resource_timings)
+    - rollup giờ cũ hơn hourly_days: xoá (rollup ngày vẫn còn)
+    Trend dài hạn vẫn đọc được từ rollups. Mỗi chunk một transaction.
+    """
+    now = now or datetime.now()
+
+    def cutoff(days):
+        return (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    stats = {"slimmed": 0, "deleted": 0, "hourly_deleted": 0}
+
+    if blob_days is not None:
+        while True:
+            with _connect() as conn:
+                rows = conn.execute(
+                    "SELECT id, payload, raw_json FROM scans "
+                    "WHERE slim = 0 AND created_at < ? LIMIT ?",
+                    (cutoff(blob_days), _RETENTION_CHUNK),
+                ).fetchall()
+                if not rows:
+                    break
+
+                updates = []
+                for id, payload, raw in rows:
+                    data = decode_scan_row(payload, raw)
+                    blob = encode_scan(_slim_payload(data)) if data else None
+                    updates.append((blob, id))
+
+                conn.executemany(
+                    "UPDATE scans SET payload = ?, raw_json = NULL, slim = 1 WHERE id = ?",
+                    updates,
+                )
+                conn.executemany(
+                    "DELETE FROM resource_timings WHERE scan_id = ?",
+                    [(id,) for _, id in updates],
+                )
+            stats["slimmed"] += len(rows)
 
-    c.execute("DELETE FROM scans")
-    conn.commit()
-    conn.close()
+    if raw_days is not None:
+        while True:
+            with _connect() as conn:
+                ids = [(r[0],) for r in conn.execute(
+                    "SELECT id FROM scans WHERE created_at < ? LIMIT ?",
+                    (cutoff(raw_days), _RETENTION_CHUNK),
+                )]
+                if not ids:
+                    break
+                conn.executemany("DELETE FROM findings WHERE scan_id = ?", ids)
+                conn.executemany("DELETE FROM regressions WHERE scan_id = ?", ids)
+                conn.executemany("DELETE FROM resource_timings WHERE scan_id = ?", ids)
+                conn.executemany("DELETE FROM scans WHERE id = ?", ids)
+            stats["deleted"] += len(ids)
+
+    if hourly_days is not None:
+        with _connect() as conn:
+            stats["hourly_deleted"] = conn.execute(
+                "DELETE FROM rollups WHERE granularity = 'hour' AND bucket < ?",
+                ((now - timedelta(days=hourly_days)).strftime("%Y-%m-%d %H:00"),),
+            ).rowcount
+
+    return stats
+
+
+# ---------------------------------------------------------
+# TRENDS (chuỗi thời gian thô theo URL – core.trends)
+# ---------------------------------------------------------
+def get_max_scan_id() -> int:
+    with _connect() as conn:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM scans").fetchone()[0]
+
+
+def get_scan_urls(profile: str = None) -> list:
+    sql = "SELECT DISTINCT url FROM scans"
+    params = []
+    if profile:
+        sql += " WHERE profile = ?"
+        params.append(profile)
+    sql += " ORDER BY url"
+
+    with _connect() as conn:
+        return [r[0] for r in conn.execute(sql, params)]
+
+
+def _trend_filters(url, profile, since, after_id):
+    where = "url = ? AND profile = ? AND id > ?"
+    params = [url, profile, after_id]
+    if since:
+        where += " AND created_at >= ?"
+        params.append(since)
+    return where, params
+
+
+def count_trend_points(url: str, profile: str = DEFAULT_PROFILE, since: str = None) -> int:
+    where, params = _trend_filters(url, profile, since, 0)
+    with _connect() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM scans WHERE {where}", params).fetchone()[0]
+
+
+def get_trend_points(url: str, metrics: tuple, profile: str = DEFAULT_PROFILE,
+                     since: str = None, after_id: int = 0) -> list:
+    """
+    [(id, created_at, metric1, metric2, ...)] theo id tăng dần – chỉ đọc
+    cột của scans, không giải nén payload. after_id cho cập nhật dần.
+    """
+    for m in metrics:
+        if m not in rollups.METRICS:
+            raise ValueError(f"Invalid metric: {m}")
+
+    where, params = _trend_filters(url, profile, since, after_id)
+    sql = f"SELECT id, created_at, {', '.join(metrics)} FROM scans WHERE {where} ORDER BY id"
+
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+# ---------------------------------------------------------
+# REGRESSIONS (core.regression)
+# ---------------------------------------------------------
+REGRESSION_COLUMNS = ("id", "scan_id", "url", "profile", "created_at", "kind",
+                      "metrics", "resources")
+
+
+def _regression_row(row) -> dict:
+    item = dict(zip(REGRESSION_COLUMNS, row))
+    item["metrics"] = json.loads(item["metrics"] or "[]")
+    item["resources"] = json.loads(item["resources"] or "[]")
+    return item
+
+
+def get_regressions(url_filter: str = None, profile: str = None, limit: int = 100) -> list:
+    """
+    Regression mới nhất trước.
+    """
+    sql = f"SELECT {', '.join(REGRESSION_COLUMNS)} FROM regressions"
+    where = []
+    params = []
+    if url_filter:
+        where.append("url LIKE ?")
+        params.append(f"%{url_filter}%")
+    if profile:
+        where.append("profile = ?")
+        params.append(profile)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+
+    with _connect() as conn:
+        return [_regression_row(r) for r in conn.execute(sql, params)]
+
+
+def get_scan_regression(scan_id: int):
+    with _connect() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(REGRESSION_COLUMNS)} FROM regressions WHERE scan_id = ?",
+            (scan_id,),
+        ).fetchone()
+    return _regression_row(row) if row else None
+
+
+def rebuild_baselines():
+    with _connect() as conn:
+        regression.rebuild_baselines(conn.cursor(), rollups.METRICS)
+
+
+# ---------------------------------------------------------
+# MONITORS (lịch scan định kỳ – core.monitor)
+# ---------------------------------------------------------
+MONITOR_COLUMNS = (
+    "id", "url", "interval", "profile", "enabled", "next_run", "last_run", "last_status",
+)
+
+
+def save_monitor(url: str, interval: int, profile: str = None, next_run: float = None):
+    """
+    Thêm hoặc cập nhật monitor của url (url là duy nhất).
+    """
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO monitors (url, interval, profile, enabled, next_run, created_at)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                interval = excluded.interval,
+                profile = excluded.profile,
+                enabled = 1,
+                next_run = excluded.next_run
+            """,
+            (url, interval, profile or DEFAULT_PROFILE, next_run,
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+
+
+def delete_monitor(url: str) -> bool:
+    with _connect() as conn:
+        return conn.execute("DELETE FROM monitors WHERE url = ?", (url,)).rowcount > 0
+
+
+def set_monitor_enabled(url: str, enabled: bool) -> bool:
+    with _connect() as conn:
+        return conn.execute(
+            "UPDATE monitors SET enabled = ? WHERE url = ?", (int(enabled), url)
+        ).rowcount > 0
+
+
+def get_monitors(enabled_only: bool = False) -> list:
+    sql = f"SELECT {', '.join(MONITOR_COLUMNS)} FROM monitors"
+    if enabled_only:
+        sql += " WHERE enabled = 1"
+    sql += " ORDER BY id"
+
+    with _connect() as conn:
+        return [dict(zip(MONITOR_COLUMNS, r)) for r in conn.execute(sql)]
+
+
+def get_due_monitors(now: float, limit: int = 100) -> list:
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(MONITOR_COLUMNS)} FROM monitors "
+            "WHERE enabled = 1 AND next_run <= ? ORDER BY next_run LIMIT ?",
+            (now, limit),
+        ).fetchall()
+    return [dict(zip(MONITOR_COLUMNS, r)) for r in rows]
+
+
+def get_next_monitor_run():
+    with _connect() as conn:
+        return conn.execute(
+            "SELECT MIN(next_run) FROM monitors WHERE enabled = 1"
+        ).fetchone()[0]
+
+
+def update_monitor_schedule(items: list):
+    """
+    items = [(id, next_run)] – một transaction.
+    """
+    with _connect() as conn:
+        conn.executemany(
+            "UPDATE monitors SET next_run = ? WHERE id = ?",
+            [(next_run, id) for id, next_run in items],
+        )
+
+
+def record_monitor_run(id: int, last_run: float, status: str):
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE monitors SET last_run = ?, last_status = ? WHERE id = ?",
+            (last_run, status, id),
+        )
@@ -0,0 +1,235 @@
+import re
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+"""
+Resource Diff – WebSpeed PRO
+So sánh resource giữa hai scan (payload của get_scan):
+ - Ghép theo URL đã chuẩn hoá: bỏ query cache-busting (?v=, ?_=, ?t=...)
+   và đoạn hash trong tên file (main.3f2a9c1b.js -> main.*.js), nên bản
+   build mới của cùng một bundle vẫn được coi là một resource
+ - Ghép bằng dict (key chuẩn hoá -> danh sách resource): O(n + m),
+   vài nghìn resource mỗi scan vẫn tức thời; phần chưa ghép được thử
+   lại theo host + path (beacon đổi query mỗi lần tải)
+ - Báo cáo added / removed / grown / slowed kèm delta byte và duration,
+   gộp theo (initiatorType, host)
+"""
+
+# Query param chỉ dùng để phá cache
+CACHE_BUST_PARAMS = {
+    "v", "ver", "version", "_", "t", "ts", "timestamp", "cb", "cachebuster",
+    "cache", "nocache", "rev", "build", "hash", "h", "bust",
+}
+
+# Ngưỡng coi là "đổi": max(tuyệt đối, tương đối)
+GROWN_BYTES = 1024
+GROWN_RATIO = 0.10
+SLOWED_MS = 50
+SLOWED_RATIO = 0.20
+
+# Đoạn hash trong tên file (webpack / vite / parcel):
+#  - hex >= 8 ký tự có cả chữ a-f lẫn chữ số (main.3f2a9c1b.js)
+#  - base62 >= 8 ký tự đứng sau "-" / "." (app-BxK2f9Qa.js): có chữ hoa,
+#    chữ thường, ít nhất 2 chữ số và không có đoạn >= 4 chữ thường liền
+#    nhau – tên CamelCase kèm số (Logo_Footer2024.png) không phải hash
+# Chuỗi toàn số (ngày 20240115) hay kích thước 1920x1080 không phải hash.
+_HASH_PART = re.compile(
+    r"""
+    (?<=[.\-_])
+    (?=[0-9a-f]*[a-f])(?=[0-9a-f]*\d)[0-9a-f]{8,}
+    (?=[.\-_])
+  |
+    (?<=[.\-])
+    (?=[A-Za-z0-9]*[a-z])(?=[A-Za-z0-9]*[A-Z])
+    (?=(?:[A-Za-z]*\d){2})
+    (?![A-Za-z0-9]*[a-z]{4})
+    [A-Za-z0-9]{8,}
+    (?=[.\-_])
+    """,
+    re.VERBOSE,
+)
+
+KINDS = ("added", "removed", "grown", "slowed")
+
+
+def normalize_url(url: str) -> str:
+    """
+    URL -> key so khớp: host + path (đã bỏ hash) + query (đã bỏ cache-busting).
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    path = parts.path
+    head, _, name = path.rpartition("/")
+    if name:
+        # Thêm "." giả ở cuối để hash nằm ngay trước đuôi file cũng khớp
+        name = _HASH_PART.sub("*", name + ".")[:-1]
+        path = f"{head}/{name}"
+
+    query = ""
+    if parts.query:
+        kept = sorted(
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k.lower() not in CACHE_BUST_PARAMS
+        )
+        query = urlencode(kept)
+
+    key = f"{(parts.hostname or '').lower()}{path}"
+    return f"{key}?{query}" if query else key
+
+
+def _host(url: str) -> str:
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def _keys(before: list, after: list, key) -> tuple:
+    """
+    Key của từng resource. Nếu trong cùng một scan có hai URL khác nhau
+    cho ra cùng key (vd. hai ảnh chỉ khác đoạn bị bỏ), key đó không còn
+    phân biệt được: các resource đó dùng URL gốc.
+    """
+    keyed = []
+    ambiguous = set()
+    for resources in (before, after):
+        ks = [key(r.get("name", "")) for r in resources]
+        seen = {}
+        for k, r in zip(ks, resources):
+            seen.setdefault(k, set()).add(r.get("name", ""))
+        for k, found in seen.items():
+            if len(found) > 1:
+                ambiguous.add(k)
+        keyed.append(ks)
+
+    return tuple(
+        [r.get("name", "") if k in ambiguous else k for k, r in zip(ks, resources)]
+        for ks, resources in zip(keyed, (before, after))
+    )
+
+
+def _match(before: list, after: list, key) -> tuple:
+    """
+    Ghép resource theo key (dict index, O(n + m)); cùng key nhiều lần thì
+    ghép theo thứ tự. -> (cặp (before, after), before thừa, after thừa)
+    """
+    keys_before, keys_after = _keys(before, after, key)
+
+    index = {}
+    for k, r in zip(keys_before, before):
+        index.setdefault(k, []).append(r)
+
+    pairs = []
+    added = []
+    for k, r in zip(keys_after, after):
+        candidates = index.get(k)
+        if candidates:
+            pairs.append((candidates.pop(0), r))
+        else:
+            added.append(r)
+
+    removed = [r for items in index.values() for r in items]
+    return pairs, removed, added
+
+
+def _path_key(url: str) -> str:
+    return normalize_url(url).partition("?")[0]
+
+
+def _item(kind, before, after) -> dict:
+    r = after or before
+    bytes_b = (before or {}).get("transferSize", 0) or 0
+    bytes_a = (after or {}).get("transferSize", 0) or 0
+    dur_b = (before or {}).get("duration", 0) or 0
+    dur_a = (after or {}).get("duration", 0) or 0
+    return {
+        "kind": kind,
+        "name": r.get("name", ""),
+        "type": r.get("initiatorType", "other"),
+        "host": _host(r.get("name", "")),
+        "bytes_before": bytes_b,
+        "bytes_after": bytes_a,
+        "bytes_delta": bytes_a - bytes_b,
+        "duration_before": round(dur_b, 1),
+        "duration_after": round(dur_a, 1),
+        "duration_delta": round(dur_a - dur_b, 1),
+    }
+
+
+def diff_resources(before: list, after: list) -> list:
+    """
+    Danh sách thay đổi; resource vừa to ra vừa chậm đi có cả dòng grown
+    lẫn slowed.
+    """
+    pairs, removed, added = _match(before, after, normalize_url)
+
+    # Lượt hai: beacon / tracking pixel đổi query mỗi lần tải
+    # (random=, auid=...) – ghép phần còn lại theo host + path
+    more, removed, added = _match(removed, added, _path_key)
+    pairs.extend(more)
+
+    changes = [_item("added", None, a) for a in added]
+    changes.extend(_item("removed", b, None) for b in removed)
+
+    for b, a in pairs:
+        bytes_b = b.get("transferSize", 0) or 0
+        bytes_a = a.get("transferSize", 0) or 0
+        if bytes_a - bytes_b >= max(GROWN_BYTES, bytes_b * GROWN_RATIO):
+            changes.append(_item("grown", b, a))
+
+        dur_b = b.get("duration", 0) or 0
+        dur_a = a.get("duration", 0) or 0
+        if dur_a - dur_b >= max(SLOWED_MS, dur_b * SLOWED_RATIO):
+            changes.append(_item("slowed", b, a))
+
+    return changes
+
+
+def _group(changes: list) -> list:
+    groups = {}
+    for c in changes:
+        g = groups.get((c["type"], c["host"]))
+        if g is None:
+            g = groups[(c["type"], c["host"])] = {
+                "type": c["type"], "host": c["host"],
+                **{k: 0 for k in KINDS},
+                "bytes_delta": 0, "duration_delta": 0.0,
+            }
+        g[c["kind"]] += 1
+        # grown chỉ cộng byte, slowed chỉ cộng duration: resource có cả hai
+        # dòng không bị cộng hai lần
+        if c["kind"] != "slowed":
+            g["bytes_delta"] += c["bytes_delta"]
+        if c["kind"] != "grown":
+            g["duration_delta"] = round(g["duration_delta"] + c["duration_delta"], 1)
+
+    return sorted(groups.values(), key=lambda g: abs(g["bytes_delta"]), reverse=True)
+
+
+def diff_scans(before: dict, after: dict) -> dict:
+    """
+    Diff hai payload scan. Payload đã bị retention thu gọn (slim) không còn
+    resource – kết quả có cờ "slim".
+    """
+    changes = diff_resources(before.get("resources", []), after.get("resources", []))
+
+    changes.sort(key=lambda c: (
+        KINDS.index(c["kind"]),
+        -abs(c["duration_delta"] if c["kind"] == "slowed" else c["bytes_delta"]),
+    ))
+
+    return {
+        "before": {"url": before.get("url"), "requests": before.get("total_requests"),
+                   "size": before.get("total_size")},
+        "after": {"url": after.get("url"), "requests": after.get("total_requests"),
+                  "size": after.get("total_size")},
+        "slim": bool(before.get("slim") or after.get("slim")),
+        "summary": {
+            **{k: sum(1 for c in changes if c["kind"] == k) for k in KINDS},
+            "bytes_delta": (after.get("total_size") or 0) - (before.get("total_size") or 0),
+        },
+        "groups": _group(changes),
+        "changes": changes,
+    }
@@ -0,0 +1,105 @@
+"""
+Emulation Profiles – WebSpeed PRO
+Máy scan nhanh hơn nhiều so với điện thoại thật của người dùng. Profile
+giả lập mạng chậm / CPU chậm / màn hình mobile cho từng lần scan:
+ - network: Network.emulateNetworkConditions (CDP) – latency, throughput
+ - cpu:     Emulation.setCPUThrottlingRate (CDP) – hệ số chậm
+ - context: option của BrowserContext (viewport, UA, is_mobile...)
+
+Tên profile + thông số được lưu trong payload["profile"] và cột
+scans.profile, để chỉ so sánh các scan cùng điều kiện đo.
+"""
+
+DEFAULT_PROFILE = "Desktop"
+
+_KBPS = 1024 / 8  # kbit/s -> byte/s
+
+# Thông số theo preset của Chrome DevTools / Lighthouse
+_SLOW_4G = {"latency": 150, "download": 1638.4 * _KBPS, "upload": 750 * _KBPS}
+_FAST_3G = {"latency": 562.5, "download": 1474.56 * _KBPS, "upload": 675 * _KBPS}
+_SLOW_3G = {"latency": 2000, "download": 400 * _KBPS, "upload": 400 * _KBPS}
+
+_MOBILE_CONTEXT = {
+    "viewport": {"width": 412, "height": 823},
+    "device_scale_factor": 1.75,
+    "is_mobile": True,
+    "has_touch": True,
+    "user_agent": (
+        "Mozilla/5.0 (Linux; Android 11; moto g power (2022)) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Mobile Safari/537.36"
+    ),
+}
+
+PROFILES = {
+    "Desktop": {"network": None, "cpu": 1, "context": {}},
+    "Slow 4G": {"network": _SLOW_4G, "cpu": 1, "context": {}},
+    "Fast 3G": {"network": _FAST_3G, "cpu": 1, "context": {}},
+    "Slow 3G": {"network": _SLOW_3G, "cpu": 1, "context": {}},
+    "4x CPU": {"network": None, "cpu": 4, "context": {}},
+    # Cấu hình mobile mặc định của Lighthouse
+    "Mobile": {"network": _SLOW_4G, "cpu": 4, "context": _MOBILE_CONTEXT},
+}
+
+
+def get_profile(name: str = None) -> dict:
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown emulation profile: {name}")
+    return PROFILES[name]
+
+
+def context_options(name: str = None) -> dict:
+    """
+    Option truyền cho browser.new_context() (viewport, UA...).
+    """
+    return dict(get_profile(name)["context"])
+
+
+def describe_profile(name: str = None) -> dict:
+    """
+    Bản ghi lưu cùng scan: tên + thông số đã áp dụng.
+    """
+    name = name or DEFAULT_PROFILE
+    profile = get_profile(name)
+    network = profile["network"]
+    viewport = profile["context"].get("viewport")
+
+    return {
+        "name": name,
+        "latency": network["latency"] if network else 0,
+        "download_kbps": round(network["download"] / _KBPS) if network else 0,
+        "upload_kbps": round(network["upload"] / _KBPS) if network else 0,
+        "cpu": profile["cpu"],
+        "mobile": profile["context"].get("is_mobile", False),
+        "viewport": f"{viewport['width']}x{viewport['height']}" if viewport else None,
+    }
+
+
+async def apply_profile(context, page, name: str = None):
+    """
+    Áp throttling qua CDP cho page trước khi navigate.
+    Trả về CDP session (giữ session sống suốt lần đo – throttling
+    mất khi session bị detach), hoặc None nếu profile không throttle.
+    """
+    profile = get_profile(name)
+    network = profile["network"]
+    cpu = profile["cpu"]
+    if not network and cpu <= 1:
+        return None
+
+    cdp = await context.new_cdp_session(page)
+
+    if network:
+        await cdp.send("Network.enable")
+        await cdp.send("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": network["latency"],
+            "downloadThroughput": network["download"],
+            "uploadThroughput": network["upload"],
+        })
+
+    if cpu > 1:
+        await cdp.send("Emulation.setCPUThrottlingRate", {"rate": cpu})
+
+    return cdp
@@ -0,0 +1,120 @@
+import asyncio
+
+from core.browser_pool import get_pool
+from core.scanner import _scan_async, _try_save_scan_async
+from core.multirun import _multi_scan_async
+
+"""
+Scan Executor – WebSpeed PRO
+Chạy scan nền trên loop của browser pool, dùng chung cho mọi trang UI:
+ - submit_scan() trả về ScanJob ngay, không chặn thread gọi
+ - Báo tiến trình theo giai đoạn (core.scanner.STAGES)
+ - Hủy được (cancel) và có timeout cho mỗi scan
+ - Nhiều job chạy song song (vd. 2 URL của trang Compare)
+
+Callback được gọi trên thread của pool; phía Qt cần chuyển về
+GUI thread bằng signal (xem ui/scan_runner.py).
+"""
+
+SCAN_TIMEOUT = 90
+
+
+class ScanTimeout(Exception):
+    pass
+
+
+class ScanJob:
+    def __init__(self, url: str):
+        self.url = url
+        self.stage = "queued"
+        self._future = None
+
+    def cancel(self) -> bool:
+        """
+        Hủy scan; task trên loop của pool nhận CancelledError và
+        BrowserContext được đóng trong finally của pool.
+        """
+        if self._future is None:
+            return False
+        return self._future.cancel()
+
+    def cancelled(self) -> bool:
+        return self._future is not None and self._future.cancelled()
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def result(self, timeout: float = None) -> dict:
+        return self._future.result(timeout)
+
+    def add_done_callback(self, on_done):
+        """
+        on_done(job, data, error) khi scan kết thúc; job đã xong thì gọi
+        ngay (trên thread hiện tại).
+        """
+        def _done(future):
+            try:
+                data = future.result()
+            except Exception as e:
+                on_done(self, None, e)
+            else:
+                on_done(self, data, None)
+
+        self._future.add_done_callback(_done)
+
+
+async def _run_job(job: ScanJob, screenshot_path, save_to_db, timeout, on_progress,
+                   runs=1, warm_runs=0, profile=None):
+    def progress(stage):
+        job.stage = stage
+        if on_progress:
+            on_progress(job, stage)
+
+    if runs > 1 or warm_runs > 0:
+        coro = _multi_scan_async(job.url, runs, warm_runs, progress=progress,
+                                 profile=profile)
+    else:
+        coro = _scan_async(job.url, screenshot_path, progress=progress,
+                           profile=profile)
+
+    try:
+        data = await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        raise ScanTimeout(f"Scan quá thời gian ({timeout}s): {job.url}")
+
+    if save_to_db:
+        await _try_save_scan_async(data)
+
+    progress("done")
+    return data
+
+
+def submit_scan(
+    url: str,
+    on_progress=None,
+    on_done=None,
+    timeout: float = SCAN_TIMEOUT,
+    screenshot_path: str = None,
+    save_to_db: bool = True,
+    runs: int = 1,
+    warm_runs: int = 0,
+    profile: str = None,
+) -> ScanJob:
+    """
+    runs > 1 / warm_runs > 0: multi-run scan (core.multirun), các lần chạy
+    song song trong cùng timeout.
+    profile: emulation profile (core.emulation), vd. "Slow 4G".
+    on_progress(job, stage)
+    on_done(job, data, error) – error là None, Exception, hoặc
+    concurrent.futures.CancelledError khi bị hủy.
+    """
+    job = ScanJob(url)
+    job._future = get_pool().submit(
+        _run_job(job, screenshot_path, save_to_db, timeout, on_progress,
+                 runs, warm_runs, profile)
+    )
+
+    if on_done:
+        job.add_done_callback(on_done)
+
+    return job
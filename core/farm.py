@@ -0,0 +1,213 @@
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+from collections import Counter, deque
+
+"""
+Scan Farm – WebSpeed PRO
+Chia batch cho nhiều process, mỗi process có Playwright + browser pool riêng:
+ - Process cha điều phối: chỉ giao URL cho worker còn slot trống
+   (worker rảnh tự nhận việc tiếp theo → cân bằng tải động)
+ - Giới hạn per-host được giữ trên toàn farm, không chỉ trong 1 process
+ - Worker chết → URL đang chạy được giao lại cho worker khác,
+   worker mới được spawn thay thế
+ - Mọi tiến trình được gom về một luồng callback_progress duy nhất
+"""
+
+# Số scan song song trong mỗi worker process
+WORKER_IN_FLIGHT = 4
+
+# Số lần thử lại một URL khi worker đang chạy nó bị crash
+MAX_ATTEMPTS = 2
+
+# Chu kỳ kiểm tra worker còn sống (giây)
+_POLL_INTERVAL = 0.5
+
+
+# -----------------------------------------------------------
+# WORKER PROCESS
+# -----------------------------------------------------------
+def _worker_main(worker_id: int, inbox, events, profile=None):
+    asyncio.run(_worker_loop(worker_id, inbox, events, profile))
+
+
+async def _worker_loop(worker_id: int, inbox, events, profile=None):
+    from core.browser_pool import get_pool
+    from core.scanner import scan_async
+
+    loop = asyncio.get_running_loop()
+    running = set()
+
+    async def run_task(idx, url):
+        events.put(("progress", worker_id, idx, url, "scanning", None))
+        try:
+            # Ghi DB do process cha đảm nhận (một writer cho cả farm)
+            data = await scan_async(url, save_to_db=False, profile=profile)
+            events.put(("result", worker_id, idx, url, "done", data))
+        except Exception as e:
+            events.put(("result", worker_id, idx, url, f"error: {e}", None))
+
+    while True:
+        task = await loop.run_in_executor(None, inbox.get)
+        if task is None:
+            break
+
+        idx, url = task
+        t = asyncio.create_task(run_task(idx, url))
+        running.add(t)
+        t.add_done_callback(running.discard)
+
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+
+    await loop.run_in_executor(None, get_pool().close)
+
+
+# -----------------------------------------------------------
+# PROCESS CHA: ĐIỀU PHỐI
+# -----------------------------------------------------------
+class _Worker:
+    def __init__(self, ctx, worker_id: int, events, profile=None):
+        self.id = worker_id
+        self.inbox = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.inbox, events, profile),
+            daemon=True,
+        )
+        self.process.start()
+        self.assigned = {}  # idx -> url
+        self.free = WORKER_IN_FLIGHT
+
+
+def farm_scan(
+    urls: list,
+    callback_progress=None,
+    processes: int = None,
+    per_host_limit: int = 2,
+    profile: str = None,
+):
+    """
+    Scan list URL trên nhiều process. Trả về [(url, data)] theo thứ tự đầu vào.
+    profile: emulation profile (core.emulation) áp dụng cho mọi URL.
+    """
+    from core.batch import _host_of
+    from core.writer import get_writer
+
+    if not urls:
+        return []
+
+    processes = max(1, min(processes or os.cpu_count() or 1, len(urls)))
+
+    # spawn: không fork process đang có thread (Qt, browser pool)
+    ctx = mp.get_context("spawn")
+    events = ctx.Queue()
+
+    workers = {i: _Worker(ctx, i, events, profile) for i in range(processes)}
+    next_id = processes
+    respawns_left = processes * MAX_ATTEMPTS
+
+    hosts = [_host_of(u) for u in urls]
+    pending = deque(range(len(urls)))
+    host_busy = Counter()
+    attempts = Counter()
+    results = [None] * len(urls)
+    remaining = len(urls)
+
+    def report(idx, status, data):
+        if callback_progress:
+            callback_progress(idx, urls[idx], status, data)
+
+    def finish(idx, status, data):
+        nonlocal remaining
+        results[idx] = data
+        remaining -= 1
+        report(idx, status, data)
+
+    def dispatch():
+        for w in workers.values():
+            if w.free <= 0 or not pending:
+                continue
+
+            # Lấy URL đầu tiên có host còn slot
+            skipped = []
+            while w.free > 0 and pending:
+                idx = pending.popleft()
+                if host_busy[hosts[idx]] >= per_host_limit:
+                    skipped.append(idx)
+                    continue
+
+                host_busy[hosts[idx]] += 1
+                attempts[idx] += 1
+                w.assigned[idx] = urls[idx]
+                w.free -= 1
+                w.inbox.put((idx, urls[idx]))
+
+            pending.extendleft(reversed(skipped))
+
+    def reap_dead():
+        nonlocal next_id, respawns_left
+        for wid, w in list(workers.items()):
+            if w.process.is_alive():
+                continue
+
+            # Failure isolation: chỉ URL của worker này bị ảnh hưởng
+            for idx in list(w.assigned):
+                host_busy[hosts[idx]] -= 1
+                if attempts[idx] < MAX_ATTEMPTS:
+                    pending.appendleft(idx)
+                    report(idx, "retrying", None)
+                else:
+                    finish(idx, f"error: worker crashed (exit {w.process.exitcode})", None)
+
+            del workers[wid]
+            if remaining > 0 and respawns_left > 0:
+                respawns_left -= 1
+                workers[next_id] = _Worker(ctx, next_id, events, profile)
+                next_id += 1
+
+        # Hết worker và hết lượt spawn lại: báo lỗi phần còn lại
+        if not workers:
+            while pending:
+                finish(pending.popleft(), "error: no scan worker available", None)
+
+    writer = get_writer()
+
+    try:
+        while remaining > 0:
+            reap_dead()
+            dispatch()
+
+            try:
+                kind, wid, idx, url, status, data = events.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            w = workers.get(wid)
+            if w is None or idx not in w.assigned:
+                # Kết quả muộn từ worker đã bị thay thế
+                continue
+
+            if kind == "progress":
+                report(idx, status, data)
+                continue
+
+            del w.assigned[idx]
+            w.free += 1
+            host_busy[hosts[idx]] -= 1
+            if data is not None:
+                writer.submit(data)
+            finish(idx, status, data)
+
+    finally:
+        for w in workers.values():
+            w.inbox.put(None)
+        for w in workers.values():
+            w.process.join(timeout=30)
+            if w.process.is_alive():
+                w.process.terminate()
+
+        writer.flush()
+
+    return list(zip(urls, results))
@@ -0,0 +1,197 @@
+import json
+from datetime import datetime
+
+from core.resources import aggregate_resources
+
+"""
+HAR Export / Import – WebSpeed PRO
+ - scan(url, har_path=...) ghi HAR của lần scan (Playwright record_har_path),
+   sau đó attach_payload() gắn payload WebSpeed vào log["_webspeed"]
+ - load_har(path) dựng lại scan payload từ file HAR: dùng được ngay với
+   core.analyzer.analyze, ResourcePage.set_data và history (save_scan)
+
+HAR do WebSpeed ghi chứa nguyên payload → load lại không mất dữ liệu.
+HAR từ nguồn khác (DevTools, WebPageTest...) được suy ra từ entries +
+pageTimings; vitals không có trong HAR nên bằng 0.
+"""
+
+HAR_EXTENSION = "_webspeed"
+HAR_FORMAT_VERSION = 1
+
+# Các field tính lại được từ resources – không cần lưu trong HAR
+_DERIVED = ("total_size", "total_requests", "breakdown", "slowest")
+
+# HAR _resourceType (Chromium) -> initiatorType của Resource Timing
+_RESOURCE_TYPES = {
+    "image": "img",
+    "script": "script",
+    "stylesheet": "link",
+    "font": "css",
+    "xhr": "xmlhttprequest",
+    "fetch": "fetch",
+    "document": "iframe",
+    "media": "video",
+    "beacon": "beacon",
+    "ping": "beacon",
+}
+
+
+# -----------------------------------------------------------
+# EXPORT
+# -----------------------------------------------------------
+def attach_payload(har_path: str, payload: dict):
+    """
+    Gắn scan payload vào HAR vừa được Playwright ghi (extension field,
+    các tool đọc HAR khác bỏ qua field bắt đầu bằng "_").
+    """
+    with open(har_path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+
+    har["log"][HAR_EXTENSION] = {
+        "version": HAR_FORMAT_VERSION,
+        "payload": {k: v for k, v in payload.items() if k not in _DERIVED},
+    }
+
+    with open(har_path, "w", encoding="utf-8") as f:
+        json.dump(har, f, ensure_ascii=False)
+
+
+# -----------------------------------------------------------
+# IMPORT
+# -----------------------------------------------------------
+def load_har(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+    return har_to_payload(har)
+
+
+def har_to_payload(har: dict) -> dict:
+    log = har["log"]
+
+    ext = log.get(HAR_EXTENSION)
+    if ext and "payload" in ext:
+        payload = dict(ext["payload"])
+    else:
+        payload = _payload_from_entries(log)
+
+    payload["har"] = True
+    payload.update(aggregate_resources(payload.get("resources", []), top_n=10))
+    return payload
+
+
+def _parse_time(value: str) -> float:
+    # "2024-05-01T10:00:00.123Z" / "+07:00"
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _ms(value) -> float:
+    # HAR dùng -1 cho "không áp dụng"
+    return value if value and value > 0 else 0
+
+
+def _initiator_type(entry: dict) -> str:
+    resource_type = entry.get("_resourceType")
+    if resource_type:
+        return _RESOURCE_TYPES.get(resource_type, "other")
+
+    # HAR không có _resourceType (vd. Playwright) → đoán theo mimeType
+    mime = entry["response"].get("content", {}).get("mimeType", "")
+    if mime.startswith("image/"):
+        return "img"
+    if "javascript" in mime:
+        return "script"
+    if mime.startswith("text/css"):
+        return "link"
+    if mime.startswith("font/") or "font" in mime:
+        return "css"
+    if mime.startswith(("video/", "audio/")):
+        return "video"
+    if mime.startswith("text/html"):
+        return "iframe"
+    if "json" in mime:
+        return "fetch"
+    return "other"
+
+
+def _payload_from_entries(log: dict) -> dict:
+    entries = sorted(log.get("entries", []), key=lambda e: e["startedDateTime"])
+    if not entries:
+        raise ValueError("HAR không có entry nào")
+
+    pages = log.get("pages") or []
+    page = pages[0] if pages else None
+    page_id = page["id"] if page else None
+    if page_id:
+        entries = [e for e in entries if e.get("pageref") in (None, page_id)]
+
+    # Document chính = entry đầu tiên trả về HTML (sau các redirect)
+    doc_index = 0
+    for i, e in enumerate(entries):
+        if e["response"].get("content", {}).get("mimeType", "").startswith("text/html"):
+            doc_index = i
+            break
+    document = entries[doc_index]
+
+    origin = _parse_time(page["startedDateTime"] if page else entries[0]["startedDateTime"])
+    doc_start = _parse_time(document["startedDateTime"])
+    t = document.get("timings", {})
+
+    dns = _ms(t.get("dns"))
+    tcp = _ms(t.get("connect"))
+    tls = _ms(t.get("ssl"))
+    redirect = round((doc_start - origin) * 1000)
+    ttfb = _ms(t.get("send")) + _ms(t.get("wait"))
+
+    page_timings = page.get("pageTimings", {}) if page else {}
+    dom = _ms(page_timings.get("onContentLoad"))
+    load = _ms(page_timings.get("onLoad"))
+    if not load:
+        load = round(max(
+            (_parse_time(e["startedDateTime"]) - origin) * 1000 + _ms(e.get("time"))
+            for e in entries
+        ))
+
+    # Các entry sau document chính ~ Resource Timing entries
+    resources = []
+    for e in entries[doc_index + 1:]:
+        response = e["response"]
+        transfer = response.get("_transferSize")
+        if transfer is None or transfer < 0:
+            transfer = _ms(response.get("bodySize")) + _ms(response.get("headersSize"))
+
+        resources.append({
+            "name": e["request"]["url"],
+            "entryType": "resource",
+            "initiatorType": _initiator_type(e),
+            "startTime": round((_parse_time(e["startedDateTime"]) - origin) * 1000, 1),
+            "duration": round(_ms(e.get("time")), 1),
+            "transferSize": transfer,
+            "decodedBodySize": _ms(response.get("content", {}).get("size")),
+            "responseStatus": response.get("status", 0),
+        })
+
+    end = origin + load / 1000
+    return {
+        "url": entries[0]["request"]["url"],
+        "scan_start": origin,
+        "scan_end": end,
+        "scan_duration": round(load),
+        "metrics": {
+            "dns": dns,
+            "tcp": tcp,
+            "tls": tls,
+            "redirect": redirect,
+            "ttfb": ttfb,
+            "dom": dom,
+            "load": load,
+        },
+        "resources": resources,
+        "vitals": {
+            "LCP": 0,
+            "FID": 0,
+            "CLS": 0,
+            "INP": 0,
+            "TBT": 0,
+        },
+        "screenshot": None,
+    }
@@ -0,0 +1,223 @@
+import asyncio
+import random
+import time
+import zlib
+
+from core import database
+
+"""
+Monitor Scheduler – WebSpeed PRO
+Scan định kỳ các URL đã đăng ký (bảng monitors trong history.db):
+ - Mỗi URL có interval riêng; thời điểm chạy nằm trên một "lưới"
+   t = phase + k * interval, phase suy ra từ hash của URL → hàng trăm URL
+   cùng interval được rải đều trong chu kỳ thay vì dồn vào cùng một lúc
+ - Jitter ngẫu nhiên nhỏ quanh mỗi mốc (không cộng dồn, không trôi lịch)
+ - Sau downtime: mỗi URL quá hạn chỉ chạy bù MỘT lần, các lần bù được
+   rải trong CATCHUP_WINDOW theo phase (không chạy lại mọi lần đã lỡ)
+ - Giới hạn đồng thời mặc định lấy theo batch (core.batch.MAX_IN_FLIGHT /
+   PER_HOST_LIMIT); Playwright chỉ được import khi scheduler thật sự chạy
+ - Lịch (next_run) được lưu DB, dừng / khởi động lại không mất lịch
+"""
+
+# Jitter tối đa, tính theo tỉ lệ interval
+JITTER_FRACTION = 0.05
+
+# Các lần chạy bù sau downtime được rải trong khoảng này (giây)
+CATCHUP_WINDOW = 600
+
+# Interval tối thiểu (giây)
+MIN_INTERVAL = 60
+
+# Thời gian ngủ tối đa giữa hai lần kiểm tra lịch (giây) – để thấy
+# monitor mới được thêm từ process khác (CLI)
+MAX_SLEEP = 30
+
+
+# -----------------------------------------------------------
+# LỊCH
+# -----------------------------------------------------------
+def _phase(url: str, interval: int) -> float:
+    """
+    Độ lệch cố định của URL trong chu kỳ (0 <= phase < interval).
+    """
+    return zlib.crc32(url.encode("utf-8")) % (interval * 1000) / 1000
+
+
+def _jitter(interval: int) -> float:
+    j = interval * JITTER_FRACTION
+    return random.uniform(-j, j)
+
+
+def next_slot(url: str, interval: int, now: float) -> float:
+    """
+    Mốc kế tiếp trên lưới của URL sau thời điểm now (chưa cộng jitter).
+    """
+    phase = _phase(url, interval)
+    k = (now - phase) // interval + 1
+    return phase + k * interval
+
+
+def schedule_next(url: str, interval: int, now: float) -> float:
+    """
+    Lần chạy kế tiếp: mốc lưới sau now + biên jitter, cộng jitter.
+    Jitter âm có thể làm một lần chạy bắt đầu ngay TRƯỚC mốc S của nó;
+    tính từ now thì mốc kế tiếp lại là S → chạy hai lần quanh S. Cộng
+    thêm biên jitter tối đa thì mốc vừa chạy (hoặc sắp tới trong biên đó)
+    luôn bị bỏ qua, mỗi mốc chỉ chạy một lần.
+    """
+    margin = interval * JITTER_FRACTION
+    return next_slot(url, interval, now + margin) + _jitter(interval)
+
+
+def add_monitor(url: str, interval: int, profile: str = None):
+    from core.emulation import get_profile
+
+    get_profile(profile)
+    interval = max(MIN_INTERVAL, int(interval))
+    database.save_monitor(url, interval, profile, schedule_next(url, interval, time.time()))
+
+
+def remove_monitor(url: str) -> bool:
+    return database.delete_monitor(url)
+
+
+def _catch_up(now: float):
+    """
+    Monitor đã lỡ ít nhất một chu kỳ đầy đủ (vd. máy tắt vài giờ): đặt lại
+    next_run rải trong CATCHUP_WINDOW (hoặc interval nếu ngắn hơn) theo
+    phase của URL. Monitor chỉ trễ chút ít (restart vài giây) giữ nguyên,
+    scheduler chạy nó ngay như bình thường.
+    Lần bù không rơi sau mốc lưới kế tiếp: mốc đến trước thì chính nó là
+    lần bù; lần bù sát ngay trước mốc thì schedule_next bỏ qua mốc đó.
+    """
+    overdue = database.get_due_monitors(now, limit=1000000)
+    items = []
+    for m in overdue:
+        if m["next_run"] is not None and m["next_run"] > now - m["interval"]:
+            continue
+        window = min(CATCHUP_WINDOW, m["interval"])
+        offset = _phase(m["url"], m["interval"]) / m["interval"] * window
+        regular = schedule_next(m["url"], m["interval"], now)
+        items.append((m["id"], min(now + offset, regular)))
+    if items:
+        database.update_monitor_schedule(items)
+    return len(items)
+
+
+# -----------------------------------------------------------
+# SCHEDULER
+# -----------------------------------------------------------
+class Monitor:
+    def __init__(self, max_in_flight: int = None, per_host_limit: int = None,
+                 on_result=None):
+        """
+        on_result(monitor_row, status, data) – gọi sau mỗi lần scan.
+        """
+        from core.batch import MAX_IN_FLIGHT, PER_HOST_LIMIT
+
+        self.max_in_flight = max(1, max_in_flight or MAX_IN_FLIGHT)
+        self.per_host_limit = max(1, per_host_limit or PER_HOST_LIMIT)
+        self.on_result = on_result
+
+        self._stop = None
+        self._wake = None
+        self._running = {}   # monitor id -> task
+        self._host_slots = {}
+
+    async def run(self):
+        from core.writer import get_writer
+
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        slots = asyncio.Semaphore(self.max_in_flight)
+
+        _catch_up(time.time())
+
+        while not self._stop.is_set():
+            now = time.time()
+
+            # Không lấy quá số slot còn trống: phần còn lại chờ vòng sau
+            free = self.max_in_flight - len(self._running)
+            if free > 0:
+                due = [
+                    m for m in database.get_due_monitors(now, limit=free + len(self._running))
+                    if m["id"] not in self._running
+                ][:free]
+
+                # Chốt lịch kế tiếp ngay khi giao việc (không bị lấy lại lần nữa)
+                database.update_monitor_schedule([
+                    (m["id"], schedule_next(m["url"], m["interval"], now)) for m in due
+                ])
+
+                for m in due:
+                    task = asyncio.create_task(self._run_one(m, slots))
+                    self._running[m["id"]] = task
+                    task.add_done_callback(lambda _, id=m["id"]: self._on_task_done(id))
+
+            await self._sleep(now)
+
+        if self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+        await asyncio.to_thread(get_writer().flush)
+
+    def stop(self):
+        """
+        Dừng vòng lặp (gọi trên loop đang chạy Monitor.run); scan đang
+        chạy được chờ cho xong.
+        """
+        if self._stop is not None:
+            self._stop.set()
+            self._wake.set()
+
+    def _on_task_done(self, id):
+        self._running.pop(id, None)
+        # Có slot trống: kiểm tra lịch ngay thay vì chờ hết giấc ngủ
+        self._wake.set()
+
+    async def _sleep(self, now: float):
+        next_run = database.get_next_monitor_run()
+        delay = MAX_SLEEP if next_run is None else min(MAX_SLEEP, max(0.0, next_run - now))
+        if len(self._running) >= self.max_in_flight:
+            delay = MAX_SLEEP
+
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(delay, 0.05))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_one(self, m: dict, slots: asyncio.Semaphore):
+        from core.batch import _host_of
+        from core.scanner import scan_async
+
+        host = _host_of(m["url"])
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        data = None
+        async with self._host_slots[host], slots:
+            started = time.time()
+            try:
+                data = await scan_async(m["url"], profile=m["profile"])
+                status = "done"
+            except Exception as e:
+                status = f"error: {e}"
+
+        await asyncio.to_thread(database.record_monitor_run, m["id"], started, status)
+
+        if self.on_result:
+            try:
+                self.on_result(m, status, data)
+            except Exception:
+                pass
+
+
+def run_monitor(max_in_flight: int = None, per_host_limit: int = None, on_result=None):
+    """
+    Chạy scheduler (chặn) cho tới khi bị ngắt (Ctrl+C).
+    """
+    monitor = Monitor(max_in_flight, per_host_limit, on_result)
+    try:
+        asyncio.run(monitor.run())
+    except KeyboardInterrupt:
+        pass
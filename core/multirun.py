@@ -0,0 +1,145 @@
+import asyncio
+
+from core.browser_pool import get_pool
+from core.scanner import _scan_async, _try_save_scan, _try_save_scan_async
+from core.stats import summarize
+
+"""
+Multi-run Scan – WebSpeed PRO
+Một lần scan chỉ là một mẫu đo nhiễu. Multi-run chạy N lần song song
+(mỗi lần một BrowserContext riêng trong browser pool) và tổng hợp:
+ - cold runs: context mới, cache trống
+ - warm runs: cùng context đã tải trang một lần trước đó
+ - median / p75 / p95 / stddev / CI 95% cho từng metric
+
+Payload trả về có cùng cấu trúc với scan() thường (analyzer, ResourcePage,
+history dùng được ngay); metrics/vitals là median của cold runs, resource
+list lấy từ lần chạy gần median nhất. Chi tiết nằm ở payload["multirun"].
+"""
+
+DEFAULT_RUNS = 5
+
+# metric -> cách lấy từ payload của một lần scan
+METRICS = {
+    "dns": lambda d: d["metrics"]["dns"],
+    "tcp": lambda d: d["metrics"]["tcp"],
+    "tls": lambda d: d["metrics"]["tls"],
+    "ttfb": lambda d: d["metrics"]["ttfb"],
+    "dom": lambda d: d["metrics"]["dom"],
+    "load": lambda d: d["metrics"]["load"],
+    "LCP": lambda d: d["vitals"]["LCP"],
+    "FID": lambda d: d["vitals"]["FID"],
+    "CLS": lambda d: d["vitals"]["CLS"],
+    "INP": lambda d: d["vitals"].get("INP"),
+    "TBT": lambda d: d["vitals"].get("TBT"),
+    "total_size": lambda d: d["total_size"],
+    "total_requests": lambda d: d["total_requests"],
+}
+
+
+def _sample(data: dict, cache: str) -> dict:
+    sample = {"cache": cache}
+    for name, get in METRICS.items():
+        try:
+            sample[name] = get(data)
+        except (KeyError, TypeError):
+            sample[name] = None
+    return sample
+
+
+def _aggregate(samples: list) -> dict:
+    return {
+        name: summarize([s[name] for s in samples])
+        for name in METRICS
+    }
+
+
+def aggregate_runs(url: str, cold: list, warm: list, failed: int = 0) -> dict:
+    """
+    Gộp kết quả nhiều lần scan thành một payload.
+    """
+    base_runs = cold or warm
+    if not base_runs:
+        raise RuntimeError(f"Tất cả các lần scan {url} đều lỗi")
+
+    samples = [_sample(d, "cold") for d in cold] + [_sample(d, "warm") for d in warm]
+    stats = {}
+    if cold:
+        stats["cold"] = _aggregate([s for s in samples if s["cache"] == "cold"])
+    if warm:
+        stats["warm"] = _aggregate([s for s in samples if s["cache"] == "warm"])
+
+    headline = stats["cold"] if cold else stats["warm"]
+
+    # Lần chạy có load gần median nhất làm đại diện cho resource list
+    median_load = headline["load"].get("median", 0)
+    representative = min(base_runs, key=lambda d: abs(d["metrics"]["load"] - median_load))
+
+    result = dict(representative)
+    result["metrics"] = dict(representative["metrics"])
+    result["vitals"] = dict(representative["vitals"])
+
+    for name in ("dns", "tcp", "tls", "ttfb", "dom", "load"):
+        result["metrics"][name] = round(headline[name].get("median", 0))
+    result["vitals"]["LCP"] = headline["LCP"].get("median", 0)
+    result["vitals"]["FID"] = headline["FID"].get("median", 0)
+    result["vitals"]["CLS"] = round(headline["CLS"].get("median", 0), 4)
+    for name in ("INP", "TBT"):
+        if headline[name].get("n"):
+            result["vitals"][name] = headline[name]["median"]
+
+    result["scan_start"] = min(d["scan_start"] for d in cold + warm)
+    result["scan_end"] = max(d["scan_end"] for d in cold + warm)
+    result["scan_duration"] = round((result["scan_end"] - result["scan_start"]) * 1000)
+
+    result["multirun"] = {
+        "runs": len(cold) + len(warm),
+        "cold_runs": len(cold),
+        "warm_runs": len(warm),
+        "failed": failed,
+        "aggregate": "median",
+        "stats": stats,
+        "samples": samples,
+    }
+    return result
+
+
+async def _multi_scan_async(url: str, runs: int, warm_runs: int, progress=None,
+                            profile: str = None):
+    jobs = [_scan_async(url, None, profile=profile) for _ in range(runs)]
+    jobs += [_scan_async(url, None, warm=True, profile=profile) for _ in range(warm_runs)]
+
+    if progress:
+        progress("navigating")
+
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+
+    if progress:
+        progress("collecting")
+
+    cold = [r for r in results[:runs] if isinstance(r, dict)]
+    warm = [r for r in results[runs:] if isinstance(r, dict)]
+    failed = len(results) - len(cold) - len(warm)
+
+    return aggregate_runs(url, cold, warm, failed)
+
+
+# -----------------------------------------------------------
+# HÀM DÙNG BÊN NGOÀI
+# -----------------------------------------------------------
+def scan_multi(url: str, runs: int = DEFAULT_RUNS, warm_runs: int = 0,
+               save_to_db: bool = True, profile: str = None) -> dict:
+    data = get_pool().run(_multi_scan_async(url, runs, warm_runs, profile=profile))
+    if save_to_db:
+        _try_save_scan(data)
+    return data
+
+
+async def scan_multi_async(url: str, runs: int = DEFAULT_RUNS, warm_runs: int = 0,
+                           save_to_db: bool = True, profile: str = None) -> dict:
+    data = await get_pool().run_async(
+        _multi_scan_async(url, runs, warm_runs, profile=profile)
+    )
+    if save_to_db:
+        await _try_save_scan_async(data)
+    return data
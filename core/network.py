@@ -0,0 +1,185 @@
+from collections import Counter, defaultdict
+
+"""
+Network Capture (CDP) – WebSpeed PRO
+Resource Timing báo transferSize = 0 cho resource cross-origin không có
+Timing-Allow-Origin, nên tổng dung lượng trang bị thiếu phần third-party.
+NetworkRecorder ghi sự kiện Network.* qua Chrome DevTools Protocol:
+ - encodedDataLength (bytes thật trên dây) / decoded bytes
+ - protocol (h2, h3, http/1.1), priority, status, mimeType
+ - cache (memory / disk / service-worker / prefetch / network)
+ - connection reuse, connectionId, remote IP
+rồi merge_network() ghép vào resource list theo URL.
+"""
+
+
+class NetworkRecorder:
+    def __init__(self):
+        self._requests = {}
+        self._finished = []
+        self._cdp = None
+
+    async def attach(self, context, page):
+        cdp = await context.new_cdp_session(page)
+        cdp.on("Network.requestWillBeSent", self._on_request)
+        cdp.on("Network.responseReceived", self._on_response)
+        cdp.on("Network.dataReceived", self._on_data)
+        cdp.on("Network.requestServedFromCache", self._on_served_from_cache)
+        cdp.on("Network.loadingFinished", self._on_finished)
+        cdp.on("Network.loadingFailed", self._on_failed)
+        await cdp.send("Network.enable")
+        self._cdp = cdp
+
+    async def detach(self):
+        if self._cdp is None:
+            return
+        try:
+            await self._cdp.detach()
+        except Exception:
+            pass
+        self._cdp = None
+
+    # -----------------------------------------------------------
+    # CDP EVENTS
+    # -----------------------------------------------------------
+    def _on_request(self, params):
+        rid = params["requestId"]
+
+        # Redirect dùng lại requestId: chốt entry cũ trước khi tạo entry mới
+        redirect = params.get("redirectResponse")
+        if redirect and rid in self._requests:
+            prev = self._requests.pop(rid)
+            self._apply_response(prev, redirect)
+            prev["encoded"] = redirect.get("encodedDataLength", 0)
+            prev["redirected"] = True
+            self._finished.append(prev)
+
+        request = params.get("request", {})
+        self._requests[rid] = {
+            "url": request.get("url", ""),
+            "method": request.get("method", "GET"),
+            "type": params.get("type", "Other"),
+            "priority": request.get("initialPriority", ""),
+            "start": params.get("timestamp", 0),
+            "end": None,
+            "status": None,
+            "mimeType": "",
+            "protocol": "",
+            "cache": "network",
+            "connectionReused": None,
+            "connectionId": None,
+            "remoteIPAddress": "",
+            "encoded": 0,
+            "decoded": 0,
+            "failed": None,
+        }
+
+    def _apply_response(self, entry, response):
+        entry["status"] = response.get("status")
+        entry["mimeType"] = response.get("mimeType", "")
+        entry["protocol"] = response.get("protocol", "")
+        entry["connectionReused"] = response.get("connectionReused")
+        entry["connectionId"] = response.get("connectionId")
+        entry["remoteIPAddress"] = response.get("remoteIPAddress", "")
+
+        if response.get("fromDiskCache"):
+            entry["cache"] = "disk"
+        elif response.get("fromServiceWorker"):
+            entry["cache"] = "service-worker"
+        elif response.get("fromPrefetchCache"):
+            entry["cache"] = "prefetch"
+
+    def _on_response(self, params):
+        entry = self._requests.get(params["requestId"])
+        if entry is not None:
+            self._apply_response(entry, params.get("response", {}))
+
+    def _on_data(self, params):
+        entry = self._requests.get(params["requestId"])
+        if entry is not None:
+            entry["decoded"] += params.get("dataLength", 0)
+
+    def _on_served_from_cache(self, params):
+        entry = self._requests.get(params["requestId"])
+        if entry is not None:
+            entry["cache"] = "memory"
+
+    def _on_finished(self, params):
+        entry = self._requests.pop(params["requestId"], None)
+        if entry is not None:
+            entry["encoded"] = params.get("encodedDataLength", 0)
+            entry["end"] = params.get("timestamp")
+            self._finished.append(entry)
+
+    def _on_failed(self, params):
+        entry = self._requests.pop(params["requestId"], None)
+        if entry is not None:
+            entry["failed"] = params.get("errorText", "failed")
+            entry["end"] = params.get("timestamp")
+            self._finished.append(entry)
+
+    # -----------------------------------------------------------
+    # KẾT QUẢ
+    # -----------------------------------------------------------
+    def entries(self) -> list:
+        """
+        Request đã xong + request còn dang dở (vd. long-poll) theo thứ tự bắt đầu.
+        """
+        return sorted(
+            self._finished + list(self._requests.values()),
+            key=lambda e: e["start"],
+        )
+
+
+def merge_network(resources: list, entries: list) -> dict:
+    """
+    Ghép entry CDP vào resource list (theo URL, theo thứ tự xuất hiện).
+    transferSize = 0 do thiếu Timing-Allow-Origin được thay bằng
+    encodedDataLength thật. Trả về thống kê tổng của toàn bộ network.
+    """
+    by_url = defaultdict(list)
+    for e in entries:
+        if not e.get("redirected"):
+            by_url[e["url"]].append(e)
+
+    matched = 0
+    corrected = 0
+    for r in resources:
+        candidates = by_url.get(r.get("name", ""))
+        if not candidates:
+            continue
+        e = candidates.pop(0)
+        matched += 1
+
+        r["network"] = {
+            "encoded": e["encoded"],
+            "decoded": e["decoded"],
+            "protocol": e["protocol"],
+            "priority": e["priority"],
+            "cache": e["cache"],
+            "connectionReused": e["connectionReused"],
+            "status": e["status"],
+            "mimeType": e["mimeType"],
+        }
+
+        if e["cache"] == "network" and e["encoded"] > 0 and not r.get("transferSize"):
+            r["transferSize"] = e["encoded"]
+            r["sizeSource"] = "cdp"
+            corrected += 1
+        if e["decoded"] > 0 and not r.get("decodedBodySize"):
+            r["decodedBodySize"] = e["decoded"]
+
+    protocols = Counter(e["protocol"] or "unknown" for e in entries)
+    caches = Counter(e["cache"] for e in entries)
+
+    return {
+        "requests": len(entries),
+        "bytes": sum(e["encoded"] for e in entries),
+        "decoded_bytes": sum(e["decoded"] for e in entries),
+        "matched": matched,
+        "corrected_sizes": corrected,
+        "failed": sum(1 for e in entries if e["failed"]),
+        "reused_connections": sum(1 for e in entries if e["connectionReused"]),
+        "protocols": dict(protocols),
+        "cache": dict(caches),
+    }
@@ -0,0 +1,108 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from core.database import count_history, iter_scan_blobs, decode_scan_row, replace_findings
+
+"""
+Bulk Re-analysis – WebSpeed PRO
+Chạy lại core.analyzer trên toàn bộ history (vd. sau khi đổi threshold):
+ - Đọc scans theo chunk (keyset theo id), blob chưa giải nén
+ - Giải nén + analyze trong process pool (mỗi chunk một task)
+ - Process cha ghi kết quả vào bảng findings, một transaction / chunk
+ - progress(done, total) sau mỗi chunk
+
+Cấu hình rule của process cha (core.rules.export_config) được chuyển
+sang worker. Rule tự viết phải được đăng ký khi import module trong
+worker (spawn không mang theo trạng thái runtime của process cha).
+"""
+
+CHUNK_SIZE = 500
+
+
+# -----------------------------------------------------------
+# WORKER
+# -----------------------------------------------------------
+def _init_worker(config: dict):
+    from core.rules import apply_config
+
+    apply_config(config)
+
+
+def _analyze_chunk(rows: list):
+    """
+    rows = [(id, payload, raw_json)] -> (first_id, last_id, finding rows, lỗi)
+    """
+    from core.analyzer import analyze
+
+    findings = []
+    errors = 0
+    for scan_id, payload, raw in rows:
+        try:
+            data = decode_scan_row(payload, raw)
+            if data is None:
+                errors += 1
+                continue
+            for f in analyze(data)["findings"]:
+                findings.append((
+                    scan_id, f["rule"], f["severity"], f["value"],
+                    f["threshold"], f["count"], f["message"],
+                ))
+        except Exception:
+            errors += 1
+
+    return rows[0][0], rows[-1][0], findings, errors
+
+
+# -----------------------------------------------------------
+# HÀM DÙNG BÊN NGOÀI
+# -----------------------------------------------------------
+def reanalyze(processes: int = None, chunk_size: int = CHUNK_SIZE,
+              progress=None) -> dict:
+    """
+    processes = 1: chạy ngay trong process hiện tại.
+    Trả về {"scans", "findings", "errors"}.
+    """
+    from core.rules import export_config
+
+    total = count_history()
+    stats = {"scans": 0, "findings": 0, "errors": 0}
+
+    def collect(result, n):
+        first_id, last_id, findings, errors = result
+        replace_findings(first_id, last_id, findings)
+        stats["scans"] += n
+        stats["findings"] += len(findings)
+        stats["errors"] += errors
+        if progress:
+            progress(stats["scans"], total)
+
+    processes = processes or os.cpu_count() or 1
+    chunks = iter_scan_blobs(chunk_size)
+
+    if processes <= 1:
+        for rows in chunks:
+            collect(_analyze_chunk(rows), len(rows))
+        return stats
+
+    # spawn: giống core.farm, không fork process có thread (Qt, pool DB)
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(export_config(),),
+    ) as pool:
+        # Giới hạn số chunk đang chờ: không đọc cả DB vào RAM trước
+        pending = {}
+        for rows in chunks:
+            pending[pool.submit(_analyze_chunk, rows)] = len(rows)
+
+            while len(pending) >= processes * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    collect(fut.result(), pending.pop(fut))
+
+        for fut in list(pending):
+            collect(fut.result(), pending.pop(fut))
+
+    return stats
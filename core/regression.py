@@ -0,0 +1,314 @@
+import json
+import statistics
+import struct
+
+"""
+Regression Detector – WebSpeed PRO
+Phát hiện regression ngay khi lưu scan (gọi trong _insert_scan, cùng
+transaction), so với baseline cuộn của chính URL + profile đó:
+
+ - Baseline = WINDOW giá trị gần nhất của mỗi metric (bảng baselines,
+   một dòng / (url, profile, key)) → median + MAD, không đọc lại history
+ - Spike: robust z = (x - median) / (1.4826 * MAD) >= Z_THRESHOLD và
+   tăng ít nhất MIN_CHANGE so với median
+ - Drift: CUSUM một phía trên z (s = max(0, s + z - CUSUM_K)) vượt
+   CUSUM_H → tăng nhỏ nhưng kéo dài qua nhiều scan
+ - Resource: baseline riêng cho bytes / duration theo (initiatorType, host);
+   khi có regression, các nhóm resource đổi nhiều nhất được ghi kèm
+
+Chi phí mỗi scan: 1 SELECT baseline của URL + 1 executemany, xử lý
+O(WINDOW) mỗi key – không phụ thuộc độ dài history.
+Metric ở đây đều "càng thấp càng tốt", chỉ chiều tăng bị coi là regression.
+"""
+
+# Số giá trị gần nhất giữ trong baseline
+WINDOW = 20
+
+# Chưa đủ số mẫu này thì chỉ học baseline, không đánh giá
+MIN_SAMPLES = 5
+
+Z_THRESHOLD = 3.5
+MIN_CHANGE = 0.10
+
+CUSUM_K = 0.5
+CUSUM_H = 5.0
+
+# Metric headline -> sàn cho thang đo (tránh MAD = 0 với số đo rất ổn định)
+METRIC_FLOOR = {
+    "ttfb": 20,
+    "load": 50,
+    "lcp": 50,
+    "cls": 0.01,
+    "size": 10 * 1024,
+    "requests": 2,
+}
+
+# Nhóm resource: bỏ qua thay đổi nhỏ hơn mức này
+RESOURCE_FLOOR = {"bytes": 5 * 1024, "duration": 50}
+
+# Số nhóm resource tối đa ghi kèm một regression
+MAX_RESOURCES = 10
+
+_WINDOW_VALUE = struct.Struct("<d")
+
+_SQL_BASELINES = """
+    SELECT key, n, cusum, samples FROM baselines WHERE url = ? AND profile = ?
+"""
+
+_SQL_PUT_BASELINE = """
+    INSERT OR REPLACE INTO baselines (url, profile, key, n, median, mad, cusum, samples)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_REGRESSION = """
+    INSERT INTO regressions (scan_id, url, profile, created_at, kind, metrics, resources)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def create_tables(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS baselines(
+            url TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            key TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            median REAL,
+            mad REAL,
+            cusum REAL DEFAULT 0,
+            samples BLOB,
+            PRIMARY KEY (url, profile, key)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS regressions(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            profile TEXT,
+            created_at TEXT,
+            kind TEXT,
+            metrics TEXT,
+            resources TEXT
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_regressions_url ON regressions(url, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_regressions_scan ON regressions(scan_id)")
+
+
+# -----------------------------------------------------------
+# BASELINE
+# -----------------------------------------------------------
+def _pack(values: list) -> bytes:
+    return b"".join(_WINDOW_VALUE.pack(v) for v in values)
+
+
+def _unpack(blob: bytes) -> list:
+    return [v for (v,) in _WINDOW_VALUE.iter_unpack(blob)] if blob else []
+
+
+class _Baseline:
+    def __init__(self, n=0, cusum=0.0, samples=None):
+        self.n = n
+        self.cusum = cusum or 0.0
+        self.samples = samples or []
+
+    def summary(self):
+        median = statistics.median(self.samples)
+        mad = statistics.median(abs(v - median) for v in self.samples)
+        return median, mad
+
+    def push(self, value: float):
+        self.n += 1
+        self.samples.append(value)
+        if len(self.samples) > WINDOW:
+            del self.samples[:-WINDOW]
+
+    def row(self, url: str, profile: str, key: str) -> tuple:
+        median, mad = self.summary()
+        return (url, profile, key, self.n, median, mad, self.cusum, _pack(self.samples))
+
+
+def _score(base: _Baseline, value: float, floor: float):
+    """
+    (median, z) của value so với baseline; None khi chưa đủ mẫu.
+    """
+    if len(base.samples) < MIN_SAMPLES:
+        return None
+    median, mad = base.summary()
+    scale = max(1.4826 * mad, median * MIN_CHANGE / Z_THRESHOLD, floor)
+    return median, (value - median) / scale
+
+
+def _resource_groups(resources: list) -> dict:
+    """
+    resources = [(initiator_type, host, duration, transfer_size)]
+    -> {"bytes:type:host": tổng byte, "duration:type:host": duration lớn nhất}
+    """
+    groups = {}
+    for itype, host, duration, size in resources:
+        k = f"{itype}:{host}"
+        groups[f"bytes:{k}"] = groups.get(f"bytes:{k}", 0) + (size or 0)
+        groups[f"duration:{k}"] = max(groups.get(f"duration:{k}", 0), duration or 0)
+    return groups
+
+
+# -----------------------------------------------------------
+# KIỂM TRA MỘT SCAN
+# -----------------------------------------------------------
+def check_scan(c, scan_id: int, url: str, profile: str, created_at: str,
+               values: dict, resources: list):
+    """
+    Đánh giá scan mới so với baseline rồi cộng nó vào baseline.
+    Trả về dict regression đã ghi (hoặc None).
+    """
+    baselines = {
+        key: _Baseline(n, cusum, _unpack(samples))
+        for key, n, cusum, samples in c.execute(_SQL_BASELINES, (url, profile))
+    }
+
+    # Headline metric: spike (z) hoặc drift (CUSUM)
+    flagged = []
+    for metric, value in values.items():
+        if value is None:
+            continue
+        base = baselines.setdefault(metric, _Baseline())
+        scored = _score(base, value, METRIC_FLOOR.get(metric, 0))
+        if scored is not None:
+            median, z = scored
+            base.cusum = max(0.0, base.cusum + z - CUSUM_K)
+
+            kind = None
+            if z >= Z_THRESHOLD and value >= median * (1 + MIN_CHANGE):
+                kind = "spike"
+            elif base.cusum >= CUSUM_H and value > median:
+                kind = "drift"
+
+            if kind:
+                base.cusum = 0.0
+                flagged.append({
+                    "metric": metric,
+                    "kind": kind,
+                    "value": value,
+                    "baseline": median,
+                    "z": round(z, 2),
+                    "change_pct": round((value - median) / median * 100, 1) if median else None,
+                })
+        base.push(value)
+
+    # Resource: nhóm (initiatorType, host) đổi nhiều nhất
+    moved = []
+    groups = _resource_groups(resources)
+    known = values.get("load") is not None and len(baselines["load"].samples) > MIN_SAMPLES
+    for key, value in groups.items():
+        field, itype, host = key.split(":", 2)
+        base = baselines.get(key)
+        if base is None:
+            # Nhóm mới xuất hiện trên URL đã có baseline: trước đó coi như 0
+            base = baselines[key] = _Baseline()
+            scored = (0, value / RESOURCE_FLOOR[field]) if known else None
+        else:
+            scored = _score(base, value, RESOURCE_FLOOR[field])
+        if scored is not None:
+            median, z = scored
+            if z >= Z_THRESHOLD:
+                moved.append({"field": field, "type": itype, "host": host,
+                              "value": value, "baseline": median, "delta": value - median})
+        base.push(value)
+
+    # Nhóm resource vắng mặt trong scan này = 0 (vd. script bị bỏ);
+    # vắng suốt cả cửa sổ thì bỏ hẳn baseline
+    stale = []
+    for key, base in baselines.items():
+        if ":" in key and key not in groups:
+            base.push(0)
+            if len(base.samples) >= WINDOW and not any(base.samples):
+                stale.append(key)
+    for key in stale:
+        del baselines[key]
+    c.executemany(
+        "DELETE FROM baselines WHERE url = ? AND profile = ? AND key = ?",
+        [(url, profile, key) for key in stale],
+    )
+
+    c.executemany(_SQL_PUT_BASELINE, (
+        b.row(url, profile, key) for key, b in baselines.items()
+    ))
+
+    if not flagged:
+        return None
+
+    moved.sort(key=lambda r: abs(r["delta"]) / RESOURCE_FLOOR[r["field"]], reverse=True)
+    regression = {
+        "scan_id": scan_id,
+        "url": url,
+        "profile": profile,
+        "created_at": created_at,
+        "kind": "spike" if any(f["kind"] == "spike" for f in flagged) else "drift",
+        "metrics": flagged,
+        "resources": moved[:MAX_RESOURCES],
+    }
+    c.execute(_SQL_INSERT_REGRESSION, (
+        scan_id, url, profile, created_at, regression["kind"],
+        json.dumps(flagged), json.dumps(regression["resources"]),
+    ))
+    return regression
+
+
+def rebuild_pair(c, url: str, profile: str, metrics: tuple):
+    """
+    Dựng lại baseline của một (url, profile) từ WINDOW scan gần nhất
+    (vd. sau khi xoá một scan nằm trong cửa sổ).
+    """
+    c.execute("DELETE FROM baselines WHERE url = ? AND profile = ?", (url, profile))
+
+    rows = c.execute(
+        f"SELECT id, {', '.join(metrics)} FROM scans "
+        "WHERE url = ? AND profile = ? ORDER BY id DESC LIMIT ?",
+        (url, profile, WINDOW),
+    ).fetchall()[::-1]
+
+    baselines = {}
+    for id, *vals in rows:
+        for metric, value in zip(metrics, vals):
+            if value is not None:
+                baselines.setdefault(metric, _Baseline()).push(value)
+
+        resources = c.execute(
+            "SELECT initiator_type, host, duration, transfer_size "
+            "FROM resource_timings WHERE scan_id = ?", (id,),
+        ).fetchall()
+        groups = _resource_groups(resources)
+        for key, value in groups.items():
+            baselines.setdefault(key, _Baseline()).push(value)
+        for key, base in baselines.items():
+            if ":" in key and key not in groups:
+                base.push(0)
+
+    c.executemany(_SQL_PUT_BASELINE, (
+        b.row(url, profile, key) for key, b in baselines.items()
+    ))
+
+
+def in_window(c, scan_id: int, url: str, profile: str) -> bool:
+    """
+    scan_id có nằm trong WINDOW scan gần nhất của (url, profile) không.
+    """
+    newer = c.execute(
+        "SELECT COUNT(*) FROM (SELECT id FROM scans "
+        "WHERE url = ? AND profile = ? AND id > ? LIMIT ?)",
+        (url, profile, scan_id, WINDOW),
+    ).fetchone()[0]
+    return newer < WINDOW
+
+
+def rebuild_baselines(c, metrics: tuple):
+    """
+    Dựng baseline từ WINDOW scan gần nhất của mỗi (url, profile) – chỉ học,
+    không ghi regression cho history cũ.
+    """
+    c.execute("DELETE FROM baselines")
+
+    pairs = c.execute("SELECT DISTINCT url, profile FROM scans").fetchall()
+    for url, profile in pairs:
+        rebuild_pair(c, url, profile or "Desktop", metrics)
@@ -1,6 +1,56 @@
+import heapq
+
 """
 Resource breakdown: filter theo img, script, css...
 """
+
+
+def aggregate_resources(resources: list, top_n: int = 10) -> dict:
+    """
+    Một lượt duyệt resource list:
+     - total_size / total_requests
+     - breakdown theo initiatorType {count, size, duration}
+     - top N resource chậm nhất (min-heap kích thước N, không sort cả list)
+    """
+    total_size = 0
+    breakdown = {}
+    heap = []
+
+    for i, r in enumerate(resources):
+        size = r.get("transferSize", 0)
+        duration = r.get("duration", 0)
+        total_size += size
+
+        t = r.get("initiatorType", "other")
+        b = breakdown.get(t)
+        if b is None:
+            b = breakdown[t] = {"count": 0, "size": 0, "duration": 0}
+        b["count"] += 1
+        b["size"] += size
+        b["duration"] += duration
+
+        if top_n <= 0:
+            continue
+
+        # -i: khi bằng duration, entry đứng trước được giữ (như sort ổn định)
+        item = (duration, -i, r)
+        if len(heap) < top_n:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    slowest = [r for _, _, r in sorted(heap, key=lambda x: x[:2], reverse=True)]
+
+    return {
+        "total_size": total_size,
+        "total_requests": len(resources),
+        "breakdown": breakdown,
+        "slowest": slowest,
+    }
+
+
 def group_resources(resources):
-    # Phần 6 sẽ hoàn thiện
-    return {}
+    """
+    Breakdown theo initiatorType: {type: {count, size, duration}}
+    """
+    return aggregate_resources(resources, top_n=0)["breakdown"]
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+
+from core.sketch import LogHistogram
+
+"""
+Rollups – WebSpeed PRO
+Tổng hợp theo giờ / ngày cho từng (URL, profile, metric):
+count, min, median, p75, p95, max (+ sum cho trung bình).
+
+ - Cập nhật dần trong _insert_scan (cùng transaction với scan)
+ - Percentile lấy từ log-histogram sketch (core.sketch) lưu trong
+   cột sketch, nên cập nhật O(1) mỗi scan, không đọc lại dữ liệu thô
+ - Trend một năm = ~365 dòng daily thay vì mọi scan
+
+Các hàm ở đây làm việc trên cursor; core.database lo connection.
+"""
+
+GRANULARITIES = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+}
+
+# metric -> cột tương ứng trong scans
+METRICS = ("ttfb", "load", "lcp", "cls", "size", "requests")
+
+ROLLUP_COLUMNS = ("bucket", "count", "min", "p50", "p75", "p95", "max", "sum")
+
+_SQL_GET = """
+    SELECT count, min, max, sum, sketch FROM rollups
+    WHERE granularity = ? AND url = ? AND profile = ? AND metric = ? AND bucket = ?
+"""
+
+_SQL_PUT = """
+    INSERT OR REPLACE INTO rollups
+        (granularity, url, profile, metric, bucket,
+         count, min, max, sum, p50, p75, p95, sketch)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def create_table(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS rollups(
+            granularity TEXT NOT NULL,
+            url TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            min REAL,
+            max REAL,
+            sum REAL,
+            p50 REAL,
+            p75 REAL,
+            p95 REAL,
+            sketch BLOB,
+            PRIMARY KEY (granularity, url, profile, metric, bucket)
+        ) WITHOUT ROWID
+    """)
+
+
+class _Bucket:
+    def __init__(self, count=0, min_=None, max_=None, total=0.0, sketch=None):
+        self.count = count
+        self.min = min_
+        self.max = max_
+        self.sum = total
+        self.sketch = sketch or LogHistogram()
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.sketch.add(value)
+
+    def row(self, key: tuple) -> tuple:
+        def q(p):
+            # Giá trị sketch luôn nằm trong [min, max] thật
+            return min(self.max, max(self.min, self.sketch.quantile(p)))
+
+        return (*key, self.count, self.min, self.max, self.sum,
+                q(0.5), q(0.75), q(0.95), self.sketch.to_bytes())
+
+
+def _keys(url: str, profile: str, created: datetime, values: dict,
+          granularities: dict = GRANULARITIES):
+    for granularity, fmt in granularities.items():
+        bucket = created.strftime(fmt)
+        for metric, value in values.items():
+            if value is not None:
+                yield (granularity, url, profile, metric, bucket), value
+
+
+def update_rollups(c, url: str, profile: str, created: datetime, values: dict):
+    """
+    Cộng một scan vào các bucket giờ / ngày của nó.
+    values = {metric: giá trị}
+    """
+    for key, value in _keys(url, profile, created, values):
+        row = c.execute(_SQL_GET, key).fetchone()
+        if row:
+            count, min_, max_, total, sketch = row
+            bucket = _Bucket(count, min_, max_, total, LogHistogram.from_bytes(sketch))
+        else:
+            bucket = _Bucket()
+        bucket.add(value)
+        c.execute(_SQL_PUT, bucket.row(key))
+
+
+def _metric_columns(c) -> list:
+    # Migration cũ chạy trước khi scans có đủ cột (vd. cls ở v9)
+    columns = {row[1] for row in c.execute("PRAGMA table_info(scans)")}
+    return [m for m in METRICS if m in columns]
+
+
+def _aggregate(rows, metrics: list, granularities=GRANULARITIES) -> dict:
+    buckets = {}
+    for url, profile, created_at, *values in rows:
+        try:
+            created = datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            continue
+        for key, value in _keys(url, profile or "Desktop", created,
+                                dict(zip(metrics, values)), granularities):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _Bucket()
+            bucket.add(value)
+    return buckets
+
+
+def rebuild_rollups(c):
+    """
+    Dựng lại toàn bộ rollups từ các cột của scans (không cần giải nén payload).
+    """
+    c.execute("DELETE FROM rollups")
+
+    metrics = _metric_columns(c)
+    rows = c.execute(
+        f"SELECT url, profile, created_at, {', '.join(metrics)} FROM scans"
+    )
+    buckets = _aggregate(rows, metrics)
+
+    c.executemany(_SQL_PUT, (b.row(key) for key, b in buckets.items()))
+    return len(buckets)
+
+
+def rebuild_buckets(c, url: str, profile: str, created: datetime):
+    """
+    Tính lại các bucket giờ / ngày chứa thời điểm created của (url, profile)
+    – dùng khi xoá một scan khỏi history.
+    """
+    metrics = _metric_columns(c)
+    spans = {
+        "hour": created.replace(minute=0, second=0, microsecond=0),
+        "day": created.replace(hour=0, minute=0, second=0, microsecond=0),
+    }
+    ends = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+    for granularity, fmt in GRANULARITIES.items():
+        start = spans[granularity]
+        c.execute(
+            "DELETE FROM rollups WHERE granularity = ? AND url = ? AND profile = ? "
+            "AND bucket = ?",
+            (granularity, url, profile, created.strftime(fmt)),
+        )
+        rows = c.execute(
+            f"SELECT url, profile, created_at, {', '.join(metrics)} FROM scans "
+            "WHERE url = ? AND profile = ? AND created_at >= ? AND created_at < ?",
+            (url, profile, start.strftime("%Y-%m-%d %H:%M:%S"),
+             (start + ends[granularity]).strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        buckets = _aggregate(rows, metrics, {granularity: fmt})
+        c.executemany(_SQL_PUT, (b.row(key) for key, b in buckets.items()))
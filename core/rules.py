@@ -0,0 +1,362 @@
+import copy
+import json
+from urllib.parse import urlsplit
+
+"""
+Rule Engine – WebSpeed PRO
+Mỗi kiểm tra hiệu năng là một Rule được đăng ký (register_rule), có
+threshold + severity cấu hình được, và ghi đè được theo từng site.
+
+ - MetricRule:   kiểm tra một giá trị cấp trang (TTFB, LCP, tổng size...)
+ - ResourceRule: đếm resource thỏa điều kiện, chỉ cho các initiatorType
+                 nó quan tâm
+
+RuleEngine gom ResourceRule theo initiatorType (dispatch index), nên
+resource list chỉ được duyệt MỘT lần dù có bao nhiêu rule. Analysis
+nhận resource theo luồng (feed) rồi finish() – dùng được cho stream
+resource entry hoặc HAR rất lớn mà không cần giữ cả list.
+"""
+
+SEVERITIES = ("info", "warning", "critical")
+
+# Số resource vi phạm giữ lại làm ví dụ trong mỗi finding
+MAX_EXAMPLES = 5
+
+
+# -----------------------------------------------------------
+# RULE
+# -----------------------------------------------------------
+class Rule:
+    """
+    message / suggestion: chuỗi format với {value}, {threshold}, {count},
+    hoặc callable(finding) -> str.
+    """
+
+    kind = "rule"
+
+    def __init__(self, name: str, threshold, message, suggestion: str,
+                 severity: str = "warning", enabled: bool = True):
+        if severity not in SEVERITIES:
+            raise ValueError(f"Invalid severity: {severity}")
+        self.name = name
+        self.threshold = threshold
+        self.message = message
+        self.suggestion = suggestion
+        self.severity = severity
+        self.enabled = enabled
+
+    def configure(self, **params) -> "Rule":
+        """
+        Bản sao với threshold / severity / enabled mới.
+        """
+        rule = copy.copy(self)
+        for key, value in params.items():
+            if key not in ("threshold", "severity", "enabled"):
+                raise ValueError(f"Unknown rule parameter: {key}")
+            setattr(rule, key, value)
+        if rule.severity not in SEVERITIES:
+            raise ValueError(f"Invalid severity: {rule.severity}")
+        return rule
+
+    def _finding(self, value, count=None, examples=None) -> dict:
+        finding = {
+            "rule": self.name,
+            "severity": self.severity,
+            "value": value,
+            "threshold": self.threshold,
+            "count": count,
+            "examples": examples or [],
+        }
+        finding["message"] = _render(self.message, finding)
+        finding["suggestion"] = _render(self.suggestion, finding)
+        return finding
+
+
+def _render(template, finding: dict) -> str:
+    if callable(template):
+        return template(finding)
+    return template.format(**finding)
+
+
+class MetricRule(Rule):
+    kind = "metric"
+
+    def __init__(self, name: str, get, threshold, message, suggestion: str, **kwargs):
+        super().__init__(name, threshold, message, suggestion, **kwargs)
+        self.get = get
+
+    def evaluate(self, page: dict):
+        try:
+            value = self.get(page)
+        except (KeyError, TypeError):
+            return None
+        if value is None or value <= self.threshold:
+            return None
+        return self._finding(value)
+
+
+class ResourceRule(Rule):
+    """
+    types: các initiatorType được kiểm tra (None = mọi resource)
+    field: field của resource so với threshold (vd. transferSize, duration)
+    """
+
+    kind = "resource"
+
+    def __init__(self, name: str, types, field: str, threshold, message,
+                 suggestion: str, **kwargs):
+        super().__init__(name, threshold, message, suggestion, **kwargs)
+        self.types = tuple(types) if types else None
+        self.field = field
+
+    def matches(self, resource: dict) -> bool:
+        return resource.get(self.field, 0) > self.threshold
+
+
+# -----------------------------------------------------------
+# REGISTRY + CẤU HÌNH
+# -----------------------------------------------------------
+_RULES = {}
+
+# Ghi đè mặc định: {rule: {threshold, severity, enabled}}
+_OVERRIDES = {}
+
+# Ghi đè theo site: {host: {rule: {...}}}
+_SITE_OVERRIDES = {}
+
+
+def register_rule(rule: Rule):
+    """
+    Rule đăng ký sau chạy sau; đăng ký lại cùng tên sẽ thay rule cũ.
+    """
+    _RULES[rule.name] = rule
+    return rule
+
+
+def get_rules() -> list:
+    return list(_RULES.values())
+
+
+def configure_rule(name: str, **params):
+    if name not in _RULES:
+        raise KeyError(f"Unknown rule: {name}")
+    _RULES[name].configure(**params)  # validate
+    _OVERRIDES.setdefault(name, {}).update(params)
+
+
+def set_site_overrides(host: str, overrides: dict):
+    """
+    overrides = {rule: {threshold, severity, enabled}} cho một host.
+    """
+    for name, params in overrides.items():
+        if name not in _RULES:
+            raise KeyError(f"Unknown rule: {name}")
+        _RULES[name].configure(**params)
+    _SITE_OVERRIDES[host.lower()] = overrides
+
+
+def load_config(path: str):
+    """
+    File JSON:
+        {"rules": {"ttfb": {"threshold": 800}},
+         "sites": {"example.com": {"large_images": {"enabled": false}}}}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        apply_config(json.load(f))
+
+
+def apply_config(config: dict):
+    for name, params in config.get("rules", {}).items():
+        configure_rule(name, **params)
+    for host, overrides in config.get("sites", {}).items():
+        set_site_overrides(host, overrides)
+
+
+def export_config() -> dict:
+    """
+    Cấu hình hiện tại (cùng định dạng với load_config), vd. để chuyển
+    sang worker process.
+    """
+    return {
+        "rules": copy.deepcopy(_OVERRIDES),
+        "sites": copy.deepcopy(_SITE_OVERRIDES),
+    }
+
+
+def _site_of(url: str) -> str:
+    try:
+        return (urlsplit(url or "").hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+# -----------------------------------------------------------
+# ENGINE
+# -----------------------------------------------------------
+class RuleEngine:
+    def __init__(self, rules: list):
+        self.rules = [r for r in rules if r.enabled]
+
+        # initiatorType -> ResourceRule (rule không giới hạn type nằm ở any_type)
+        self.by_type = {}
+        self.any_type = []
+        for r in self.rules:
+            if r.kind != "resource":
+                continue
+            if r.types is None:
+                self.any_type.append(r)
+            else:
+                for t in r.types:
+                    self.by_type.setdefault(t, []).append(r)
+
+    @classmethod
+    def for_site(cls, url: str = None, overrides: dict = None) -> "RuleEngine":
+        """
+        Rule đã đăng ký + cấu hình chung + cấu hình riêng của site
+        + overrides truyền trực tiếp (ưu tiên theo thứ tự đó).
+        """
+        layers = [_OVERRIDES, _SITE_OVERRIDES.get(_site_of(url), {}), overrides or {}]
+
+        rules = []
+        for rule in _RULES.values():
+            params = {}
+            for layer in layers:
+                params.update(layer.get(rule.name, {}))
+            rules.append(rule.configure(**params) if params else rule)
+        return cls(rules)
+
+    def start(self) -> "Analysis":
+        return Analysis(self)
+
+    def run(self, page: dict) -> list:
+        analysis = self.start()
+        analysis.feed_many(page.get("resources", []))
+        return analysis.finish(page)
+
+
+class Analysis:
+    """
+    Trạng thái một lần phân tích: feed() từng resource, finish() với
+    dữ liệu cấp trang (metrics, vitals, tổng).
+    """
+
+    def __init__(self, engine: RuleEngine):
+        self.engine = engine
+        self.counts = {}
+        self.examples = {}
+        self.total_size = 0
+        self.total_requests = 0
+
+    def feed(self, resource: dict):
+        self.total_requests += 1
+        self.total_size += resource.get("transferSize", 0)
+
+        rules = self.engine.by_type.get(resource.get("initiatorType", "other"), ())
+        for rule in (*rules, *self.engine.any_type):
+            if rule.matches(resource):
+                self.counts[rule.name] = self.counts.get(rule.name, 0) + 1
+                examples = self.examples.setdefault(rule.name, [])
+                if len(examples) < MAX_EXAMPLES:
+                    examples.append(resource.get("name", ""))
+
+    def feed_many(self, resources):
+        for r in resources:
+            self.feed(r)
+
+    def finish(self, page: dict = None) -> list:
+        """
+        Findings theo thứ tự đăng ký rule. Tổng size / request lấy từ page
+        nếu có, nếu không thì dùng tổng cộng dồn từ các resource đã feed.
+        """
+        page = dict(page or {})
+        page.setdefault("total_size", self.total_size)
+        page.setdefault("total_requests", self.total_requests)
+
+        findings = []
+        for rule in self.engine.rules:
+            if rule.kind == "metric":
+                finding = rule.evaluate(page)
+            elif self.counts.get(rule.name):
+                count = self.counts[rule.name]
+                finding = rule._finding(count, count, self.examples[rule.name])
+            else:
+                finding = None
+
+            if finding:
+                findings.append(finding)
+        return findings
+
+
+# -----------------------------------------------------------
+# RULE MẶC ĐỊNH (thứ tự và nội dung giữ như analyzer cũ)
+# -----------------------------------------------------------
+_MB = 1024 * 1024
+
+
+def _size(n) -> str:
+    # Ngưỡng override có thể là float hoặc < 1KB
+    return f"{n / 1024:.0f}KB" if n >= 1024 else f"{n:.0f}B"
+
+
+register_rule(MetricRule(
+    "ttfb", lambda d: d["metrics"]["ttfb"], 600,
+    "⚠️ TTFB chậm (Server phản hồi chậm)",
+    "Kiểm tra hosting/server hoặc tối ưu backend xử lý.",
+))
+register_rule(MetricRule(
+    "dom", lambda d: d["metrics"]["dom"], 2000,
+    "⚠️ DOM Load quá lâu (>{threshold}ms)",
+    "Trang có nhiều JS nặng hoặc DOM phức tạp.",
+))
+register_rule(MetricRule(
+    "load", lambda d: d["metrics"]["load"], 3000,
+    "⚠️ Trang load khá chậm (>{threshold}ms)",
+    "Kiểm tra ảnh, JS, font và request dư thừa.",
+))
+register_rule(MetricRule(
+    "lcp", lambda d: d["vitals"]["LCP"], 2500,
+    "⚠️ LCP cao ({value}ms)",
+    "Phần hero chính render chậm, ảnh hero quá lớn hoặc render blocking.",
+    severity="critical",
+))
+register_rule(MetricRule(
+    "cls", lambda d: d["vitals"]["CLS"], 0.1,
+    "⚠️ CLS cao ({value})",
+    "Layout bị nhảy; thêm kích thước cố định cho ảnh, banner, video.",
+))
+register_rule(MetricRule(
+    "fid", lambda d: d["vitals"]["FID"], 100,
+    "⚠️ FID cao ({value}ms)",
+    "JS block main-thread hoặc event handler nặng.",
+))
+register_rule(MetricRule(
+    "requests", lambda d: d["total_requests"], 120,
+    "⚠️ quá nhiều request (>{threshold})",
+    "Gộp file JS/CSS. Dùng minify. Loại bỏ tài nguyên không cần thiết.",
+))
+register_rule(MetricRule(
+    "page_weight", lambda d: d["total_size"], 2 * _MB,
+    lambda f: f"⚠️ Trang quá nặng ({f['value'] / _MB:.1f}MB)",
+    "Nén ảnh, bật gzip/brotli, giảm bundle JS.",
+))
+register_rule(ResourceRule(
+    "large_images", ("img",), "transferSize", 250 * 1024,
+    lambda f: f"⚠️ Có {f['count']} ảnh lớn (>{_size(f['threshold'])})",
+    "Dùng WebP/AVIF. Giảm chất lượng ảnh.",
+))
+register_rule(ResourceRule(
+    "heavy_js", ("script",), "duration", 300,
+    "⚠️ Có {count} file JS chạy chậm (>{threshold}ms)",
+    "Tách code (split), lazy load, loại bỏ JS không dùng.",
+))
+register_rule(ResourceRule(
+    "render_blocking", ("css", "script"), "duration", 200,
+    "⚠️ Có {count} tài nguyên chặn render",
+    "Dùng media=print, async/defer, tối ưu critical path.",
+))
+register_rule(ResourceRule(
+    "slow_fonts", ("font",), "duration", 150,
+    "⚠️ Font load chậm",
+    "Dùng font-display: swap; preload font; nén woff2.",
+    severity="info",
+))
@@ -1,171 +1,252 @@
-import json
 import asyncio
+import json
 import time
-from pathlib import Path
-from playwright.async_api import async_playwright
+from core.browser_pool import get_pool
+from core.collectors import get_bundle, apply_collectors
+from core.emulation import apply_profile, context_options, describe_profile
+from core.har import attach_payload
+from core.network import NetworkRecorder, merge_network
+from core.resources import aggregate_resources
 
 """
 Scanner – WebSpeed PRO
 Quét toàn bộ tốc độ web:
  - Navigation Timing
  - Resource Timing
- - WebVitals (LCP, FID, CLS)
+ - WebVitals (LCP, FID, CLS, INP, TBT) qua core.collectors
  - Screenshot
  - Advanced metrics (redirect, dns, tcp, tls…)
+ - capture_network=True: byte/protocol/cache thật qua CDP (core.network)
+ - har_path: ghi HAR của lần scan, load lại bằng core.har.load_har
+ - profile: giả lập mạng / CPU / mobile (core.emulation), vd. "Slow 4G"
 """
 
 # -----------------------------------------------------------
 # HÀM CHÍNH DÙNG BÊN NGOÀI
 # -----------------------------------------------------------
-def scan(url: str, screenshot_path: str = None, save_to_db: bool = True) -> dict:
-    data = asyncio.run(_scan_async(url, screenshot_path))
+def scan(url: str, screenshot_path: str = None, save_to_db: bool = True,
+         capture_network: bool = False, har_path: str = None,
+         profile: str = None) -> dict:
+    data = get_pool().run(
+        _scan_async(url, screenshot_path, capture_network=capture_network,
+                    har_path=har_path, profile=profile)
+    )
     if save_to_db:
         _try_save_scan(data)
     return data
 
 
 async def scan_async(
-    url: str, screenshot_path: str = None, save_to_db: bool = True
+    url: str, screenshot_path: str = None, save_to_db: bool = True,
+    capture_network: bool = False, har_path: str = None, profile: str = None,
 ) -> dict:
     """
     Async-friendly wrapper used when a running event loop already exists.
     """
-    data = await _scan_async(url, screenshot_path)
+    data = await get_pool().run_async(
+        _scan_async(url, screenshot_path, capture_network=capture_network,
+                    har_path=har_path, profile=profile)
+    )
     if save_to_db:
-        _try_save_scan(data)
+        await _try_save_scan_async(data)
     return data
 
 
 # -----------------------------------------------------------
 # HÀM BÊN TRONG (ASYNC)
 # -----------------------------------------------------------
-async def _scan_async(url: str, screenshot_path: str):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        # Load WebVitals script
-        script_path = Path(__file__).resolve().parent.parent / "vitals.js"
-        with open(script_path, "r", encoding="utf-8") as f:
-            script = f.read()
-
-        await page.add_init_script(script)
+# Thu thập toàn bộ số liệu trong trang bằng MỘT lần evaluate;
+# JSON.stringify gọi toJSON() của các Performance entry
+_COLLECT_SCRIPT = """() => JSON.stringify({
+    timing: window.performance.timing,
+    navigation: window.performance.getEntriesByType('navigation'),
+    resources: window.performance.getEntriesByType('resource'),
+    collectors: window.__wsCollect ? window.__wsCollect() : {},
+})"""
+
+# Các giai đoạn báo qua callback progress(stage)
+STAGES = ("opening", "navigating", "screenshot", "collecting")
+
+
+def _report(progress, stage: str):
+    if progress:
+        try:
+            progress(stage)
+        except Exception:
+            pass
+
+
+async def _scan_async(url: str, screenshot_path: str, progress=None, warm: bool = False,
+                      capture_network: bool = False, har_path: str = None,
+                      profile: str = None):
+    _report(progress, "opening")
+
+    # Viewport / UA / is_mobile của profile (ValueError nếu sai tên profile)
+    options = context_options(profile)
+
+    # HAR được Playwright ghi ra file khi context đóng; bỏ body để file gọn
+    if har_path:
+        options.update(record_har_path=har_path, record_har_content="omit")
+
+    # Context mới, cô lập cho mỗi lần scan – browser lấy từ pool dùng chung
+    async with get_pool().context(**options) as context:
+        # Bundle collector (LCP, CLS, INP, long tasks/TBT...) inject một lần
+        # cho context – áp dụng cho mọi page mở trong context
+        await context.add_init_script(get_bundle())
+
+        # Warm run: tải trang một lần để làm nóng HTTP cache của context,
+        # lần đo bên dưới dùng page mới trong cùng context
+        if warm:
+            prime = await context.new_page()
+            await prime.goto(url, wait_until="load")
+            await prime.close()
+
+        page = await context.new_page()
+
+        # Network capture: gắn CDP session trước khi navigate để không
+        # bỏ sót request nào (kể cả document chính)
+        recorder = None
+        if capture_network:
+            recorder = NetworkRecorder()
+            await recorder.attach(context, page)
+
+        # Throttling mạng / CPU qua CDP, áp dụng cho page được đo
+        throttle = await apply_profile(context, page, profile)
 
         start_time = time.time()
 
         # Navigate and wait until fully loaded
+        _report(progress, "navigating")
         await page.goto(url, wait_until="load")
 
         # Optional screenshot
         if screenshot_path:
+            _report(progress, "screenshot")
             await page.screenshot(path=screenshot_path, full_page=True)
 
-        # PERFORMANCE TIMING
-        timing_raw = await page.evaluate(
-            "() => JSON.stringify(window.performance.timing)"
-        )
-        nav_entries = await page.evaluate(
-            "() => JSON.stringify(window.performance.getEntriesByType('navigation'))"
-        )
-        resource_entries = await page.evaluate(
-            "() => JSON.stringify(window.performance.getEntriesByType('resource'))"
-        )
-        vitals_raw = await page.evaluate(
-            "() => JSON.stringify(window.getVitals())"
-        )
+        _report(progress, "collecting")
+
+        # PERFORMANCE TIMING + NAVIGATION + RESOURCES + COLLECTORS
+        # Một lần evaluate (một roundtrip CDP), một lần json.loads
+        collected_raw = await page.evaluate(_COLLECT_SCRIPT)
 
         browser_close_time = time.time()
 
-        # Parse JSON
-        timing = json.loads(timing_raw)
-        navigation = json.loads(nav_entries)
-        resources = json.loads(resource_entries)
-        vitals = json.loads(vitals_raw)
+        if recorder:
+            await recorder.detach()
+        if throttle:
+            await throttle.detach()
+
+    # Context đã trả về pool; phần còn lại chỉ là xử lý dữ liệu
+    collected = json.loads(collected_raw)
+    timing = collected["timing"]
+    navigation = collected["navigation"]
+    resources = collected["resources"]
+
+    # Bổ sung transferSize (cross-origin không có Timing-Allow-Origin),
+    # protocol, cache... từ CDP trước khi tính tổng
+    network = merge_network(resources, recorder.entries()) if recorder else None
+
+    # -----------------------------------------------------------
+    # BASIC METRICS
+    # -----------------------------------------------------------
+    dns = timing["domainLookupEnd"] - timing["domainLookupStart"]
+    tcp = timing["connectEnd"] - timing["connectStart"]
+    ttfb = timing["responseStart"] - timing["requestStart"]
+    dom = timing["domContentLoadedEventEnd"] - timing["navigationStart"]
+    load = timing["loadEventEnd"] - timing["navigationStart"]
+
+    redirect = timing["redirectEnd"] - timing["redirectStart"]
+    tls = timing["connectEnd"] - timing["secureConnectionStart"] if timing["secureConnectionStart"] > 0 else 0
+
+    # -----------------------------------------------------------
+    # RESOURCE METRICS (một lượt duyệt: tổng, breakdown, top 10 chậm nhất)
+    # -----------------------------------------------------------
+    summary = aggregate_resources(resources, top_n=10)
+    total_size = summary["total_size"]
+    total_requests = summary["total_requests"]
+    type_breakdown = summary["breakdown"]
+    slow_resources = summary["slowest"]
+
+    # -----------------------------------------------------------
+    # BUILD FINAL PAYLOAD
+    # -----------------------------------------------------------
+    result = {
+        "url": url,
+        "scan_start": start_time,
+        "scan_end": browser_close_time,
+        "scan_duration": round((browser_close_time - start_time) * 1000),
 
-        # -----------------------------------------------------------
         # BASIC METRICS
-        # -----------------------------------------------------------
-        dns = timing["domainLookupEnd"] - timing["domainLookupStart"]
-        tcp = timing["connectEnd"] - timing["connectStart"]
-        ttfb = timing["responseStart"] - timing["requestStart"]
-        dom = timing["domContentLoadedEventEnd"] - timing["navigationStart"]
-        load = timing["loadEventEnd"] - timing["navigationStart"]
-
-        redirect = timing["redirectEnd"] - timing["redirectStart"]
-        tls = timing["connectEnd"] - timing["secureConnectionStart"] if timing["secureConnectionStart"] > 0 else 0
-
-        # -----------------------------------------------------------
-        # RESOURCE METRICS
-        # -----------------------------------------------------------
-        total_size = sum(r.get("transferSize", 0) for r in resources)
-        total_requests = len(resources)
-
-        # Breakdown
-        type_breakdown = {}
-        for r in resources:
-            t = r.get("initiatorType", "other")
-            type_breakdown.setdefault(t, {"count": 0, "size": 0, "duration": 0})
-            type_breakdown[t]["count"] += 1
-            type_breakdown[t]["size"] += r.get("transferSize", 0)
-            type_breakdown[t]["duration"] += r.get("duration", 0)
-
-        # Long-running resources
-        slow_resources = sorted(
-            resources,
-            key=lambda x: x.get("duration", 0),
-            reverse=True
-        )[:10]
-
-        # -----------------------------------------------------------
-        # BUILD FINAL PAYLOAD
-        # -----------------------------------------------------------
-        result = {
-            "url": url,
-            "scan_start": start_time,
-            "scan_end": browser_close_time,
-            "scan_duration": round((browser_close_time - start_time) * 1000),
-
-            # BASIC METRICS
-            "metrics": {
-                "dns": dns,
-                "tcp": tcp,
-                "tls": tls,
-                "redirect": redirect,
-                "ttfb": ttfb,
-                "dom": dom,
-                "load": load,
-            },
-
-            # RESOURCE
-            "resources": resources,
-            "total_size": total_size,
-            "total_requests": total_requests,
-            "breakdown": type_breakdown,
-            "slowest": slow_resources,
-
-            # WEB VITALS
-            "vitals": {
-                "LCP": vitals.get("LCP", 0),
-                "FID": vitals.get("FID", 0),
-                "CLS": round(vitals.get("CLS", 0), 4)
-            },
-
-            # FUTURE OPTIONS
-            "screenshot": screenshot_path if screenshot_path else None
-        }
-
-        return result
+        "metrics": {
+            "dns": dns,
+            "tcp": tcp,
+            "tls": tls,
+            "redirect": redirect,
+            "ttfb": ttfb,
+            "dom": dom,
+            "load": load,
+        },
+
+        # RESOURCE
+        "resources": resources,
+        "total_size": total_size,
+        "total_requests": total_requests,
+        "breakdown": type_breakdown,
+        "slowest": slow_resources,
+
+        # WEB VITALS (được collector điền vào bên dưới)
+        "vitals": {
+            "LCP": 0,
+            "FID": 0,
+            "CLS": 0,
+            "INP": 0,
+            "TBT": 0,
+        },
+
+        # Điều kiện đo (core.emulation)
+        "profile": describe_profile(profile),
+
+        # FUTURE OPTIONS
+        "screenshot": screenshot_path if screenshot_path else None
+    }
+
+    if network is not None:
+        result["network"] = network
+
+    # vitals, long_tasks, element_timing, memory...
+    apply_collectors(collected["collectors"], result)
+
+    if har_path:
+        result["har_path"] = har_path
+        # Ghi file ở thread riêng để không chặn loop của browser pool
+        await asyncio.to_thread(attach_payload, har_path, result)
+
+    return result
 
 
 def _try_save_scan(data: dict):
     """
-    Persist scan result to history, but avoid breaking the scan flow
-    if the DB write fails.
+    Đẩy kết quả vào write-behind queue (core.writer); việc ghi DB diễn ra
+    ở thread nền nên không nằm trên đường scan, và lỗi DB không làm hỏng scan.
+    """
+    try:
+        from core.writer import get_writer
+
+        get_writer().submit(data)
+    except Exception:
+        # ignore to keep scanning resilient
+        pass
+
+
+async def _try_save_scan_async(data: dict):
+    """
+    Như _try_save_scan nhưng không chặn event loop khi hàng đợi đầy.
     """
     try:
-        from core.database import save_scan
+        from core.writer import get_writer
 
-        save_scan(data)
+        await get_writer().submit_async(data)
     except Exception:
         # ignore to keep scanning resilient
         pass
@@ -0,0 +1,119 @@
+import json
+import zlib
+
+"""
+Serialization – WebSpeed PRO
+Định dạng lưu scan payload trong history.db (cột scans.payload):
+
+    b"WS" + <version 1 byte> + zlib(JSON)
+
+ - resources được lưu theo cột (keys một lần, mỗi key một list giá trị)
+   thay vì lặp lại tên key cho từng entry
+ - slowest chỉ lưu index trỏ vào resources (vốn là cùng các entry)
+"""
+
+MAGIC = b"WS"
+FORMAT_VERSION = 1
+
+_COMPRESS_LEVEL = 6
+
+
+# -----------------------------------------------------------
+# RESOURCE LIST <-> COLUMNS
+# -----------------------------------------------------------
+def _encode_columns(rows: list) -> dict:
+    keys = []
+    seen = set()
+    for r in rows:
+        for k in r:
+            if k not in seen:
+                seen.add(k)
+                keys.append(k)
+
+    cols = []
+    missing = {}
+    for k in keys:
+        col = []
+        for i, r in enumerate(rows):
+            if k in r:
+                col.append(r[k])
+            else:
+                col.append(None)
+                missing.setdefault(k, []).append(i)
+        cols.append(col)
+
+    return {"n": len(rows), "keys": keys, "cols": cols, "missing": missing}
+
+
+def _decode_columns(block: dict) -> list:
+    keys = block["keys"]
+    cols = block["cols"]
+    rows = [dict(zip(keys, values)) for values in zip(*cols)] if keys else [
+        {} for _ in range(block["n"])
+    ]
+
+    for k, indexes in block.get("missing", {}).items():
+        for i in indexes:
+            del rows[i][k]
+
+    return rows
+
+
+def _slowest_indexes(resources: list, slowest: list):
+    """
+    Map slowest -> index trong resources. Trả None nếu có entry không khớp.
+    """
+    by_id = {id(r): i for i, r in enumerate(resources)}
+    indexes = []
+    for r in slowest:
+        i = by_id.get(id(r))
+        if i is None:
+            try:
+                i = resources.index(r)
+            except ValueError:
+                return None
+        indexes.append(i)
+    return indexes
+
+
+# -----------------------------------------------------------
+# PUBLIC
+# -----------------------------------------------------------
+def encode_scan(data: dict) -> bytes:
+    doc = dict(data)
+
+    resources = doc.pop("resources", None)
+    if resources is not None:
+        doc["_resources"] = _encode_columns(resources)
+
+        slowest = doc.get("slowest")
+        if slowest is not None:
+            indexes = _slowest_indexes(resources, slowest)
+            if indexes is not None:
+                del doc["slowest"]
+                doc["_slowest_idx"] = indexes
+
+    raw = json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return MAGIC + bytes([FORMAT_VERSION]) + zlib.compress(raw, _COMPRESS_LEVEL)
+
+
+def decode_scan(blob: bytes) -> dict:
+    if blob[:2] != MAGIC:
+        raise ValueError("Not a WebSpeed scan blob")
+
+    version = blob[2]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported scan blob version: {version}")
+
+    doc = json.loads(zlib.decompress(blob[3:]))
+
+    block = doc.pop("_resources", None)
+    if block is not None:
+        resources = _decode_columns(block)
+        doc["resources"] = resources
+
+        indexes = doc.pop("_slowest_idx", None)
+        if indexes is not None:
+            doc["slowest"] = [resources[i] for i in indexes]
+
+    return doc
@@ -0,0 +1,77 @@
+import math
+import struct
+
+"""
+Log-histogram sketch – WebSpeed PRO
+Histogram với bin theo thang log (kiểu DDSketch): mỗi bin phủ một khoảng
+[gamma^(i-1), gamma^i), nên quantile bất kỳ có sai số tương đối <= ACCURACY
+dù sketch chỉ có vài chục bin. Hai sketch gộp được bằng cách cộng bin –
+dùng cho rollup theo giờ / ngày (core.rollups) cập nhật dần từng scan.
+"""
+
+ACCURACY = 0.01
+
+_GAMMA = (1 + ACCURACY) / (1 - ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+_HEADER = struct.Struct("<I")
+_BIN = struct.Struct("<iI")
+
+
+class LogHistogram:
+    def __init__(self):
+        self.bins = {}
+        self.zero = 0  # giá trị <= 0 (vd. CLS = 0, LCP chưa đo được)
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.bins.values())
+
+    def add(self, value: float, n: int = 1):
+        if value is None:
+            return
+        if value <= 0:
+            self.zero += n
+            return
+        i = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[i] = self.bins.get(i, 0) + n
+
+    def merge(self, other: "LogHistogram"):
+        self.zero += other.zero
+        for i, n in other.bins.items():
+            self.bins[i] = self.bins.get(i, 0) + n
+
+    def quantile(self, q: float) -> float:
+        total = self.count
+        if total == 0:
+            return 0.0
+
+        rank = q * (total - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+
+        for i in sorted(self.bins):
+            seen += self.bins[i]
+            if rank < seen:
+                # Giá trị đại diện của bin (sai số tương đối <= ACCURACY)
+                return 2 * _GAMMA ** i / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.bins) / (_GAMMA + 1)
+
+    # -----------------------------------------------------------
+    # LƯU TRỮ (BLOB)
+    # -----------------------------------------------------------
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(self.zero)]
+        parts.extend(_BIN.pack(i, n) for i, n in sorted(self.bins.items()))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "LogHistogram":
+        sketch = cls()
+        if not blob:
+            return sketch
+        (sketch.zero,) = _HEADER.unpack_from(blob, 0)
+        for i, n in _BIN.iter_unpack(blob[_HEADER.size:]):
+            sketch.bins[i] = n
+        return sketch
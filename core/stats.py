@@ -0,0 +1,74 @@
+import math
+import statistics
+
+"""
+Thống kê cho nhiều lần đo (multi-run): median, p75, p95, stddev, CI 95%.
+"""
+
+# t-value (two-sided 95%) theo bậc tự do; df > 30 dùng xấp xỉ chuẩn
+_T95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447,
+    7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179,
+    13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101,
+    19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064,
+    25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
+}
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """
+    Percentile nội suy tuyến tính (giống numpy mặc định).
+    sorted_values phải đã sort tăng dần.
+    """
+    if not sorted_values:
+        return 0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    k = (len(sorted_values) - 1) * p / 100
+    lo = math.floor(k)
+    hi = math.ceil(k)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(values: list) -> dict:
+    """
+    {n, mean, median, p75, p95, min, max, stddev, ci95: [low, high]}
+    CI 95% của giá trị trung bình (phân phối t).
+    """
+    values = sorted(v for v in values if v is not None)
+    n = len(values)
+    if n == 0:
+        return {"n": 0}
+
+    mean = statistics.fmean(values)
+    stddev = statistics.stdev(values) if n > 1 else 0.0
+
+    if n > 1:
+        t = _T95.get(n - 1, 1.96)
+        half = t * stddev / math.sqrt(n)
+    else:
+        half = 0.0
+
+    return {
+        "n": n,
+        "mean": mean,
+        "median": statistics.median(values),
+        "p75": percentile(values, 75),
+        "p95": percentile(values, 95),
+        "min": values[0],
+        "max": values[-1],
+        "stddev": stddev,
+        "ci95": [mean - half, mean + half],
+    }
+
+
+def ci_overlap(a: dict, b: dict) -> bool:
+    """
+    Hai khoảng tin cậy có chồng nhau không (khác biệt có thể chỉ là nhiễu).
+    """
+    if "ci95" not in a or "ci95" not in b:
+        return False
+    return a["ci95"][0] <= b["ci95"][1] and b["ci95"][0] <= a["ci95"][1]
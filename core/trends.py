@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta
+
+from core import database
+from core.emulation import DEFAULT_PROFILE
+from core.rollups import GRANULARITIES
+
+"""
+Trends – WebSpeed PRO
+Chuỗi thời gian metric của một URL cho trang Trends:
+ - Cửa sổ ngắn / ít scan: đọc cột của scans (không giải nén payload),
+   giảm còn MAX_POINTS điểm bằng LTTB (giữ nguyên hình dạng đỉnh / đáy)
+ - Cửa sổ dài / nhiều scan: đọc rollups giờ / ngày (p50) – một năm
+   chỉ ~365 dòng, không phụ thuộc số scan
+ - update(): chỉ đọc scan mới (id > id cuối đã đọc), không nạp lại
+"""
+
+# Tên hiển thị -> số ngày (None = toàn bộ)
+WINDOWS = {
+    "24 giờ": 1,
+    "7 ngày": 7,
+    "30 ngày": 30,
+    "90 ngày": 90,
+    "1 năm": 365,
+    "Tất cả": None,
+}
+
+# Số điểm tối đa mỗi series đưa lên chart
+MAX_POINTS = 600
+
+# Quá số scan này trong cửa sổ thì dùng rollups thay cho dữ liệu thô
+RAW_LIMIT = 20000
+
+# Đơn vị hiển thị (size lưu theo byte)
+SCALE = {"size": 1 / 1024}
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def lttb(points: list, threshold: int) -> list:
+    """
+    Largest-Triangle-Three-Buckets: chọn threshold điểm từ [(x, y)] (x tăng
+    dần) sao cho hình dạng đường gần bản gốc nhất. O(n).
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # Trung bình bucket kế tiếp (đỉnh thứ ba của tam giác)
+        next_end = min(int((i + 2) * every) + 1, n)
+        bucket = points[end:next_end]
+        avg_x = sum(p[0] for p in bucket) / len(bucket)
+        avg_y = sum(p[1] for p in bucket) / len(bucket)
+
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+class TrendData:
+    """
+    Dữ liệu trend của một (URL, profile, cửa sổ) cho nhiều metric.
+    series = {metric: ([datetime], [giá trị])}
+    """
+
+    def __init__(self, url: str, metrics: tuple, days: int = None,
+                 profile: str = DEFAULT_PROFILE):
+        self.url = url
+        self.metrics = tuple(metrics)
+        self.days = days
+        self.profile = profile or DEFAULT_PROFILE
+
+        self.source = None   # "raw" | "hour" | "day"
+        self.series = {}
+        self.last_id = 0
+        self._raw = {}
+
+    def _since(self) -> datetime:
+        if self.days is None:
+            return None
+        return datetime.now() - timedelta(days=self.days)
+
+    def _pick_source(self, since: datetime) -> str:
+        if self.days is not None and self.days <= database.RAW_RETENTION_DAYS:
+            n = database.count_trend_points(self.url, self.profile, since.strftime(_TIME_FORMAT))
+            if n <= RAW_LIMIT:
+                return "raw"
+        if self.days is not None and self.days <= database.HOURLY_RETENTION_DAYS:
+            return "hour"
+        return "day"
+
+    # -----------------------------------------------------------
+    # NẠP
+    # -----------------------------------------------------------
+    def load(self):
+        since = self._since()
+        self.source = self._pick_source(since)
+        self.last_id = database.get_max_scan_id()
+
+        if self.source == "raw":
+            self._raw = {m: [] for m in self.metrics}
+            self._append_raw(database.get_trend_points(
+                self.url, self.metrics, self.profile, since.strftime(_TIME_FORMAT),
+            ))
+        else:
+            self._load_rollups(since)
+        return self
+
+    def _load_rollups(self, since: datetime):
+        fmt = GRANULARITIES[self.source]
+        for m in self.metrics:
+            rows = database.get_rollups(
+                self.url, m, self.source,
+                since=since.strftime(fmt) if since else None,
+                profile=self.profile,
+            )
+            scale = SCALE.get(m, 1)
+            points = [
+                (datetime.strptime(r["bucket"], fmt).timestamp(), r["p50"] * scale)
+                for r in rows
+            ]
+            self.series[m] = self._to_series(lttb(points, MAX_POINTS))
+
+    def _append_raw(self, rows: list):
+        for row in rows:
+            self.last_id = max(self.last_id, row[0])
+            try:
+                ts = datetime.strptime(row[1], _TIME_FORMAT).timestamp()
+            except (TypeError, ValueError):
+                continue
+            for m, value in zip(self.metrics, row[2:]):
+                if value is not None:
+                    self._raw[m].append((ts, value * SCALE.get(m, 1)))
+
+        # Cửa sổ trượt: bỏ điểm đã ra khỏi cửa sổ
+        since = self._since()
+        if since is not None:
+            cutoff = since.timestamp()
+            for m, points in self._raw.items():
+                k = 0
+                while k < len(points) and points[k][0] < cutoff:
+                    k += 1
+                if k:
+                    del points[:k]
+
+        for m, points in self._raw.items():
+            self.series[m] = self._to_series(lttb(points, MAX_POINTS))
+
+    @staticmethod
+    def _to_series(points: list) -> tuple:
+        return (
+            [datetime.fromtimestamp(x) for x, _ in points],
+            [y for _, y in points],
+        )
+
+    # -----------------------------------------------------------
+    # CẬP NHẬT DẦN
+    # -----------------------------------------------------------
+    def update(self) -> bool:
+        """
+        Đọc scan mới của URL kể từ lần nạp trước. True nếu series thay đổi.
+        """
+        if self.source is None:
+            self.load()
+            return True
+
+        rows = database.get_trend_points(self.url, self.metrics, self.profile,
+                                         after_id=self.last_id)
+        if not rows:
+            return False
+
+        if self.source == "raw":
+            self._append_raw(rows)
+        else:
+            # Scan mới rơi vào bucket giờ / ngày hiện tại: đọc lại rollups
+            # (vài trăm dòng) thay vì cộng dồn phía UI
+            self.last_id = rows[-1][0]
+            self._load_rollups(self._since())
+        return True
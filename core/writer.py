@@ -0,0 +1,156 @@
+import asyncio
+import atexit
+import queue
+import threading
+import time
+
+from core.database import save_scan, save_scans
+
+"""
+Write-behind Writer – WebSpeed PRO
+Scan xong chỉ đẩy kết quả vào hàng đợi; một thread nền gom lại và
+ghi vào history.db theo lô (một transaction cho mỗi lô):
+ - Flush khi đủ BATCH_SIZE scan hoặc sau FLUSH_INTERVAL giây
+ - Hàng đợi có giới hạn: đầy thì submit() chờ (back-pressure)
+ - flush() chờ tới khi mọi scan đã submit được ghi xong
+ - Tự flush khi process thoát
+"""
+
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 1.0
+MAX_QUEUE = 1000
+
+_STOP = object()
+
+
+class ScanWriter:
+    def __init__(
+        self,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_queue: int = MAX_QUEUE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="scan-writer", daemon=True
+                )
+                self._thread.start()
+
+    # -----------------------------------------------------------
+    # PUBLIC
+    # -----------------------------------------------------------
+    def submit(self, data: dict):
+        """
+        Đưa scan vào hàng đợi. Block nếu hàng đợi đầy.
+        """
+        self._ensure_started()
+        self._queue.put(data)
+
+    async def submit_async(self, data: dict):
+        """
+        Như submit() nhưng không chặn event loop khi hàng đợi đầy.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, data)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Chờ tới khi mọi scan đã submit trước đó được ghi xuống DB.
+        """
+        if self._thread is None:
+            return True
+
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is None or not thread.is_alive():
+            return
+
+        self._queue.put(_STOP)
+        thread.join()
+
+    # -----------------------------------------------------------
+    # THREAD NỀN
+    # -----------------------------------------------------------
+    def _run(self):
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None
+            if batch:
+                timeout = max(0.0, deadline - time.monotonic())
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(batch)
+                batch = []
+                continue
+
+            if item is _STOP:
+                self._write(batch)
+                return
+
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                batch = []
+                item.set()
+                continue
+
+            batch.append(item)
+            if len(batch) == 1:
+                deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+
+    def _write(self, batch: list):
+        if not batch:
+            return
+
+        try:
+            save_scans(batch)
+        except Exception:
+            # Một scan lỗi không được làm mất cả lô: ghi lại từng cái
+            for data in batch:
+                try:
+                    save_scan(data)
+                except Exception:
+                    pass
+
+
+# -----------------------------------------------------------
+# SINGLETON CHO TOÀN PROCESS
+# -----------------------------------------------------------
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> ScanWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ScanWriter()
+            # đăng ký sau core.database nên chạy trước close_db()
+            atexit.register(_writer.close)
+        return _writer
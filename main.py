@@ -1,10 +1,41 @@
+import time
+
+# Mốc đo thời gian khởi động: trước mọi import nặng
+_STARTED = time.perf_counter()
+
 import sys
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QFile, QTextStream
+from PyQt6.QtCore import QFile, QTextStream, QTimer
 from ui.main_window import MainWindow
 from core.database import init_db
 
+# Startup quá ngưỡng này (ms) thì in cảnh báo – dễ thấy khi có regression
+STARTUP_BUDGET_MS = 1500
+
+
+def _report_startup(imported: float, window: MainWindow, measure_only: bool):
+    """
+    Gọi ở vòng event loop đầu tiên, khi cửa sổ đã hiện.
+    """
+    total = (time.perf_counter() - _STARTED) * 1000
+    pages = ", ".join(f"{i}: {ms:.0f} ms" for i, ms in window.page_build_ms.items())
+    print(
+        f"[startup] window shown in {total:.0f} ms "
+        f"(imports {(imported - _STARTED) * 1000:.0f} ms; pages {pages})",
+        file=sys.stderr,
+    )
+    if total > STARTUP_BUDGET_MS:
+        print(f"[startup] WARNING: over budget ({STARTUP_BUDGET_MS} ms)", file=sys.stderr)
+
+    # --measure-startup: đo xong thoát ngay (dùng cho script / CI)
+    if measure_only:
+        QApplication.instance().quit()
+
+
 if __name__ == "__main__":
+    imported = time.perf_counter()
+    measure_only = "--measure-startup" in sys.argv
+
     # Initialize database
     init_db()
 
@@ -21,4 +52,6 @@ if __name__ == "__main__":
     ui = MainWindow()
     ui.show()
 
+    QTimer.singleShot(0, lambda: _report_startup(imported, ui, measure_only))
+
     sys.exit(app.exec())
@@ -0,0 +1,46 @@
+import pytest
+
+from core.diff import diff_resources, normalize_url
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://cdn.example.com/main.3f2a9c1b.js", "cdn.example.com/main.*.js"),
+    ("https://cdn.example.com/assets/app-BxK2f9Qa.js", "cdn.example.com/assets/app-*.js"),
+    ("https://cdn.example.com/assets/index-D4v8Kq1Z.css", "cdn.example.com/assets/index-*.css"),
+    ("https://cdn.example.com/chunk.a1b2c3d4e5f6.min.js", "cdn.example.com/chunk.*.min.js"),
+    ("https://example.com/app.js?v=123&lang=vi", "example.com/app.js?lang=vi"),
+])
+def test_normalize_strips_bundler_hash(url, key):
+    assert normalize_url(url) == key
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/img/Logo_Footer2024.png",
+    "https://example.com/img/Logo_Header2024.png",
+    "https://example.com/img/Logo-Footer2024.png",
+    "https://example.com/img/HeroBanner2x.png",
+    "https://example.com/img/hero-1920x1080.jpg",
+    "https://example.com/img/photo-20240115.jpg",
+    "https://example.com/fonts/Roboto-Regular.woff2",
+    "https://example.com/js/jquery-3.7.1.min.js",
+])
+def test_normalize_keeps_ordinary_names(url):
+    assert "*" not in normalize_url(url)
+
+
+def _res(name, size=10_000, duration=100, kind="img"):
+    return {"name": name, "transferSize": size, "duration": duration, "initiatorType": kind}
+
+
+def test_new_build_is_same_resource():
+    before = [_res("https://cdn.example.com/assets/app-BxK2f9Qa.js", 100_000, kind="script")]
+    after = [_res("https://cdn.example.com/assets/app-Zq81mKp3.js", 150_000, kind="script")]
+
+    assert [c["kind"] for c in diff_resources(before, after)] == ["grown"]
+
+
+def test_ordinary_names_across_scans_not_paired():
+    before = [_res("https://example.com/img/Logo_Footer2024.png", 10_000)]
+    after = [_res("https://example.com/img/Logo_Header2024.png", 90_000)]
+
+    assert sorted(c["kind"] for c in diff_resources(before, after)) == ["added", "removed"]
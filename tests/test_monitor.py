@@ -0,0 +1,131 @@
+import asyncio
+import random
+import sys
+import types
+from collections import Counter
+
+import pytest
+
+from core import monitor
+
+INTERVAL = 3600
+URL = "https://example.com/"
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeDatabase:
+    """
+    Bảng monitors trong bộ nhớ – đủ cho Monitor.run / _catch_up.
+    """
+
+    def __init__(self, rows: list):
+        self.rows = {m["id"]: dict(m) for m in rows}
+
+    def get_due_monitors(self, now, limit=100):
+        due = sorted(
+            (m for m in self.rows.values() if m["next_run"] <= now),
+            key=lambda m: m["next_run"],
+        )
+        return [dict(m) for m in due[:limit]]
+
+    def get_next_monitor_run(self):
+        return min((m["next_run"] for m in self.rows.values()), default=None)
+
+    def update_monitor_schedule(self, items):
+        for id, next_run in items:
+            self.rows[id]["next_run"] = next_run
+
+    def record_monitor_run(self, id, last_run, status):
+        self.rows[id]["last_run"] = last_run
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """
+    Chạy Monitor.run với đồng hồ giả: mỗi lần ngủ nhảy thẳng tới next_run
+    (kể cả jitter âm), ghi lại thời điểm từng lần scan.
+    """
+    random.seed(1)
+    start = 1_700_000_000.0
+    clock = FakeClock(monitor.next_slot(URL, INTERVAL, start))
+    db = FakeDatabase([{
+        "id": 1, "url": URL, "interval": INTERVAL, "profile": None,
+        "next_run": monitor.schedule_next(URL, INTERVAL, clock.now),
+    }])
+    runs = []
+
+    async def scan_async(url, profile=None):
+        runs.append(clock.now)
+        return {}
+
+    writer = types.SimpleNamespace(flush=lambda: None)
+    monkeypatch.setitem(sys.modules, "core.scanner", types.SimpleNamespace(scan_async=scan_async))
+    monkeypatch.setitem(sys.modules, "core.batch", types.SimpleNamespace(
+        MAX_IN_FLIGHT=8, PER_HOST_LIMIT=2, _host_of=lambda url: "example.com",
+    ))
+    monkeypatch.setitem(sys.modules, "core.writer", types.SimpleNamespace(get_writer=lambda: writer))
+    monkeypatch.setattr(monitor, "database", db)
+    monkeypatch.setattr(monitor.time, "time", clock.time)
+
+    def run(slots: int) -> list:
+        m = monitor.Monitor()
+        end = clock.now + slots * INTERVAL
+
+        async def fake_sleep(now):
+            # Cho các task scan chạy xong rồi mới nhảy đồng hồ
+            while m._running:
+                await asyncio.sleep(0)
+            clock.now = max(clock.now, db.get_next_monitor_run())
+            if clock.now >= end:
+                m.stop()
+
+        m._sleep = fake_sleep
+        asyncio.run(m.run())
+        return runs
+
+    return run
+
+
+def test_one_run_per_slot(scheduler):
+    slots = 200
+    runs = scheduler(slots)
+
+    phase = monitor._phase(URL, INTERVAL)
+    per_slot = Counter(round((t - phase) / INTERVAL) for t in runs)
+
+    assert len(per_slot) >= slots
+    assert max(per_slot.values()) == 1
+
+
+def test_schedule_next_skips_slot_just_started():
+    random.seed(2)
+    slot = monitor.next_slot(URL, INTERVAL, 1_700_000_000.0)
+    margin = INTERVAL * monitor.JITTER_FRACTION
+
+    # Lần chạy bắt đầu sớm (jitter âm) hay muộn đều sang mốc sau
+    for started in (slot - margin, slot - 1, slot, slot + margin):
+        nxt = monitor.schedule_next(URL, INTERVAL, started)
+        assert slot + INTERVAL - margin <= nxt <= slot + INTERVAL + margin
+
+
+def test_catch_up_not_after_regular_slot(monkeypatch):
+    random.seed(3)
+    now = 1_700_000_000.0
+    db = FakeDatabase([
+        {"id": i, "url": f"https://example.com/{i}", "interval": 120,
+         "profile": None, "next_run": now - 10 * 120}
+        for i in range(50)
+    ])
+    monkeypatch.setattr(monitor, "database", db)
+
+    assert monitor._catch_up(now) == 50
+    for m in db.rows.values():
+        regular = monitor.next_slot(m["url"], 120, now + 120 * monitor.JITTER_FRACTION)
+        assert now <= m["next_run"] <= regular + 120 * monitor.JITTER_FRACTION
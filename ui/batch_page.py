@@ -1,3 +1,5 @@
+import os
+
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -9,10 +11,12 @@ from PyQt6.QtWidgets import (
     QTableWidgetItem,
     QHeaderView,
     QMessageBox,
+    QSpinBox,
+    QComboBox,
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 
-from core.batch import batch_scan
+from core.emulation import PROFILES, DEFAULT_PROFILE
 
 
 # ========================================================================
@@ -23,16 +27,23 @@ class BatchWorker(QThread):
     progress_signal = pyqtSignal(int, str, str, object)
     finish_signal = pyqtSignal(list)
 
-    def __init__(self, urls: list):
+    def __init__(self, urls: list, processes: int = 1, profile: str = None):
         super().__init__()
         self.urls = urls
+        self.processes = processes
+        self.profile = profile
 
     def run(self):
+        # Import khi chạy (thread nền): Playwright không nằm trên đường khởi động
+        from core.batch import batch_scan
+
         results = batch_scan(
             self.urls,
             callback_progress=lambda idx, url, status, data: self.progress_signal.emit(
                 idx, url, status, data
             ),
+            processes=self.processes,
+            profile=self.profile,
         )
         self.finish_signal.emit(results)
 
@@ -70,10 +81,30 @@ class BatchPage(QWidget):
         self.url_list_box.setMinimumHeight(120)
         input_box.addWidget(self.url_list_box)
 
+        start_row = QHBoxLayout()
+
+        # Số worker process (1 = chạy trong process hiện tại)
+        start_row.addWidget(QLabel("Processes:"))
+        self.spin_processes = QSpinBox()
+        self.spin_processes.setRange(1, os.cpu_count() or 1)
+        self.spin_processes.setValue(1)
+        self.spin_processes.setMinimumHeight(40)
+        start_row.addWidget(self.spin_processes)
+
+        # Emulation profile áp dụng cho cả batch
+        start_row.addWidget(QLabel("Profile:"))
+        self.cmb_profile = QComboBox()
+        self.cmb_profile.addItems(list(PROFILES))
+        self.cmb_profile.setCurrentText(DEFAULT_PROFILE)
+        self.cmb_profile.setMinimumHeight(40)
+        start_row.addWidget(self.cmb_profile)
+
         self.btn_start = QPushButton("Start Batch Scan")
         self.btn_start.setMinimumHeight(40)
         self.btn_start.clicked.connect(self.start_batch)
-        input_box.addWidget(self.btn_start)
+        start_row.addWidget(self.btn_start, stretch=1)
+
+        input_box.addLayout(start_row)
 
         main.addLayout(input_box)
 
@@ -134,7 +165,9 @@ class BatchPage(QWidget):
             self.table.setItem(i, 1, QTableWidgetItem("Waiting..."))
 
         # Run worker
-        self.worker = BatchWorker(urls)
+        self.worker = BatchWorker(
+            urls, self.spin_processes.value(), self.cmb_profile.currentText()
+        )
         self.worker.progress_signal.connect(self.update_progress)
         self.worker.finish_signal.connect(self.finish_batch)
         self.worker.start()
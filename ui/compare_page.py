@@ -11,7 +11,7 @@ from PyQt6.QtWidgets import (
     QMessageBox,
 )
 from PyQt6.QtCore import Qt
-from core.scanner import scan
+from ui.scan_runner import ScanRunner
 from ui.widgets.chart_bar import BarChart
 from ui.widgets.chart_radar import RadarChart
 
@@ -50,12 +50,21 @@ class ComparePage(QWidget):
         self.btn_compare.setMinimumHeight(40)
         self.btn_compare.clicked.connect(self.do_compare)
 
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.setMinimumHeight(40)
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel_compare)
+
         row.addWidget(self.url1)
         row.addWidget(self.url2)
         row.addWidget(self.btn_compare)
+        row.addWidget(self.btn_cancel)
 
         main.addLayout(row)
 
+        self.lbl_status = QLabel("")
+        main.addWidget(self.lbl_status)
+
         # ---------------------------------------------------------
         # BAR CHART COMPARISON
         # ---------------------------------------------------------
@@ -94,6 +103,18 @@ class ComparePage(QWidget):
         self.data1 = None
         self.data2 = None
 
+        # 2 URL được scan song song, nền
+        self.runner = ScanRunner(self)
+        self.runner.progress.connect(self.on_progress)
+        self.runner.finished.connect(self.on_finished)
+        self.runner.failed.connect(self.on_failed)
+        self.runner.cancelled.connect(self.on_cancelled)
+
+        self._jobs = {}
+        self._results = {}
+        self._stages = {}
+        self._errors = []
+
     # ====================================================================
     # COMPARE ACTION
     # ====================================================================
@@ -105,16 +126,80 @@ class ComparePage(QWidget):
             QMessageBox.warning(self, "Error", "Cần nhập đủ 2 URL.")
             return
 
-        try:
-            self.data1 = scan(u1)
-            self.data2 = scan(u2)
+        self._results = {}
+        self._stages = {}
+        self._errors = []
+
+        self.btn_compare.setEnabled(False)
+        self.btn_cancel.setEnabled(True)
+
+        # job -> vị trí (1 hoặc 2)
+        self._jobs = {}
+        self._jobs[self.runner.start(u1)] = 1
+        self._jobs[self.runner.start(u2)] = 2
+        self.lbl_status.setText("Đang scan 2 URL...")
+
+    def cancel_compare(self):
+        self.runner.cancel()
+
+    # ====================================================================
+    # SCAN CALLBACKS (GUI thread)
+    # ====================================================================
+    def on_progress(self, job, stage: str):
+        slot = self._jobs.get(job)
+        if slot is None:
+            return
+        self._stages[slot] = stage
+        self.lbl_status.setText(
+            f"URL 1: {self._stages.get(1, 'queued')} | "
+            f"URL 2: {self._stages.get(2, 'queued')}"
+        )
+
+    def on_finished(self, job, data: dict):
+        slot = self._jobs.get(job)
+        if slot is None:
+            return
+        self._results[slot] = data
+        self._maybe_complete()
+
+    def on_failed(self, job, error: str):
+        slot = self._jobs.get(job)
+        if slot is None:
+            return
+        self._results[slot] = None
+        self._errors.append(f"{job.url}: {error}")
+        self._maybe_complete()
+
+    def on_cancelled(self, job):
+        slot = self._jobs.get(job)
+        if slot is None:
+            return
+        self._results[slot] = None
+        self._maybe_complete()
+
+    def _maybe_complete(self):
+        if len(self._results) < 2:
+            return
+
+        self.btn_compare.setEnabled(True)
+        self.btn_cancel.setEnabled(False)
+
+        if self._errors:
+            self.lbl_status.setText("")
+            QMessageBox.critical(self, "Error", "\n".join(self._errors))
+            return
+
+        if self._results[1] is None or self._results[2] is None:
+            self.lbl_status.setText("Đã hủy so sánh.")
+            return
 
-            self.update_charts()
-            self.update_table()
-            self.update_summary()
+        self.lbl_status.setText("")
+        self.data1 = self._results[1]
+        self.data2 = self._results[2]
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.update_charts()
+        self.update_table()
+        self.update_summary()
 
     # ====================================================================
     # UPDATE BAR + RADAR CHARTS
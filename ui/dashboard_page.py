@@ -1,9 +1,10 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
-    QPushButton, QLabel, QFrame, QMessageBox
+    QPushButton, QLabel, QFrame, QMessageBox, QSpinBox, QComboBox
 )
 from PyQt6.QtCore import Qt
-from core.scanner import scan
+from core.emulation import PROFILES, DEFAULT_PROFILE
+from ui.scan_runner import ScanRunner
 from ui.widgets.chart_bar import BarChart
 from ui.widgets.chart_radar import RadarChart
 from ui.widgets.card import MetricCard
@@ -31,10 +32,34 @@ class DashboardPage(QWidget):
         self.btn_scan.setMinimumHeight(40)
         self.btn_scan.clicked.connect(self.do_scan)
 
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.setMinimumHeight(40)
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel_scan)
+
+        # Số lần chạy: >1 thì lấy median, giảm nhiễu đo
+        self.spin_runs = QSpinBox()
+        self.spin_runs.setRange(1, 20)
+        self.spin_runs.setValue(1)
+        self.spin_runs.setPrefix("Runs: ")
+        self.spin_runs.setMinimumHeight(40)
+
+        # Emulation profile: mạng / CPU / mobile (core.emulation)
+        self.cmb_profile = QComboBox()
+        self.cmb_profile.addItems(list(PROFILES))
+        self.cmb_profile.setCurrentText(DEFAULT_PROFILE)
+        self.cmb_profile.setMinimumHeight(40)
+
         input_row.addWidget(self.url_input)
+        input_row.addWidget(self.cmb_profile)
+        input_row.addWidget(self.spin_runs)
         input_row.addWidget(self.btn_scan)
+        input_row.addWidget(self.btn_cancel)
         main.addLayout(input_row)
 
+        self.lbl_status = QLabel("")
+        main.addWidget(self.lbl_status)
+
         # ---------------------------------------------------------
         # SUMMARY CARDS (DNS / TCP / TTFB / DOM / LOAD)
         # ---------------------------------------------------------
@@ -62,10 +87,14 @@ class DashboardPage(QWidget):
         self.card_lcp = MetricCard("LCP", "0 ms")
         self.card_fid = MetricCard("FID", "0 ms")
         self.card_cls = MetricCard("CLS", "0")
+        self.card_inp = MetricCard("INP", "0 ms")
+        self.card_tbt = MetricCard("TBT", "0 ms")
 
         vitals_row.addWidget(self.card_lcp)
         vitals_row.addWidget(self.card_fid)
         vitals_row.addWidget(self.card_cls)
+        vitals_row.addWidget(self.card_inp)
+        vitals_row.addWidget(self.card_tbt)
 
         main.addLayout(vitals_row)
 
@@ -100,6 +129,13 @@ class DashboardPage(QWidget):
         # ---------------------------------------------------------
         self.last_data = None
 
+        # Scan chạy nền, UI không bị treo
+        self.runner = ScanRunner(self)
+        self.runner.progress.connect(self.on_progress)
+        self.runner.finished.connect(self.on_finished)
+        self.runner.failed.connect(self.on_failed)
+        self.runner.cancelled.connect(self.on_cancelled)
+
 
     # ============================================================
     # ACTION: SCAN WEBSITE
@@ -110,13 +146,49 @@ class DashboardPage(QWidget):
             QMessageBox.warning(self, "Error", "URL không được để trống.")
             return
 
-        try:
-            data = scan(url)
-            self.last_data = data
-            self.update_ui(data)
+        self.set_busy(True)
+        self.runner.start(
+            url,
+            runs=self.spin_runs.value(),
+            profile=self.cmb_profile.currentText(),
+        )
+
+    def cancel_scan(self):
+        self.runner.cancel()
+
+    def set_busy(self, busy: bool):
+        self.btn_scan.setEnabled(not busy)
+        self.btn_cancel.setEnabled(busy)
+        if busy:
+            self.lbl_status.setText("Đang chờ...")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Scan Failed", str(e))
+    # ============================================================
+    # SCAN CALLBACKS (GUI thread)
+    # ============================================================
+    def on_progress(self, job, stage: str):
+        labels = {
+            "opening": "Đang mở trình duyệt...",
+            "navigating": f"Đang tải {job.url}...",
+            "screenshot": "Đang chụp màn hình...",
+            "collecting": "Đang thu thập số liệu...",
+            "done": "Hoàn tất.",
+        }
+        self.lbl_status.setText(labels.get(stage, stage))
+
+    def on_finished(self, job, data: dict):
+        self.set_busy(False)
+        self.lbl_status.setText(f"Hoàn tất: {job.url}")
+        self.last_data = data
+        self.update_ui(data)
+
+    def on_failed(self, job, error: str):
+        self.set_busy(False)
+        self.lbl_status.setText("")
+        QMessageBox.critical(self, "Scan Failed", error)
+
+    def on_cancelled(self, job):
+        self.set_busy(False)
+        self.lbl_status.setText("Đã hủy scan.")
 
 
     # ============================================================
@@ -137,6 +209,8 @@ class DashboardPage(QWidget):
         self.card_lcp.set_value(f"{int(v['LCP'])} ms")
         self.card_fid.set_value(f"{int(v['FID'])} ms")
         self.card_cls.set_value(str(v['CLS']))
+        self.card_inp.set_value(f"{int(v.get('INP', 0))} ms")
+        self.card_tbt.set_value(f"{int(v.get('TBT', 0))} ms")
 
         # CHART BAR
         self.chart_bar.plot(
@@ -0,0 +1,88 @@
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+
+# Bảng resource chỉ hiện tối đa số dòng này (đã sort theo mức thay đổi)
+MAX_ROWS = 500
+
+
+class DiffDialog(QDialog):
+    """
+    Kết quả core.diff.diff_scans: tổng quan, bảng theo (type, host),
+    bảng từng resource thay đổi.
+    """
+
+    def __init__(self, result: dict, before_id: int, after_id: int, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle(f"Diff #{before_id} -> #{after_id}")
+        self.resize(1000, 700)
+
+        main = QVBoxLayout(self)
+
+        s = result["summary"]
+        text = (
+            f"{s['added']} added, {s['removed']} removed, {s['grown']} grown, "
+            f"{s['slowed']} slowed – tổng {s['bytes_delta'] / 1024:+.1f} KB"
+        )
+        if result["slim"]:
+            text += "\nPayload đã thu gọn bởi retention – không còn danh sách resource."
+        summary = QLabel(text)
+        summary.setStyleSheet("font-size: 15px; font-weight: bold;")
+        main.addWidget(summary)
+
+        # ---------------------------------------------------------
+        # THEO TYPE / HOST
+        # ---------------------------------------------------------
+        main.addWidget(QLabel("Theo initiatorType / host"))
+        self.tbl_groups = self._table(
+            ["Type", "Host", "Added", "Removed", "Grown", "Slowed", "Δ KB", "Δ ms"],
+            [
+                (g["type"], g["host"], g["added"], g["removed"], g["grown"], g["slowed"],
+                 f"{g['bytes_delta'] / 1024:+.1f}", f"{g['duration_delta']:+.0f}")
+                for g in result["groups"]
+            ],
+        )
+        main.addWidget(self.tbl_groups, stretch=1)
+
+        # ---------------------------------------------------------
+        # TỪNG RESOURCE
+        # ---------------------------------------------------------
+        changes = result["changes"]
+        label = "Resource"
+        if len(changes) > MAX_ROWS:
+            label += f" ({MAX_ROWS}/{len(changes)} thay đổi lớn nhất)"
+        main.addWidget(QLabel(label))
+
+        self.tbl_changes = self._table(
+            ["Kind", "Type", "Δ KB", "Δ ms", "URL"],
+            [
+                (c["kind"], c["type"], f"{c['bytes_delta'] / 1024:+.1f}",
+                 f"{c['duration_delta']:+.0f}", c["name"])
+                for c in changes[:MAX_ROWS]
+            ],
+            stretch_last=True,
+        )
+        main.addWidget(self.tbl_changes, stretch=2)
+
+    @staticmethod
+    def _table(headers: list, rows: list, stretch_last: bool = False) -> QTableWidget:
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                table.setItem(r, c, QTableWidgetItem(str(value)))
+
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        if stretch_last:
+            header.setStretchLastSection(True)
+        return table
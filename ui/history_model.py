@@ -0,0 +1,151 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from core.database import HISTORY_COLUMNS, get_history_page, count_history
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    Model cho bảng History: chỉ nạp từng trang từ core.database khi view
+    cuộn tới (canFetchMore / fetchMore), sort và filter chạy bằng SQL.
+    """
+
+    PAGE_SIZE = 200
+
+    # (header, cột trong HISTORY_COLUMNS)
+    COLUMNS = [
+        ("ID", "id"),
+        ("URL", "url"),
+        ("TTFB", "ttfb"),
+        ("Load", "load"),
+        ("LCP", "lcp"),
+        ("Requests", "requests"),
+        ("Size (KB)", "size"),
+        ("Runs", "runs"),
+        ("Profile", "profile"),
+        ("Time", "created_at"),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._rows = []
+        self._exhausted = False
+        self._total = 0
+
+        self._sort = "id"
+        self._descending = True
+        self._filters = {}
+
+        self._field_index = [HISTORY_COLUMNS.index(f) for _, f in self.COLUMNS]
+
+        self.reload()
+
+    # ====================================================================
+    # PUBLIC
+    # ====================================================================
+    def reload(self):
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        self._total = count_history(**self._filters)
+        self._rows = self._load_page()
+        self.endResetModel()
+
+    def set_filter(self, url: str = None, date_from: str = None, date_to: str = None):
+        self._filters = {
+            "url_filter": url or None,
+            "date_from": date_from or None,
+            "date_to": date_to or None,
+        }
+        self.reload()
+
+    def row_id(self, row: int):
+        if 0 <= row < len(self._rows):
+            return self._rows[row][0]
+        return None
+
+    def total(self) -> int:
+        return self._total
+
+    # ====================================================================
+    # PAGING
+    # ====================================================================
+    def _load_page(self) -> list:
+        """
+        Trang kế tiếp sau dòng cuối đang có (keyset theo cột sort + id).
+        """
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last[HISTORY_COLUMNS.index(self._sort)], last[0])
+
+        page = get_history_page(
+            limit=self.PAGE_SIZE,
+            after=after,
+            sort=self._sort,
+            descending=self._descending,
+            **self._filters,
+        )
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        return page
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        page = self._load_page()
+        if not page:
+            return
+
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    # ====================================================================
+    # QAbstractTableModel
+    # ====================================================================
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        val = self._rows[index.row()][self._field_index[index.column()]]
+
+        # Size: convert to KB
+        if self.COLUMNS[index.column()][1] == "size":
+            return f"{(val or 0) / 1024:.1f}"
+        return str(val)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # column = -1: view bỏ sort -> về thứ tự mặc định (id giảm dần)
+        if column < 0:
+            sort, descending = "id", True
+        else:
+            sort = self.COLUMNS[column][1]
+            descending = order == Qt.SortOrder.DescendingOrder
+
+        # setSortingEnabled / sortByColumn lúc dựng trang gọi lại đúng thứ
+        # tự đã nạp trong __init__: không query lại DB
+        if (sort, descending) == (self._sort, self._descending):
+            return
+
+        self._sort = sort
+        self._descending = descending
+        self.reload()
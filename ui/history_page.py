@@ -3,15 +3,20 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
+    QCheckBox,
+    QDateEdit,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
     QMessageBox,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QDate, QTimer
 
-from core.database import get_history, get_scan, delete_history, clear_history
+from core.database import get_scan, get_scan_regression, delete_history, clear_history
+from core.emulation import DEFAULT_PROFILE
+from core.stats import ci_overlap
+from ui.history_model import HistoryTableModel
 
 
 class HistoryPage(QWidget):
@@ -32,19 +37,63 @@ class HistoryPage(QWidget):
         main.addWidget(title)
 
         # ------------------------------------------------------------
-        # TABLE
+        # FILTER: URL + DATE RANGE
         # ------------------------------------------------------------
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "URL", "TTFB", "Load", "LCP", "Requests", "Size (KB)", "Time"]
-        )
+        filters = QHBoxLayout()
+
+        self.url_filter = QLineEdit()
+        self.url_filter.setPlaceholderText("Lọc theo URL...")
+        self.url_filter.textChanged.connect(self._schedule_filter)
+        filters.addWidget(self.url_filter, stretch=1)
+
+        self.chk_date = QCheckBox("Từ ngày")
+        self.chk_date.toggled.connect(self.apply_filter)
+        filters.addWidget(self.chk_date)
+
+        self.date_from = QDateEdit(QDate.currentDate().addDays(-7))
+        self.date_from.setCalendarPopup(True)
+        self.date_from.setDisplayFormat("yyyy-MM-dd")
+        self.date_from.dateChanged.connect(self.apply_filter)
+        filters.addWidget(self.date_from)
+
+        filters.addWidget(QLabel("đến"))
+
+        self.date_to = QDateEdit(QDate.currentDate())
+        self.date_to.setCalendarPopup(True)
+        self.date_to.setDisplayFormat("yyyy-MM-dd")
+        self.date_to.dateChanged.connect(self.apply_filter)
+        filters.addWidget(self.date_to)
+
+        self.lbl_count = QLabel("")
+        filters.addWidget(self.lbl_count)
+
+        main.addLayout(filters)
+
+        # Gõ filter liên tục không query DB mỗi phím
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(250)
+        self._filter_timer.timeout.connect(self.apply_filter)
+
+        # ------------------------------------------------------------
+        # TABLE (model phân trang, sort phía DB)
+        # ------------------------------------------------------------
+        self.model = HistoryTableModel(self)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
         self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
         self.table.setSelectionMode(self.table.SelectionMode.ExtendedSelection)
-        self.table.cellDoubleClicked.connect(self.view_detail)
+        # Indicator khớp thứ tự model đã nạp (id giảm dần) trước khi bật
+        # sort, để view không yêu cầu sort lại
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.doubleClicked.connect(
+            lambda index: self.view_detail(index.row(), index.column())
+        )
 
         main.addWidget(self.table)
 
@@ -62,19 +111,23 @@ class HistoryPage(QWidget):
         self.btn_compare = QPushButton("Compare Selected")
         self.btn_compare.clicked.connect(self.compare_selected)
 
+        self.btn_diff = QPushButton("Diff Selected")
+        self.btn_diff.clicked.connect(self.diff_selected)
+
         self.btn_clear = QPushButton("Clear All")
         self.btn_clear.clicked.connect(self.clear_all)
 
         btns.addWidget(self.btn_refresh)
         btns.addWidget(self.btn_delete)
         btns.addWidget(self.btn_compare)
+        btns.addWidget(self.btn_diff)
         btns.addWidget(self.btn_clear)
         btns.addStretch()
 
         main.addLayout(btns)
 
-        # Load immediately
-        self.load_history()
+        # Trang đầu đã được model nạp sẵn
+        self._update_count()
 
         # hold selected data
         self.current_selected_data = None
@@ -83,27 +136,33 @@ class HistoryPage(QWidget):
     # LOAD HISTORY INTO TABLE
     # ====================================================================
     def load_history(self):
-        rows = get_history()
-        self.table.setRowCount(len(rows))
+        # Model chỉ nạp trang đầu; các trang sau nạp khi cuộn tới
+        self.model.reload()
+        self._update_count()
+
+    def _schedule_filter(self):
+        self._filter_timer.start()
+
+    def apply_filter(self):
+        date_from = date_to = None
+        if self.chk_date.isChecked():
+            date_from = self.date_from.date().toString("yyyy-MM-dd")
+            date_to = self.date_to.date().toString("yyyy-MM-dd")
 
-        for row_idx, row in enumerate(rows):
-            for col_idx, val in enumerate(row):
-                # Size: convert to KB
-                if col_idx == 6:
-                    val = f"{val / 1024:.1f}"
-                item = QTableWidgetItem(str(val))
-                self.table.setItem(row_idx, col_idx, item)
+        self.model.set_filter(self.url_filter.text().strip(), date_from, date_to)
+        self._update_count()
+
+    def _update_count(self):
+        self.lbl_count.setText(f"{self.model.total()} scans")
 
     # ====================================================================
     # VIEW DETAILS (DOUBLE CLICK)
     # ====================================================================
     def view_detail(self, row, col):
-        id_item = self.table.item(row, 0)
-        if not id_item:
+        id_val = self.model.row_id(row)
+        if id_val is None:
             return
 
-        id_val = int(id_item.text())
-
         data = get_scan(id_val)
         if not data:
             QMessageBox.warning(self, "Error", "Không tải được dữ liệu.")
@@ -121,19 +180,30 @@ class HistoryPage(QWidget):
             f"Requests: {data['total_requests']}\n"
             f"Size: {data['total_size']/1024:.2f} KB\n"
         )
+
+        # Regression so với baseline của URL (core.regression)
+        regression = get_scan_regression(id_val)
+        if regression:
+            def num(v):
+                return f"{v:.0f}" if abs(v) >= 10 else f"{v:.3f}"
+
+            msg += f"\nRegression ({regression['kind']}):\n"
+            for m in regression["metrics"]:
+                msg += f"  {m['metric']}: {num(m['baseline'])} -> {num(m['value'])}\n"
+            for r in regression["resources"][:5]:
+                msg += f"  {r['field']} {r['type']} {r['host']}: {num(r['baseline'])} -> {num(r['value'])}\n"
+
         QMessageBox.information(self, "Scan Details", msg)
 
     # ====================================================================
     # DELETE SELECTED
     # ====================================================================
     def delete_selected(self):
-        row = self.table.currentRow()
-        if row < 0:
+        id_val = self.model.row_id(self.table.currentIndex().row())
+        if id_val is None:
             QMessageBox.warning(self, "Error", "Chưa chọn dòng nào.")
             return
 
-        id_val = int(self.table.item(row, 0).text())
-
         delete_history(id_val)
         self.load_history()
         QMessageBox.information(self, "Done", "Đã xóa.")
@@ -157,23 +227,33 @@ class HistoryPage(QWidget):
     # ====================================================================
     # COMPARE TWO SCANS (BEFORE / AFTER)
     # ====================================================================
-    def compare_selected(self):
+    def _selected_pair(self):
+        """
+        (id cũ, id mới) của đúng 2 dòng đang chọn; None (đã báo lỗi) nếu không.
+        """
         selected_rows = self.table.selectionModel().selectedRows()
         if len(selected_rows) != 2:
             QMessageBox.warning(self, "Error", "Chon chinh xac 2 dong de so sanh (Before/After).")
-            return
+            return None
 
         ids = []
         for idx in selected_rows:
-            id_item = self.table.item(idx.row(), 0)
-            if id_item:
-                ids.append(int(id_item.text()))
+            id_val = self.model.row_id(idx.row())
+            if id_val is not None:
+                ids.append(id_val)
 
         if len(ids) != 2:
             QMessageBox.warning(self, "Error", "Khong doc duoc ID cua 2 dong.")
+            return None
+
+        return tuple(sorted(ids))
+
+    def compare_selected(self):
+        ids = self._selected_pair()
+        if ids is None:
             return
 
-        before_id, after_id = sorted(ids)
+        before_id, after_id = ids
         before = get_scan(before_id)
         after = get_scan(after_id)
 
@@ -181,16 +261,35 @@ class HistoryPage(QWidget):
             QMessageBox.warning(self, "Error", "Khong lay duoc du lieu scan.")
             return
 
-        def fmt(name, b_val, a_val, lower_is_better=True):
+        # Khác profile (mạng / CPU / mobile) thì số đo không so được trực tiếp
+        profile_b = before.get("profile", {}).get("name", DEFAULT_PROFILE)
+        profile_a = after.get("profile", {}).get("name", DEFAULT_PROFILE)
+        profile_note = ""
+        if profile_b != profile_a:
+            profile_note = f"Canh bao: khac profile ({profile_b} / {profile_a})\n"
+
+        # Multi-run: có CI 95% để biết chênh lệch có vượt nhiễu đo không
+        stats_b = before.get("multirun", {}).get("stats", {}).get("cold")
+        stats_a = after.get("multirun", {}).get("stats", {}).get("cold")
+
+        def fmt(name, b_val, a_val, lower_is_better=True, stat=None):
             delta = a_val - b_val
             pct_str = "n/a" if b_val == 0 else f"{(delta / b_val) * 100:+.1f}%"
             direction = "down" if (lower_is_better and delta < 0) or (not lower_is_better and delta > 0) else "up"
-            return f"{name}: Before {b_val}, After {a_val} ({delta:+}, {pct_str}) {direction}"
+            line = f"{name}: Before {b_val}, After {a_val} ({delta:+}, {pct_str}) {direction}"
+
+            if stat and stats_b and stats_a and stats_b[stat].get("n", 0) > 1 and stats_a[stat].get("n", 0) > 1:
+                b_ci = stats_b[stat]["ci95"]
+                a_ci = stats_a[stat]["ci95"]
+                line += f" [CI {b_ci[0]:.0f}-{b_ci[1]:.0f} / {a_ci[0]:.0f}-{a_ci[1]:.0f}]"
+                if ci_overlap(stats_b[stat], stats_a[stat]):
+                    line += " ~ nhieu do"
+            return line
 
         lines = [
-            fmt("TTFB (ms)", before["metrics"]["ttfb"], after["metrics"]["ttfb"]),
-            fmt("Load (ms)", before["metrics"]["load"], after["metrics"]["load"]),
-            fmt("LCP (ms)", int(before["vitals"]["LCP"]), int(after["vitals"]["LCP"])),
+            fmt("TTFB (ms)", before["metrics"]["ttfb"], after["metrics"]["ttfb"], stat="ttfb"),
+            fmt("Load (ms)", before["metrics"]["load"], after["metrics"]["load"], stat="load"),
+            fmt("LCP (ms)", int(before["vitals"]["LCP"]), int(after["vitals"]["LCP"]), stat="LCP"),
             fmt("CLS", before["vitals"]["CLS"], after["vitals"]["CLS"], lower_is_better=True),
             fmt("Requests", before["total_requests"], after["total_requests"]),
             fmt(
@@ -204,5 +303,26 @@ class HistoryPage(QWidget):
         score_after = after["metrics"]["ttfb"] + after["metrics"]["load"]
         headline = "Nhanh hon sau toi uu!" if score_after < score_before else "Can toi uu them."
 
-        msg = headline + "\n\n" + "\n".join(lines)
+        msg = profile_note + headline + "\n\n" + "\n".join(lines)
         QMessageBox.information(self, "Before / After", msg)
+
+    # ====================================================================
+    # RESOURCE DIFF (core.diff)
+    # ====================================================================
+    def diff_selected(self):
+        ids = self._selected_pair()
+        if ids is None:
+            return
+
+        before_id, after_id = ids
+        before = get_scan(before_id)
+        after = get_scan(after_id)
+
+        if not before or not after:
+            QMessageBox.warning(self, "Error", "Khong lay duoc du lieu scan.")
+            return
+
+        from core.diff import diff_scans
+        from ui.diff_dialog import DiffDialog
+
+        DiffDialog(diff_scans(before, after), before_id, after_id, self).exec()
@@ -1,10 +1,19 @@
+import importlib
+import time
+
 from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QListWidget
-from ui.dashboard_page import DashboardPage
-from ui.resource_page import ResourcePage
-from ui.analysis_page import AnalysisPage
-from ui.compare_page import ComparePage
-from ui.history_page import HistoryPage
-from ui.batch_page import BatchPage
+
+# (tên sidebar, module, class) – module của trang chỉ được import
+# khi người dùng mở trang đó lần đầu
+PAGES = [
+    ("Dashboard", "ui.dashboard_page", "DashboardPage"),
+    ("Resources", "ui.resource_page", "ResourcePage"),
+    ("Analysis", "ui.analysis_page", "AnalysisPage"),
+    ("Compare", "ui.compare_page", "ComparePage"),
+    ("History", "ui.history_page", "HistoryPage"),
+    ("Trends", "ui.trends_page", "TrendsPage"),
+    ("Batch Scan", "ui.batch_page", "BatchPage"),
+]
 
 
 class MainWindow(QMainWindow):
@@ -22,9 +31,7 @@ class MainWindow(QMainWindow):
         # Sidebar
         self.sidebar = QListWidget()
         self.sidebar.setObjectName("SidebarList")
-        self.sidebar.addItems(
-            ["Dashboard", "Resources", "Analysis", "Compare", "History", "Batch Scan"]
-        )
+        self.sidebar.addItems([name for name, _, _ in PAGES])
         self.sidebar.setFixedWidth(200)
         self.sidebar.setFocusPolicy(self.sidebar.focusPolicy())
         self.sidebar.currentRowChanged.connect(self.change_page)
@@ -32,30 +39,41 @@ class MainWindow(QMainWindow):
         # Add sidebar (NO stretch)
         layout.addWidget(self.sidebar, stretch=0)
 
-        # Pages
-        self.pages = {
-            0: DashboardPage(),
-            1: ResourcePage(),
-            2: AnalysisPage(),
-            3: ComparePage(),
-            4: HistoryPage(),
-            5: BatchPage(),
-        }
+        # Pages: tạo khi được mở lần đầu (xem page())
+        self.pages = {}
+        # index -> thời gian import + dựng trang (ms)
+        self.page_build_ms = {}
 
-        self.current_page = self.pages[0]
+        self.current_page = self.page(0)
 
         # Add content page (WITH stretch)
         layout.addWidget(self.current_page, stretch=1)
 
         self.setCentralWidget(container)
 
+    def page(self, index):
+        page = self.pages.get(index)
+        if page is None:
+            started = time.perf_counter()
+
+            _, module, cls = PAGES[index]
+            page = getattr(importlib.import_module(module), cls)()
+            self.pages[index] = page
+
+            self.page_build_ms[index] = (time.perf_counter() - started) * 1000
+        return page
+
     def change_page(self, index):
-        new_page = self.pages[index]
+        new_page = self.page(index)
 
         # nếu có data từ scan dashboard
-        if hasattr(self.pages[0], "last_data") and self.pages[0].last_data:
+        dashboard = self.pages.get(0)
+        if dashboard is not None and getattr(dashboard, "last_data", None):
             if hasattr(new_page, "set_data"):
-                new_page.set_data(self.pages[0].last_data)
+                new_page.set_data(dashboard.last_data)
+
+        if new_page is self.current_page:
+            return
 
         layout = self.centralWidget().layout()
         layout.replaceWidget(self.current_page, new_page)
@@ -0,0 +1,56 @@
+import concurrent.futures
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class ScanRunner(QObject):
+    """
+    Cầu nối giữa core.executor và Qt: chạy scan nền, chuyển callback
+    (đến từ thread của browser pool) về GUI thread qua signal.
+    """
+
+    # job (core.executor.ScanJob), stage
+    progress = pyqtSignal(object, str)
+    # job, data
+    finished = pyqtSignal(object, object)
+    # job, error message
+    failed = pyqtSignal(object, str)
+    # job
+    cancelled = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+
+    def start(self, url: str, **options):
+        # Playwright / browser pool chỉ được import ở lần scan đầu tiên
+        from core.executor import submit_scan
+
+        job = submit_scan(
+            url,
+            on_progress=lambda job, stage: self.progress.emit(job, stage),
+            **options,
+        )
+        # Đưa vào danh sách TRƯỚC khi gắn on_done: scan lỗi / xong ngay
+        # lập tức vẫn được gỡ khỏi self.jobs
+        self.jobs.append(job)
+        job.add_done_callback(self._on_done)
+        return job
+
+    def cancel(self):
+        for job in list(self.jobs):
+            job.cancel()
+
+    def busy(self) -> bool:
+        return any(not job.done() for job in list(self.jobs))
+
+    def _on_done(self, job, data, error):
+        if job in self.jobs:
+            self.jobs.remove(job)
+
+        if isinstance(error, concurrent.futures.CancelledError):
+            self.cancelled.emit(job)
+        elif error is not None:
+            self.failed.emit(job, str(error))
+        else:
+            self.finished.emit(job, data)
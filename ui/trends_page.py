@@ -0,0 +1,175 @@
+from PyQt6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QComboBox,
+    QPushButton,
+)
+from PyQt6.QtCore import QTimer
+
+from core.database import get_max_scan_id, get_scan_urls
+from core.emulation import PROFILES, DEFAULT_PROFILE
+from core.trends import WINDOWS, TrendData
+from ui.widgets.chart_line import LineChart
+
+# Nhóm metric cùng đơn vị được vẽ chung một trục
+METRIC_GROUPS = {
+    "Timing (ms)": ("ttfb", "load", "lcp"),
+    "CLS": ("cls",),
+    "Size (KB)": ("size",),
+}
+
+LABELS = {"ttfb": "TTFB", "load": "Load", "lcp": "LCP", "cls": "CLS", "size": "Size"}
+
+# Chu kỳ kiểm tra scan mới (ms) khi trang đang mở
+POLL_INTERVAL = 5000
+
+SOURCE_LABELS = {"raw": "scan thô (LTTB)", "hour": "rollup theo giờ (p50)", "day": "rollup theo ngày (p50)"}
+
+
+class TrendsPage(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setObjectName("TrendsPage")
+
+        main = QVBoxLayout(self)
+        main.setContentsMargins(20, 20, 20, 20)
+        main.setSpacing(20)
+
+        # ---------------------------------------------------------
+        # TITLE
+        # ---------------------------------------------------------
+        title = QLabel("Trends")
+        title.setStyleSheet("font-size: 22px; font-weight: bold;")
+        main.addWidget(title)
+
+        # ---------------------------------------------------------
+        # FILTER: URL + PROFILE + WINDOW + METRIC
+        # ---------------------------------------------------------
+        row = QHBoxLayout()
+
+        self.cmb_url = QComboBox()
+        self.cmb_url.setMinimumHeight(36)
+        self.cmb_url.currentTextChanged.connect(self.reload)
+        row.addWidget(self.cmb_url, stretch=1)
+
+        self.cmb_profile = QComboBox()
+        self.cmb_profile.addItems(list(PROFILES))
+        self.cmb_profile.setCurrentText(DEFAULT_PROFILE)
+        self.cmb_profile.currentTextChanged.connect(self._on_profile_changed)
+        row.addWidget(self.cmb_profile)
+
+        self.cmb_window = QComboBox()
+        self.cmb_window.addItems(list(WINDOWS))
+        self.cmb_window.setCurrentText("30 ngày")
+        self.cmb_window.currentTextChanged.connect(self.reload)
+        row.addWidget(self.cmb_window)
+
+        self.cmb_metric = QComboBox()
+        self.cmb_metric.addItems(list(METRIC_GROUPS))
+        self.cmb_metric.currentTextChanged.connect(self.reload)
+        row.addWidget(self.cmb_metric)
+
+        self.btn_refresh = QPushButton("Refresh")
+        self.btn_refresh.clicked.connect(self.refresh_urls)
+        row.addWidget(self.btn_refresh)
+
+        main.addLayout(row)
+
+        self.lbl_status = QLabel("")
+        main.addWidget(self.lbl_status)
+
+        # ---------------------------------------------------------
+        # LINE CHART
+        # ---------------------------------------------------------
+        self.chart = LineChart()
+        main.addWidget(self.chart, stretch=1)
+
+        # ---------------------------------------------------------
+        # POLL SCAN MỚI (chỉ khi trang đang hiển thị)
+        # ---------------------------------------------------------
+        self.trend = None
+        self._last_seen = 0
+
+        self._poll = QTimer(self)
+        self._poll.setInterval(POLL_INTERVAL)
+        self._poll.timeout.connect(self.poll)
+
+        self.refresh_urls()
+
+    # ====================================================================
+    # URL LIST
+    # ====================================================================
+    def refresh_urls(self):
+        current = self.cmb_url.currentText()
+        urls = get_scan_urls(self.cmb_profile.currentText())
+
+        self.cmb_url.blockSignals(True)
+        self.cmb_url.clear()
+        self.cmb_url.addItems(urls)
+        if current in urls:
+            self.cmb_url.setCurrentText(current)
+        self.cmb_url.blockSignals(False)
+
+        self.reload()
+
+    def _on_profile_changed(self, _):
+        self.refresh_urls()
+
+    # ====================================================================
+    # LOAD / UPDATE
+    # ====================================================================
+    def reload(self, *_):
+        self._last_seen = get_max_scan_id()
+
+        url = self.cmb_url.currentText()
+        if not url:
+            self.trend = None
+            self.lbl_status.setText("Chưa có scan nào.")
+            return
+
+        self.trend = TrendData(
+            url,
+            METRIC_GROUPS[self.cmb_metric.currentText()],
+            WINDOWS[self.cmb_window.currentText()],
+            self.cmb_profile.currentText(),
+        ).load()
+        self._draw()
+
+    def poll(self):
+        # Một query MAX(id) rẻ; chỉ đọc thêm khi thật sự có scan mới
+        max_id = get_max_scan_id()
+        if max_id == self._last_seen:
+            return
+        self._last_seen = max_id
+
+        if self.cmb_url.count() != len(get_scan_urls(self.cmb_profile.currentText())):
+            self.refresh_urls()
+            return
+
+        if self.trend is not None and self.trend.update():
+            self._draw()
+
+    def _draw(self):
+        group = self.cmb_metric.currentText()
+        series = {LABELS[m]: s for m, s in self.trend.series.items()}
+
+        points = sum(len(x) for x, _ in series.values())
+        self.lbl_status.setText(
+            f"{points} điểm – nguồn: {SOURCE_LABELS[self.trend.source]}"
+        )
+        self.chart.plot_series(series, title=self.trend.url, ylabel=group)
+
+    # ====================================================================
+    # QT EVENTS
+    # ====================================================================
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.poll()
+        self._poll.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._poll.stop()
@@ -1,40 +1,63 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
+from ui.widgets.chart_base import ChartWidget
 
 
-class BarChart(QWidget):
+class BarChart(ChartWidget):
     def __init__(self):
-        super().__init__()
+        super().__init__(figsize=(4, 3))
 
-        self.fig = Figure(figsize=(4, 3))
-        self.canvas = FigureCanvasQTAgg(self.fig)
-
-        layout = QVBoxLayout(self)
-        layout.addWidget(self.canvas)
+        self._ax = None
+        # ("single" | "compare", labels) của axes hiện tại
+        self._key = None
+        # Một list bar cho mỗi series
+        self._series = []
 
     def plot(self, labels, values):
+        self._schedule(self._plot, list(labels), list(values))
+
+    # so sánh 2 URL
+    def plot_compare(self, labels, v1, v2):
+        self._schedule(self._plot_compare, list(labels), list(v1), list(v2))
+
+    def _plot(self, labels, values):
+        if self._key == ("single", labels):
+            self._update([values])
+            return
+
         self.fig.clear()
         ax = self.fig.add_subplot(111)
 
-        ax.bar(labels, values, color="#4DB6AC")
+        bars = ax.bar(labels, values, color="#4DB6AC")
         ax.set_ylabel("Milliseconds")
         ax.set_title("Performance Timings")
 
-        self.canvas.draw()
+        self._ax = ax
+        self._key = ("single", labels)
+        self._series = [list(bars)]
+
+    def _plot_compare(self, labels, v1, v2):
+        if self._key == ("compare", labels):
+            self._update([v1, v2])
+            return
 
-    # so sánh 2 URL
-    def plot_compare(self, labels, v1, v2):
         self.fig.clear()
         ax = self.fig.add_subplot(111)
 
         x = range(len(labels))
 
-        ax.bar([i - 0.2 for i in x], v1, width=0.4, label="URL 1", color="#4FC3F7")
-        ax.bar([i + 0.2 for i in x], v2, width=0.4, label="URL 2", color="#FFB74D")
+        bars1 = ax.bar([i - 0.2 for i in x], v1, width=0.4, label="URL 1", color="#4FC3F7")
+        bars2 = ax.bar([i + 0.2 for i in x], v2, width=0.4, label="URL 2", color="#FFB74D")
 
         ax.set_xticks(x)
         ax.set_xticklabels(labels)
         ax.legend()
 
-        self.canvas.draw()
+        self._ax = ax
+        self._key = ("compare", labels)
+        self._series = [list(bars1), list(bars2)]
+
+    def _update(self, series_values):
+        # Cùng bộ label: chỉ đổi chiều cao bar, giữ nguyên axes
+        for bars, values in zip(self._series, series_values):
+            for bar, value in zip(bars, values):
+                bar.set_height(value)
+        self._rescale(self._ax)
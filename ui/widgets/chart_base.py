@@ -0,0 +1,80 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from PyQt6.QtCore import QTimer
+
+
+class ChartWidget(QWidget):
+    """
+    Widget chart matplotlib dùng chung cho các chart:
+     - Figure / canvas tạo ở lần vẽ đầu tiên (matplotlib import lúc đó)
+     - Cập nhật liên tục (batch scan, monitor) được gộp lại: chỉ lần cập
+       nhật mới nhất trong mỗi UPDATE_INTERVAL ms được áp dụng
+     - Subclass giữ artist (bar, line, image) và đổi dữ liệu tại chỗ,
+       chỉ dựng lại axes khi bộ label / hình dạng dữ liệu thay đổi
+    """
+
+    # Khoảng gộp cập nhật (ms)
+    UPDATE_INTERVAL = 50
+
+    def __init__(self, figsize=(4, 3)):
+        super().__init__()
+
+        self._figsize = figsize
+        self._fig = None
+        self._canvas = None
+
+        self._layout = QVBoxLayout(self)
+
+        self._pending = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.UPDATE_INTERVAL)
+        self._timer.timeout.connect(self._flush)
+
+    @property
+    def fig(self):
+        self._ensure_canvas()
+        return self._fig
+
+    @property
+    def canvas(self):
+        self._ensure_canvas()
+        return self._canvas
+
+    def has_canvas(self) -> bool:
+        return self._canvas is not None
+
+    def _ensure_canvas(self):
+        if self._canvas is not None:
+            return
+
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+        from matplotlib.figure import Figure
+
+        self._fig = Figure(figsize=self._figsize)
+        self._canvas = FigureCanvasQTAgg(self._fig)
+        self._layout.addWidget(self._canvas)
+
+    # -----------------------------------------------------------
+    # CẬP NHẬT GỘP
+    # -----------------------------------------------------------
+    def _schedule(self, update, *args):
+        """
+        Ghi nhận cập nhật mới nhất; áp dụng tối đa một lần mỗi UPDATE_INTERVAL.
+        Timer không bị restart, nên luồng cập nhật liên tục vẫn được vẽ đều.
+        """
+        self._pending = (update, args)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        update, args = self._pending
+        self._pending = None
+
+        update(*args)
+        self.canvas.draw_idle()
+
+    def _rescale(self, ax):
+        ax.relim()
+        ax.autoscale_view()
@@ -1,25 +1,84 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
+from ui.widgets.chart_base import ChartWidget
 
+COLORS = ["#9575CD", "#4FC3F7", "#FF8A65", "#81C784", "#FFD54F"]
 
-class LineChart(QWidget):
+
+class LineChart(ChartWidget):
     def __init__(self):
-        super().__init__()
+        super().__init__(figsize=(4, 3))
 
-        self.fig = Figure(figsize=(4, 3))
-        self.canvas = FigureCanvasQTAgg(self.fig)
+        self._ax = None
+        self._line = None
 
-        layout = QVBoxLayout(self)
-        layout.addWidget(self.canvas)
+        # plot_series: tên series -> Line2D, dựng lại khi bộ tên thay đổi
+        self._lines = {}
+        self._key = None
 
     def plot(self, values):
+        self._schedule(self._plot, list(values))
+
+    def _plot(self, values):
+        x = range(len(values))
+
+        if self._line is not None:
+            self._line.set_data(x, values)
+            self._rescale(self._ax)
+            return
+
         self.fig.clear()
+        self._lines = {}
+        self._key = None
         ax = self.fig.add_subplot(111)
 
-        ax.plot(values, marker="o", linestyle="-", color="#9575CD")
+        self._line, = ax.plot(x, values, marker="o", linestyle="-", color="#9575CD")
         ax.set_title("Timeline")
         ax.set_ylabel("Duration (ms)")
         ax.set_xlabel("Request Index")
 
-        self.canvas.draw()
+        self._ax = ax
+
+    # -----------------------------------------------------------
+    # NHIỀU SERIES, TRỤC THỜI GIAN (trang Trends)
+    # -----------------------------------------------------------
+    def plot_series(self, series: dict, title: str = "", ylabel: str = ""):
+        """
+        series = {tên: ([datetime], [giá trị])}
+        """
+        self._schedule(self._plot_series, dict(series), title, ylabel)
+
+    def _plot_series(self, series, title, ylabel):
+        key = (tuple(series), title, ylabel)
+
+        if key == self._key:
+            for name, (x, y) in series.items():
+                self._lines[name].set_data(x, y)
+            self._rescale(self._ax)
+            return
+
+        import matplotlib.dates as mdates
+
+        self.fig.clear()
+        self._line = None
+        ax = self.fig.add_subplot(111)
+        # Trục ngày ngay từ đầu: series rỗng vẫn set_data datetime được về sau
+        ax.xaxis_date()
+
+        self._lines = {}
+        for i, (name, (x, y)) in enumerate(series.items()):
+            self._lines[name], = ax.plot(
+                x, y, linestyle="-", linewidth=1.2,
+                marker="o" if len(x) < 50 else None, markersize=3,
+                color=COLORS[i % len(COLORS)], label=name,
+            )
+
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.grid(alpha=0.3)
+        if len(series) > 1:
+            ax.legend(loc="upper left")
+
+        self._ax = ax
+        self._key = key
@@ -1,56 +1,59 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-import numpy as np
+import math
 
+from ui.widgets.chart_base import ChartWidget
+
+
+def _angles(n: int) -> list:
+    # Góc của n trục, khép vòng (điểm đầu lặp lại ở cuối)
+    angles = [2 * math.pi * i / n for i in range(n)]
+    return angles + angles[:1]
 
-class RadarChart(QWidget):
-    def __init__(self):
-        super().__init__()
 
-        self.fig = Figure(figsize=(4, 4))
-        self.canvas = FigureCanvasQTAgg(self.fig)
+class RadarChart(ChartWidget):
+    def __init__(self):
+        super().__init__(figsize=(4, 4))
 
-        layout = QVBoxLayout(self)
-        layout.addWidget(self.canvas)
+        self._ax = None
+        self._key = None
+        # [(line, polygon)] cho mỗi series
+        self._series = []
 
     def plot(self, labels, values):
-        self.fig.clear()
-        ax = self._radar(labels, values)
-        self.canvas.draw()
+        self._schedule(self._plot, "single", list(labels), [list(values)])
 
     def plot_compare(self, labels, v1, v2):
-        self.fig.clear()
+        self._schedule(self._plot, "compare", list(labels), [list(v1), list(v2)])
 
-        N = len(labels)
-        angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
-        angles += angles[:1]
+    def _plot(self, mode, labels, series_values):
+        angles = _angles(len(labels))
 
-        v1 = v1 + v1[:1]
-        v2 = v2 + v2[:1]
+        if self._key == (mode, labels):
+            # Cùng bộ trục: chỉ đổi dữ liệu của line + vùng tô
+            for (line, poly), values in zip(self._series, series_values):
+                closed = values + values[:1]
+                line.set_data(angles, closed)
+                poly.set_xy(list(zip(angles, closed)))
+            self._rescale(self._ax)
+            return
 
+        self.fig.clear()
         ax = self.fig.add_subplot(111, polar=True)
 
-        ax.plot(angles, v1, label="URL 1", color="#4FC3F7")
-        ax.fill(angles, v1, alpha=0.25, color="#4FC3F7")
-
-        ax.plot(angles, v2, label="URL 2", color="#FF8A65")
-        ax.fill(angles, v2, alpha=0.25, color="#FF8A65")
-
-        ax.set_thetagrids(np.degrees(angles[:-1]), labels)
-        ax.legend()
+        if mode == "single":
+            styles = [(None, "#4DB6AC", 0.3)]
+        else:
+            styles = [("URL 1", "#4FC3F7", 0.25), ("URL 2", "#FF8A65", 0.25)]
 
-        self.canvas.draw()
+        self._series = []
+        for (label, color, alpha), values in zip(styles, series_values):
+            closed = values + values[:1]
+            line, = ax.plot(angles, closed, label=label, color=color)
+            poly, = ax.fill(angles, closed, alpha=alpha, color=color)
+            self._series.append((line, poly))
 
-    def _radar(self, labels, values):
-        N = len(labels)
+        ax.set_thetagrids([math.degrees(a) for a in angles[:-1]], labels)
+        if mode == "compare":
+            ax.legend()
 
-        angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
-        values = values + values[:1]
-        angles += angles[:1]
-
-        ax = self.fig.add_subplot(111, polar=True)
-        ax.plot(angles, values, color="#4DB6AC")
-        ax.fill(angles, values, alpha=0.3, color="#4DB6AC")
-        ax.set_thetagrids(np.degrees(angles[:-1]), labels)
-        return ax
+        self._ax = ax
+        self._key = (mode, labels)
@@ -1,29 +1,33 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-import numpy as np
+from ui.widgets.chart_base import ChartWidget
 
 
-class Heatmap(QWidget):
+class Heatmap(ChartWidget):
     def __init__(self):
-        super().__init__()
+        super().__init__(figsize=(4, 3))
 
-        self.fig = Figure(figsize=(4, 3))
-        self.canvas = FigureCanvasQTAgg(self.fig)
-
-        layout = QVBoxLayout(self)
-        layout.addWidget(self.canvas)
+        self._image = None
+        self._width = None
 
     def set_data(self, values):
         if not values:
             return
+        self._schedule(self._set_data, list(values))
+
+    def _set_data(self, values):
+        # Một hàng duy nhất: [[v0, v1, ...]]
+        arr = [values]
 
-        arr = np.array(values).reshape(1, -1)
+        if self._image is not None and self._width == len(values):
+            # Cùng kích thước: đổi dữ liệu + thang màu của image đang có
+            self._image.set_data(arr)
+            self._image.set_clim(min(values), max(values))
+            return
 
         self.fig.clear()
         ax = self.fig.add_subplot(111)
 
-        heat = ax.imshow(arr, cmap="inferno", aspect="auto")
+        self._image = ax.imshow(arr, cmap="inferno", aspect="auto")
         ax.set_yticks([])
         ax.set_title("Resource Duration Heatmap")
-        self.canvas.draw()
+
+        self._width = len(values)